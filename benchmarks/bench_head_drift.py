@@ -0,0 +1,96 @@
+"""
+Regression benchmark: per-file head extraction cost over a long run.
+
+Writes a tree of comment-heavy files, processes them in order with a single
+FileProcessor and compares the mean per-file time and head size of the first and
+last windows of the run. Both must stay flat: before the LinesToRead drift fix,
+every comment seen widened the head of every later file.
+
+    python benchmarks/bench_head_drift.py --files 10000 --window 1000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folderinfo.src.config_handler import ConfigHandler  # noqa: E402
+from folderinfo.src.file_processor import FileProcessor  # noqa: E402
+
+FILE_TEMPLATE = "".join(f"# comment {i}\nvalue_{i} = {i}\n" for i in range(200))
+
+
+def make_config(lines_to_read):
+    return ConfigHandler(
+        {
+            "Main": {
+                "LinesToRead": str(lines_to_read),
+                "FileTypes": ".txt",
+                "Ignores": "",
+                "IgnoredFiles": "",
+                "SpecifiedFiles": "",
+            }
+        },
+        use_env_var=False,
+    )
+
+
+def run(files, window, lines_to_read):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(files):
+            path = os.path.join(directory, f"file_{i}.txt")
+            with open(path, "w") as f:
+                f.write(FILE_TEMPLATE)
+            paths.append(path)
+
+        processor = FileProcessor(make_config(lines_to_read))
+        timings = []
+        head_sizes = []
+        for path in paths:
+            start = time.perf_counter()
+            result = processor._process_file(path)
+            timings.append(time.perf_counter() - start)
+            head_sizes.append(len(result["lines"]))
+
+    first = sum(timings[:window]) / window
+    last = sum(timings[-window:]) / window
+    return {
+        "files": files,
+        "window": window,
+        "lines_to_read": lines_to_read,
+        "first_window_mean_s": first,
+        "last_window_mean_s": last,
+        "ratio": last / first,
+        "first_head_lines": head_sizes[0],
+        "last_head_lines": head_sizes[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--window", type=int, default=500)
+    parser.add_argument("--lines-to-read", type=int, default=20)
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=1.5,
+        help="Fail if the last window is this many times slower than the first.",
+    )
+    args = parser.parse_args()
+
+    results = run(args.files, min(args.window, args.files), args.lines_to_read)
+    print(json.dumps(results, indent=2))
+
+    drifted = results["last_head_lines"] != results["first_head_lines"]
+    if drifted or results["ratio"] > args.max_ratio:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Memory benchmark: size of retained AST analysis results.
+
+Analyzes every Python module of a synthetic repository (see synthetic_tree.py) and
+measures with tracemalloc how much memory the results take when kept, once as the
+compact record tuples `AstAnalyzer` returns and once converted to the dictionaries
+it used to return, then times `reduce_tokens` over the records.
+
+    python benchmarks/bench_memory.py --files 5000
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_tree import generate_tree  # noqa: E402
+
+LIST_CATEGORIES = ("functions", "classes", "global_variables", "imports")
+
+
+def as_dicts(results: dict) -> dict:
+    """Return `results` in the former layout, with one dictionary per record."""
+    converted = dict(results)
+    for category in LIST_CATEGORIES:
+        if results[category] is not None:
+            converted[category] = [record._asdict() for record in results[category]]
+    return converted
+
+
+def retained_bytes(build):
+    """Return the memory still allocated by the value `build()` returns, and the value."""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--module-functions", type=int, default=20)
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    from folderinfo.src.ast_analyzer import AstAnalyzer
+    from folderinfo.src.file_reader import read_source
+    from folderinfo.src.utils import reduce_tokens
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_tree(
+            root,
+            files=args.files,
+            ignored_files=0,
+            module_functions=args.module_functions,
+        )
+        sources = [
+            read_source(os.path.join(directory, name))
+            for directory, _, names in os.walk(root)
+            for name in names
+            if name.endswith(".py")
+        ]
+
+    analyzer = AstAnalyzer()
+    records_bytes, records = retained_bytes(
+        lambda: [analyzer.analyze(source) for source in sources]
+    )
+    dicts_bytes, _ = retained_bytes(
+        lambda: [as_dicts(analyzer.analyze(source)) for source in sources]
+    )
+
+    start = time.perf_counter()
+    for result in records:
+        reduce_tokens(result)
+    reduce_seconds = time.perf_counter() - start
+
+    report = {
+        "modules": len(sources),
+        "records_bytes": records_bytes,
+        "dicts_bytes": dicts_bytes,
+        "reduction": round(1 - records_bytes / dicts_bytes, 3) if dicts_bytes else None,
+        "reduce_seconds": round(reduce_seconds, 4),
+    }
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Startup benchmark: import cost of the CLI entry point.
+
+Runs `python -X importtime` on the `folderinfo.src:cli` entry point and on
+`folderinfo --help` in fresh interpreters, and reports the cumulative import time
+of the package together with the slowest imports. Fails when the import time is
+over budget or when a module that only some commands need is loaded eagerly.
+
+    python benchmarks/bench_startup.py --budget-ms 75 --repeat 5
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "import_cli": "from folderinfo.src import cli",
+    "help": (
+        "from folderinfo.src import cli\n"
+        "try:\n"
+        "    cli.main(['--help'], standalone_mode=False)\n"
+        "except SystemExit:\n"
+        "    pass\n"
+    ),
+}
+
+# Modules that only analysis, caching, logging or the daemon need.
+DEFERRED_MODULES = (
+    "structlog",
+    "asyncio",
+    "sqlite3",
+    "concurrent.futures",
+    "socketserver",
+    "folderinfo.src.file_processor",
+    "folderinfo.src.config_handler",
+    "folderinfo.src.binary_format",
+)
+
+REPORT_LOADED = (
+    "import sys, json\n"
+    "print(json.dumps([m for m in {deferred!r} if m in sys.modules]), file=sys.stderr)\n"
+)
+
+
+def parse_importtime(stderr):
+    """Return `({module: cumulative_us}, loaded_deferred)` from `-X importtime` output."""
+    cumulative = {}
+    loaded = []
+    for line in stderr.splitlines():
+        if line.startswith("import time:"):
+            _, cumulative_us, name = line[len("import time:") :].split("|")
+            if cumulative_us.strip().isdigit():
+                # Nested imports are indented by two spaces per level.
+                cumulative[name[1:].rstrip()] = int(cumulative_us)
+        elif line.startswith("["):
+            loaded = json.loads(line)
+    return cumulative, loaded
+
+
+def measure(code):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    script = code + "\n" + REPORT_LOADED.format(deferred=DEFERRED_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative, loaded = parse_importtime(completed.stderr)
+    # Top-level imports are not indented; their cumulative times add up to the total.
+    total_us = sum(us for name, us in cumulative.items() if not name.startswith(" "))
+    return total_us, cumulative, loaded
+
+
+def run(repeat, top):
+    results = {}
+    for scenario, code in SCENARIOS.items():
+        runs = [measure(code) for _ in range(repeat)]
+        best_total, cumulative, loaded = min(runs, key=lambda run: run[0])
+        slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)
+        results[scenario] = {
+            "import_ms": best_total / 1000,
+            "slowest_imports_ms": {
+                name.strip(): us / 1000 for name, us in slowest[:top]
+            },
+            "deferred_modules_loaded": loaded,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=75.0,
+        help="Fail if the best import time of a scenario is above this.",
+    )
+    args = parser.parse_args()
+
+    results = run(max(1, args.repeat), args.top)
+    print(json.dumps(results, indent=2))
+
+    for scenario in results.values():
+        if (
+            scenario["import_ms"] > args.budget_ms
+            or scenario["deferred_modules_loaded"]
+        ):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
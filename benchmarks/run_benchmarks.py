@@ -0,0 +1,226 @@
+"""
+Stage-by-stage benchmark of the generate/analyze pipeline.
+
+Generates a synthetic repository (see synthetic_tree.py), then measures each
+stage in a fresh process so that its peak RSS is its own: walk, read, AST
+analyze, reduce_tokens, output and the end-to-end run. Results are printed and
+optionally written as JSON; with --compare, stages slower than the baseline by
+more than --threshold are reported and the exit status is 1.
+
+    python benchmarks/run_benchmarks.py --files 5000 --json results.json
+    python benchmarks/run_benchmarks.py --files 5000 --compare results.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+from synthetic_tree import benchmark_config, generate_tree  # noqa: E402
+
+STAGES = ("walk", "read", "analyze", "reduce", "output", "end_to_end")
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _prepare(stage, root, processor):
+    """Build, untimed, the inputs the stage under test consumes."""
+    from folderinfo.src.file_reader import read_source
+
+    if stage == "walk" or stage == "end_to_end":
+        return None
+    files = list(processor.discover_files(root))
+    if stage == "read":
+        return files
+    sources = [read_source(path) for path in files if path.endswith(".py")]
+    if stage == "analyze":
+        return sources
+    if stage == "reduce":
+        analyzed = []
+        for source in sources:
+            results = processor.ast_analyzer.analyze(source)
+            analyzed.append(
+                {key: value for key, value in results.items() if value is not None}
+            )
+        return analyzed
+    if stage == "output":
+        return list(processor.iter_analysis(files))
+    raise ValueError(stage)
+
+
+def _run(stage, root, inputs, processor, scratch):
+    """Run the stage under test and return the number of items it handled."""
+    from folderinfo.src import utils
+    from folderinfo.src.output_writers import get_writer
+
+    if stage == "walk":
+        return sum(1 for _ in processor.discover_files(root))
+    if stage == "read":
+        for path in inputs:
+            processor._read_file(path, needs_source=path.endswith(".py"))
+        return len(inputs)
+    if stage == "analyze":
+        for source in inputs:
+            processor.ast_analyzer.analyze(source, processor.ast_categories)
+        return len(inputs)
+    if stage == "reduce":
+        for analyzed in inputs:
+            utils.reduce_tokens(analyzed)
+        return len(inputs)
+    if stage == "output":
+        for fmt in ("text", "jsonl"):
+            with get_writer(fmt, os.path.join(scratch, f"out.{fmt}"), root) as writer:
+                for path, result in inputs:
+                    writer.write(path, result)
+        return len(inputs)
+    if stage == "end_to_end":
+        output = os.path.join(scratch, "end_to_end.jsonl")
+        with get_writer("jsonl", output, root) as writer:
+            processor.analyze_directory(root, writer=writer, retain=False)
+        return writer.count
+    raise ValueError(stage)
+
+
+def measure_stage(stage, root, lines_to_read, trace_malloc=False):
+    """Measure one stage; meant to run in a fresh process."""
+    from folderinfo.src.file_processor import FileProcessor
+
+    processor = FileProcessor(benchmark_config(lines_to_read))
+    inputs = _prepare(stage, root, processor)
+    rss_before = _peak_rss_kb()
+    with tempfile.TemporaryDirectory() as scratch:
+        start = time.perf_counter()
+        items = _run(stage, root, inputs, processor, scratch)
+        seconds = time.perf_counter() - start
+        peak_rss = _peak_rss_kb()
+
+        traced_peak = None
+        if trace_malloc:
+            # tracemalloc slows allocation-heavy code several times over, so the
+            # traced pass is separate from the timed one.
+            tracemalloc.start()
+            _run(stage, root, inputs, processor, scratch)
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "items": items,
+        "per_item_us": seconds / items * 1e6 if items else None,
+        "peak_rss_kb": peak_rss,
+        "rss_before_kb": rss_before,
+        "traced_peak_bytes": traced_peak,
+    }
+
+
+def run_suite(root, stages, lines_to_read, repeat, trace_malloc=False):
+    """Measure every stage `repeat` times, each in its own process, keeping the best."""
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for stage in stages:
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(
+                    executor.submit(
+                        measure_stage, stage, root, lines_to_read, trace_malloc
+                    ).result()
+                )
+        results[stage] = min(runs, key=lambda run: run["seconds"])
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the stages whose time regressed by more than `threshold` (a fraction)."""
+    regressions = {}
+    for stage, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous or not previous["seconds"]:
+            continue
+        change = current["seconds"] / previous["seconds"] - 1
+        if change > threshold:
+            regressions[stage] = round(change, 3)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--ignored-files", type=int, default=5000)
+    parser.add_argument("--module-functions", type=int, default=20)
+    parser.add_argument("--lines-to-read", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument(
+        "--trace-malloc",
+        action="store_true",
+        help="Also record each stage's peak Python heap with tracemalloc.",
+    )
+    parser.add_argument("--tree", help="Reuse (or create) the synthetic tree here.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--compare", help="Baseline results file to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    with tempfile.TemporaryDirectory() as scratch:
+        root = args.tree or os.path.join(scratch, "tree")
+        tree = None
+        if not os.path.isdir(root):
+            tree = generate_tree(
+                root,
+                files=args.files,
+                depth=args.depth,
+                fanout=args.fanout,
+                ignored_files=args.ignored_files,
+                module_functions=args.module_functions,
+            )
+        results = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "tree": tree or {"path": root},
+                "lines_to_read": args.lines_to_read,
+            },
+            "stages": run_suite(
+                root, stages, args.lines_to_read, args.repeat, args.trace_malloc
+            ),
+        }
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}: {regressions}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Synthetic repository generator for the benchmarks.
+
+Builds a deterministic tree of Python modules and text files, spread over nested
+directories, plus bulky ignored directories (node_modules, venv, build) that a
+good walker never enters.
+
+    python benchmarks/synthetic_tree.py /tmp/tree --files 5000 --depth 4
+"""
+
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folderinfo.src.config_handler import ConfigHandler  # noqa: E402
+
+IGNORED_DIRS = ("node_modules", "venv", "build")
+TEXT_SUFFIXES = (".md", ".js", ".yaml", ".json")
+
+
+def python_module(rng: random.Random, functions: int) -> str:
+    """Return the source of a module with `functions` functions and a class."""
+    parts = [
+        '"""Synthetic module."""',
+        "import os",
+        "from typing import List, Optional",
+        "",
+        "CONSTANT = 42",
+        "",
+    ]
+    for i in range(functions):
+        callee = f"function_{rng.randrange(functions)}"
+        parts += [
+            "",
+            f"def function_{i}(value: int, items: List[int]) -> Optional[int]:",
+            f'    """Function number {i}."""',
+            "    # Keep the running total.",
+            "    total = value",
+            "    for item in items:",
+            "        total += item",
+            f"    if total > {i}:",
+            f"        return {callee}(total - 1, items[1:])",
+            "    return os.getpid() + len(items)",
+        ]
+    parts += [
+        "",
+        "",
+        "class Synthetic:",
+        '    """A synthetic class."""',
+        "",
+        "    def method(self):",
+        "        return function_0(1, [])",
+        "",
+    ]
+    return "\n".join(parts)
+
+
+def text_file(rng: random.Random, lines: int) -> str:
+    return (
+        "\n".join(f"line {i} " + "x" * rng.randrange(10, 80) for i in range(lines))
+        + "\n"
+    )
+
+
+def generate_tree(
+    root: str,
+    files: int = 1000,
+    depth: int = 3,
+    fanout: int = 5,
+    ignored_files: int = 1000,
+    module_functions: int = 20,
+    python_ratio: float = 0.6,
+    seed: int = 0,
+) -> dict:
+    """
+    Write a synthetic repository under `root` and return a summary of what was written.
+
+    :param root: The directory to create the tree in
+    :param files: The number of files outside the ignored directories
+    :param depth: The maximum directory depth of those files
+    :param fanout: The number of sibling directories at each level
+    :param ignored_files: The number of files spread over the ignored directories
+    :param module_functions: The number of functions in each Python module
+    :param python_ratio: The fraction of files that are Python modules
+    :param seed: The random seed, so equal arguments give equal trees
+    """
+    rng = random.Random(seed)
+    total_bytes = 0
+
+    def write(relative_path, content):
+        nonlocal total_bytes
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        total_bytes += len(content)
+
+    for i in range(files):
+        level = rng.randint(0, depth)
+        directories = [f"pkg{rng.randrange(fanout)}" for _ in range(level)]
+        if rng.random() < python_ratio:
+            name = f"module_{i}.py"
+            content = python_module(rng, module_functions)
+        else:
+            name = f"file_{i}{rng.choice(TEXT_SUFFIXES)}"
+            content = text_file(rng, rng.randrange(5, 200))
+        write(os.path.join(*directories, name), content)
+
+    for i in range(ignored_files):
+        ignored = IGNORED_DIRS[i % len(IGNORED_DIRS)]
+        nested = f"dep{rng.randrange(max(1, ignored_files // 50))}"
+        write(os.path.join(ignored, nested, f"index_{i}.js"), text_file(rng, 20))
+
+    return {
+        "files": files,
+        "ignored_files": ignored_files,
+        "depth": depth,
+        "fanout": fanout,
+        "module_functions": module_functions,
+        "python_ratio": python_ratio,
+        "seed": seed,
+        "bytes": total_bytes,
+    }
+
+
+def benchmark_config(lines_to_read: int = 20) -> ConfigHandler:
+    """Return a configuration selecting the files `generate_tree` writes."""
+    return ConfigHandler(
+        {
+            "Main": {
+                "LinesToRead": str(lines_to_read),
+                "FileTypes": ",".join((".py",) + TEXT_SUFFIXES),
+                "Ignores": ",".join(IGNORED_DIRS),
+                "IgnoredFiles": "",
+                "SpecifiedFiles": "",
+            },
+            "AST": {
+                "AnalyzeFunctionNames": "true",
+                "AnalyzeGlobalVariables": "true",
+                "AnalyzeDocstring": "true",
+                "AnalyzeImports": "true",
+                "AnalyzeClasses": "true",
+            },
+        },
+        use_env_var=False,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--ignored-files", type=int, default=1000)
+    parser.add_argument("--module-functions", type=int, default=20)
+    parser.add_argument("--python-ratio", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    summary = generate_tree(
+        args.root,
+        files=args.files,
+        depth=args.depth,
+        fanout=args.fanout,
+        ignored_files=args.ignored_files,
+        module_functions=args.module_functions,
+        python_ratio=args.python_ratio,
+        seed=args.seed,
+    )
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,21 @@
-from .folderinfo import *
-from .src import *
+import importlib
+
+from .src import __all__ as _src_all
+
+# Names provided by `from folderinfo import *`, loaded on first use.
+__all__ = _src_all + ["LINES_TO_READ", "ProjectSummary"]
+
+
+def __getattr__(name):
+    # `folderinfo.src` takes precedence over the legacy `folderinfo.folderinfo` module;
+    # both are only imported when one of their names is first used.
+    if not name.startswith("_"):
+        for module_name in (".src", ".folderinfo"):
+            module = importlib.import_module(module_name, __name__)
+            try:
+                value = getattr(module, name)
+            except AttributeError:
+                continue
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,64 @@
-from .ast_analyzer import *
-from .cli_helpers import *
-from .file_processor import *
-from .main import *
-from .config_handler import *
-from .logger_config import *
-from .utils import *
+"""
+The public API of folderinfo, loaded lazily (PEP 562).
+
+Names are imported from their submodule on first access, so `folderinfo.src:cli`
+and `import folderinfo.src` do not pay for modules a command never uses.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it.
+_EXPORTS = {
+    "AnalysisCache": "analysis_cache",
+    "CacheStats": "analysis_cache",
+    "default_cache_dir": "analysis_cache",
+    "AstAnalyzer": "ast_analyzer",
+    "FileProcessor": "file_processor",
+    "cli": "main",
+    "generate": "main",
+    "analyze": "main",
+    "summary": "main",
+    "serve": "main",
+    "watch": "main",
+    "graph": "main",
+    "set_config": "main",
+    "ResultsStore": "results_store",
+    "ImportGraph": "import_graph",
+    "ConfigHandler": "config_handler",
+    "configure_logging": "logger_config",
+    "file_digest": "utils",
+    "str_to_bool": "utils",
+    "reduce_tokens": "utils",
+}
+
+# Modules searched, last one first, for names not listed above; this keeps every name
+# the package used to star-import available.
+_SUBMODULES = (
+    "analysis_cache",
+    "ast_analyzer",
+    "cli_helpers",
+    "file_processor",
+    "main",
+    "config_handler",
+    "logger_config",
+    "utils",
+)
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_names = (_EXPORTS[name],) if name in _EXPORTS else reversed(_SUBMODULES)
+    for module_name in module_names:
+        module = importlib.import_module(f".{module_name}", __name__)
+        if hasattr(module, name):
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+from typing import Optional
+
+from . import utils
+
+# Bump when the layout of cached results changes so stale entries are ignored.
+SCHEMA_VERSION = 3
+DEFAULT_MAX_SIZE_MB = 256
+CACHE_FILENAME = "analysis.sqlite3"
+
+
+def default_cache_dir() -> str:
+    """Return the per-user cache directory, honouring XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "folderinfo")
+
+
+class CacheStats:
+    """Counters describing how much work the cache saved during a run."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.stored = 0
+        self.evicted = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+            "stored": self.stored,
+            "evicted": self.evicted,
+        }
+
+    def __str__(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.bytes_saved} bytes not re-read, {self.evicted} evicted"
+        )
+
+
+class AnalysisCache:
+    """
+    Persistent store of `FileProcessor._process_file` results, one row per file.
+
+    An entry is reused when the file's size and `mtime_ns` are unchanged, without
+    opening the file. When only the mtime moved the content digest is compared
+    before giving up on the entry. Every entry also records the fingerprint of the
+    settings that produced it, so changing `LinesToRead` or the `[AST]` flags
+    invalidates it. Once the stored results exceed `max_bytes`, the least recently
+    used entries are evicted when the cache is flushed or closed.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        fingerprint: str,
+        max_bytes: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+        rebuild: bool = False,
+    ):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILENAME)
+        self.fingerprint = f"{SCHEMA_VERSION}:{fingerprint}"
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        # Optional source of already known content digests, such as a `GitIndex`.
+        self.known_digests = None
+        self._stats_seen = {}
+
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                result TEXT NOT NULL,
+                result_bytes INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+        if rebuild:
+            self._db.execute("DELETE FROM entries")
+        self._db.commit()
+
+    @classmethod
+    def from_config(
+        cls,
+        config,
+        fingerprint: str,
+        cache_dir: Optional[str] = None,
+        rebuild: bool = False,
+    ):
+        """
+        The `from_config` function builds a cache from the optional `[Cache]` section of the
+        configuration (`Directory`, `MaxSizeMB`).
+
+        :param config: The configuration, either a `ConfigHandler` or a `ConfigParser`
+        :param fingerprint: The settings fingerprint of the `FileProcessor` using the cache
+        :type fingerprint: str
+        :param cache_dir: Overrides the configured cache directory when given
+        :type cache_dir: str (optional)
+        :param rebuild: Drops every existing entry when True
+        :type rebuild: bool (optional)
+        """
+        cache_dir = (
+            cache_dir
+            or config.get("Cache", "Directory", fallback=None)
+            or default_cache_dir()
+        )
+        max_size_mb = int(
+            config.get("Cache", "MaxSizeMB", fallback=DEFAULT_MAX_SIZE_MB)
+        )
+        return cls(
+            cache_dir, fingerprint, max_bytes=max_size_mb * 1024 * 1024, rebuild=rebuild
+        )
+
+    def is_fresh(self, file_path: str) -> bool:
+        """
+        The `is_fresh` function checks whether the cached result for a file can be reused, opening
+        the file only when its size matches but its mtime does not.
+
+        :param file_path: The path of the file to check
+        :type file_path: str
+        :return: True on a cache hit, False otherwise.
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.stats.misses += 1
+            return False
+        key = os.path.abspath(file_path)
+        self._stats_seen[key] = stat
+
+        row = self._db.execute(
+            "SELECT size, mtime_ns, digest, fingerprint FROM entries WHERE path = ?",
+            (key,),
+        ).fetchone()
+        if row is None or row[3] != self.fingerprint or row[0] != stat.st_size:
+            self.stats.misses += 1
+            return False
+
+        if row[1] != stat.st_mtime_ns:
+            if self._digest(file_path, stat) != row[2]:
+                self.stats.misses += 1
+                return False
+            self._db.execute(
+                "UPDATE entries SET mtime_ns = ? WHERE path = ?",
+                (stat.st_mtime_ns, key),
+            )
+        self.stats.hits += 1
+        self.stats.bytes_saved += stat.st_size
+        return True
+
+    def _digest(self, file_path: str, stat: os.stat_result) -> str:
+        digest = None
+        if self.known_digests is not None:
+            digest = self.known_digests.digest(file_path, stat)
+        return digest or utils.file_digest(file_path)
+
+    def get(self, file_path: str) -> Optional[dict]:
+        """Return the cached result for a file that `is_fresh` reported as a hit."""
+        key = os.path.abspath(file_path)
+        row = self._db.execute(
+            "SELECT result FROM entries WHERE path = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute(
+            "UPDATE entries SET last_used = ? WHERE path = ?", (time.time(), key)
+        )
+        result = json.loads(row[0])
+        result["file_path"] = file_path
+        return result
+
+    def store(self, file_path: str, result: dict):
+        """
+        The `store` function records the result of processing a file, keyed by the stat data seen
+        when the file was checked with `is_fresh`.
+
+        :param file_path: The path of the processed file
+        :type file_path: str
+        :param result: The result returned by `FileProcessor._process_file`
+        :type result: dict
+        """
+        key = os.path.abspath(file_path)
+        stat = self._stats_seen.pop(key, None)
+        try:
+            stat = stat or os.stat(file_path)
+            digest = self._digest(file_path, stat)
+        except OSError as e:
+            logging.warning(f"Not caching {file_path}: {e}")
+            return
+        payload = json.dumps(result, separators=(",", ":"))
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                stat.st_size,
+                stat.st_mtime_ns,
+                digest,
+                self.fingerprint,
+                payload,
+                len(payload),
+                time.time(),
+            ),
+        )
+        self.stats.stored += 1
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in `max_bytes`."""
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(result_bytes), 0) FROM entries"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT path, result_bytes FROM entries ORDER BY last_used"
+        ).fetchall()
+        stale = []
+        for path, result_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((path,))
+            total -= result_bytes
+        self._db.executemany("DELETE FROM entries WHERE path = ?", stale)
+        self.stats.evicted += len(stale)
+
+    def flush(self):
+        """Evict down to the size bound and commit, releasing the write lock for other runs."""
+        self.evict()
+        self._db.commit()
+
+    def close(self):
+        """Evict down to the size bound, commit and close the database."""
+        self.flush()
+        self._db.close()
+        logging.info(f"Analysis cache: {self.stats}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,5 +1,167 @@
 import ast
-from typing import List, Dict, Union, Optional
+import sys
+import time
+from collections import namedtuple
+from typing import List, Dict, Union, Optional, Iterable
+
+# Every category `analyze` knows how to collect, in the order they are reported.
+CATEGORIES = ("docstring", "functions", "classes", "global_variables", "imports")
+# Nodes visited between two looks at the clock when a traversal has a deadline.
+DEADLINE_INTERVAL = 1024
+
+
+class LimitExceeded(Exception):
+    """Stops a traversal that went past its node budget (`nodes`) or deadline (`timeout`)."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+# Compact tuples instead of one dictionary per definition; `_asdict()` gives the old form.
+FunctionRecord = namedtuple(
+    "FunctionRecord", "name line returns docstring arguments calls"
+)
+ClassRecord = namedtuple("ClassRecord", "name line docstring methods")
+GlobalRecord = namedtuple("GlobalRecord", "name")
+ImportRecord = namedtuple("ImportRecord", "name alias")
+ImportFromRecord = namedtuple("ImportFromRecord", "name alias module level")
+
+
+def _intern(name: Optional[str]) -> Optional[str]:
+    """Share one copy of identifiers that repeat across files, such as import targets."""
+    return sys.intern(name) if name is not None else None
+
+
+def _docstring_summary(node: ast.AST) -> Optional[str]:
+    """Return the first line of a node's docstring, or None if it has none."""
+    docstring = ast.get_docstring(node, clean=True)
+    return docstring.split("\n")[0] if docstring else None
+
+
+class _AstCollector(ast.NodeVisitor):
+    """
+    Collect functions, classes, globals and imports in a single traversal.
+
+    Only the categories passed in are recorded; the traversal itself still covers
+    the whole tree because imports and assignments may be nested anywhere. Calls
+    are attributed to every enclosing function while the walk is inside it, which
+    matches what a separate `ast.walk` per function used to report.
+
+    With `max_nodes` or a `deadline` (a `time.perf_counter()` value), the traversal
+    raises `LimitExceeded` once it has visited that many nodes or run out of time,
+    leaving what was collected so far in place.
+    """
+
+    def __init__(
+        self,
+        categories: Iterable[str],
+        max_nodes: int = 0,
+        deadline: Optional[float] = None,
+    ):
+        categories = set(categories)
+        self.want_functions = "functions" in categories
+        self.want_classes = "classes" in categories
+        self.want_globals = "global_variables" in categories
+        self.want_imports = "imports" in categories
+
+        self.functions = []
+        self.classes = []
+        self.global_variables = []
+        self.imports = []
+        self.import_froms = []
+        self._open_calls = []
+
+        self.nodes = 0
+        self._max_nodes = max_nodes
+        self._deadline = deadline
+        if max_nodes or deadline is not None:
+            # Unlimited traversals keep the plain `visit` and pay nothing for the checks.
+            self.visit = self._visit_limited
+
+    def _visit_limited(self, node: ast.AST):
+        self.nodes += 1
+        if self._max_nodes and self.nodes > self._max_nodes:
+            raise LimitExceeded("nodes")
+        if (
+            self._deadline is not None
+            and not self.nodes % DEADLINE_INTERVAL
+            and time.perf_counter() > self._deadline
+        ):
+            raise LimitExceeded("timeout")
+        return getattr(self, "visit_" + node.__class__.__name__, self.generic_visit)(
+            node
+        )
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        if not self.want_functions:
+            self.generic_visit(node)
+            return
+        calls = []
+        self.functions.append(
+            FunctionRecord(
+                sys.intern(node.name),
+                node.lineno,
+                str(node.returns) if node.returns else None,
+                _docstring_summary(node),
+                [sys.intern(arg.arg) for arg in node.args.args],
+                calls,
+            )
+        )
+        self._open_calls.append(calls)
+        self.generic_visit(node)
+        self._open_calls.pop()
+
+    def visit_Call(self, node: ast.Call):
+        if self._open_calls and isinstance(node.func, ast.Name):
+            name = sys.intern(node.func.id)
+            for calls in self._open_calls:
+                calls.append(name)
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        if self.want_classes:
+            self.classes.append(
+                ClassRecord(
+                    sys.intern(node.name),
+                    node.lineno,
+                    _docstring_summary(node),
+                    [
+                        sys.intern(n.name)
+                        for n in node.body
+                        if isinstance(n, ast.FunctionDef)
+                    ],
+                )
+            )
+        self.generic_visit(node)
+
+    def visit_Global(self, node: ast.Global):
+        if self.want_globals:
+            self.global_variables.append(GlobalRecord(sys.intern(node.names[0])))
+
+    def visit_Assign(self, node: ast.Assign):
+        if self.want_globals:
+            target_name = AstAnalyzer._get_target_name(node.targets[0])
+            if target_name:  # Ignore cases where name is None (like list[0] = 5)
+                self.global_variables.append(GlobalRecord(sys.intern(target_name)))
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import):
+        if self.want_imports:
+            for n in node.names:
+                self.imports.append(ImportRecord(_intern(n.name), _intern(n.asname)))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if self.want_imports:
+            for n in node.names:
+                self.import_froms.append(
+                    ImportFromRecord(
+                        _intern(n.name),
+                        _intern(n.asname),
+                        _intern(node.module),
+                        node.level,
+                    )
+                )
 
 
 class AstAnalyzer:
@@ -20,27 +182,29 @@ class AstAnalyzer:
         self.classes = None
         self.global_variables = None
         self.imports = None
+        # Seconds spent parsing and visiting the tree during the last `analyze`.
+        self.timings = {"parse": 0.0, "visit": 0.0}
+        # Why the last `analyze` stopped early (`nodes` or `timeout`), or None.
+        self.truncated = None
 
-    def _parse_code(self, source_code: str):
+    def _parse_code(self, source_code: Union[str, bytes]):
         self.tree = ast.parse(source_code)
 
-    def get_class_names(self) -> List[Dict[str, Union[str, int, Optional[str]]]]:
-        results = []
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.ClassDef):
-                methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-                class_info = {
-                    "name": node.name,
-                    "line": node.lineno,
-                    "docstring": (ast.get_docstring(node, clean=True) or "").split(
-                        "\n"
-                    )[0]
-                    if ast.get_docstring(node, clean=True)
-                    else None,
-                    "methods": methods,
-                }
-                results.append(class_info)
-        return results
+    def _collect(
+        self,
+        categories: Iterable[str],
+        max_nodes: int = 0,
+        deadline: Optional[float] = None,
+    ) -> _AstCollector:
+        collector = _AstCollector(categories, max_nodes, deadline)
+        try:
+            collector.visit(self.tree)
+        except LimitExceeded as e:
+            self.truncated = e.reason
+        return collector
+
+    def get_class_names(self) -> List[ClassRecord]:
+        return self._collect(["classes"]).classes
 
     def get_function_calls(self, node: ast.FunctionDef) -> List[str]:
         calls = [
@@ -50,96 +214,104 @@ class AstAnalyzer:
         ]
         return calls
 
-    def get_function_names(self) -> List[Dict[str, Union[str, int, Optional[str]]]]:
-        results = []
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.FunctionDef):
-                args = [arg.arg for arg in node.args.args]
-                calls = self.get_function_calls(node)
-                func_info = {
-                    "name": node.name,
-                    "line": node.lineno,
-                    "returns": str(node.returns) if node.returns else None,
-                    "docstring": (ast.get_docstring(node, clean=True) or "").split(
-                        "\n"
-                    )[0]
-                    if ast.get_docstring(node, clean=True)
-                    else None,
-                    "arguments": args,
-                    "calls": calls,
-                }
-                results.append(func_info)
-        return results
-
-    def _get_target_name(self, target: ast.AST) -> Optional[str]:
+    def get_function_names(self) -> List[FunctionRecord]:
+        return self._collect(["functions"]).functions
+
+    @staticmethod
+    def _get_target_name(target: ast.AST) -> Optional[str]:
         if isinstance(target, ast.Name):
             return target.id
         elif isinstance(target, ast.Attribute):
             # This will give a name like 'obj.x' for an assignment 'obj.x = 5'
-            return f"{self._get_target_name(target.value)}.{target.attr}"
+            return f"{AstAnalyzer._get_target_name(target.value)}.{target.attr}"
         # For simplicity, ignoring other potential types like ast.Subscript
         return None
 
-    def get_global_variables(self) -> List[Dict[str, str]]:
-        results = []
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Global):
-                results.append({"name": node.names[0]})
-            elif isinstance(node, ast.Assign):
-                target_name = self._get_target_name(node.targets[0])
-                if target_name:  # Ignore cases where name is None (like list[0] = 5)
-                    results.append({"name": target_name})
-        return results
-
-    def get_import(self) -> list:
-        results = []
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Import):
-                for n in node.names:
-                    results.append({"name": n.name, "alias": n.asname})
-        return results
-
-    def get_import_from(self) -> list:
-        results = []
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.ImportFrom):
-                for n in node.names:
-                    results.append(
-                        {"name": n.name, "alias": n.asname, "module": node.module}
-                    )
-        return results
+    def get_global_variables(self) -> List[GlobalRecord]:
+        return self._collect(["global_variables"]).global_variables
+
+    def get_import(self) -> List[ImportRecord]:
+        return self._collect(["imports"]).imports
+
+    def get_import_from(self) -> List[ImportFromRecord]:
+        return self._collect(["imports"]).import_froms
 
     def get_module_docstring(self, source_code) -> str:
         tree = ast.parse(source_code)
         return ast.get_docstring(tree, clean=True)
 
     def analyze(
-        self, source_code: str
-    ) -> Dict[str, Union[str, List[Dict[str, Union[str, int, Optional[str]]]]]]:
+        self,
+        source_code: Union[str, bytes],
+        categories: Optional[Iterable[str]] = None,
+        max_nodes: int = 0,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Union[str, List[tuple], None]]:
         """
         Analyze Python source code.
 
+        The source is parsed once and walked once; categories that were not
+        requested are neither collected nor reported.
+
         Args:
-            source_code (str): Python source code as a string.
+            source_code (str or bytes): Python source code, as a string or as the
+                bytes of a file, which the parser decodes according to PEP 263.
+            categories (iterable, optional): Subset of `CATEGORIES` to collect.
+                Defaults to all of them.
+            max_nodes (int, optional): Stop the traversal after this many nodes;
+                0, the default, means no limit.
+            deadline (float, optional): A `time.perf_counter()` value after which
+                the traversal stops, or is not started if parsing took until then.
+
+        When a limit stops the traversal, `truncated` is set to `nodes` or
+        `timeout` and the results hold what was collected before it.
 
         Returns:
-            dict: Analysis results.
+            dict: Analysis results, with lists of `FunctionRecord`, `ClassRecord`,
+                `GlobalRecord` and `ImportRecord`/`ImportFromRecord` tuples.
+                Categories that were not requested are None.
         """
+        categories = set(CATEGORIES if categories is None else categories)
+        self.truncated = None
+        start = time.perf_counter()
         self._parse_code(source_code)
-        self.results = {
-            "header": "",
-            "docstring": self.get_module_docstring(source_code),
-            "functions": self.get_function_names(),
-            "classes": self.get_class_names(),
-            "global_variables": self.get_global_variables(),
-            "imports": self.get_import() + self.get_import_from(),
+        parsed = time.perf_counter()
+
+        if deadline is not None and parsed > deadline:
+            self.truncated = "timeout"
+            collector = _AstCollector(categories)
+        elif categories - {"docstring"}:
+            collector = self._collect(categories, max_nodes, deadline)
+        else:
+            collector = None
+        self.timings = {
+            "parse": parsed - start,
+            "visit": time.perf_counter() - parsed,
         }
 
         self.header = ""
-        self.docstring = self.get_module_docstring(source_code)
-        self.functions = self.get_function_names()
-        self.classes = self.get_class_names()
-        self.global_variables = self.get_global_variables()
-        self.imports = self.get_import() + self.get_import_from()
+        self.docstring = (
+            ast.get_docstring(self.tree, clean=True)
+            if "docstring" in categories
+            else None
+        )
+        self.functions = collector.functions if "functions" in categories else None
+        self.classes = collector.classes if "classes" in categories else None
+        self.global_variables = (
+            collector.global_variables if "global_variables" in categories else None
+        )
+        self.imports = (
+            collector.imports + collector.import_froms
+            if "imports" in categories
+            else None
+        )
 
+        self.results = {
+            "header": self.header,
+            "docstring": self.docstring,
+            "functions": self.functions,
+            "classes": self.classes,
+            "global_variables": self.global_variables,
+            "imports": self.imports,
+        }
         return self.results
@@ -0,0 +1,82 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_IO_CONCURRENCY = 16
+
+
+class AsyncFileReader:
+    """
+    Keeps up to `concurrency` blocking reads in flight on a thread pool.
+
+    Meant for filesystems where every `open()`/`read()` has high latency (NFS,
+    FUSE): the reads overlap while results are still handed out in input order.
+    A read is only started when a slot is free, and a slot is only freed when the
+    consumer takes the oldest result, so at most `concurrency` results are ever
+    held in memory.
+    """
+
+    def __init__(
+        self, read: Callable[[T], R], concurrency: int = DEFAULT_IO_CONCURRENCY
+    ):
+        self.read = read
+        self.concurrency = max(1, concurrency)
+
+    def _read_guarded(self, item):
+        # Exceptions are handed back as values so one failing read does not
+        # cancel the reads queued behind it.
+        try:
+            return self.read(item)
+        except Exception as e:
+            return e
+
+    async def read_many(self, items: Iterable[T]):
+        """Asynchronously yield `(item, read(item))` pairs in input order."""
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = deque()
+            for item in items:
+                pending.append(
+                    (item, loop.run_in_executor(executor, self._read_guarded, item))
+                )
+                if len(pending) >= self.concurrency:
+                    head, future = pending.popleft()
+                    yield head, await future
+            while pending:
+                head, future = pending.popleft()
+                yield head, await future
+
+
+def iter_read_ahead(
+    items: Iterable[T],
+    read: Callable[[T], R],
+    concurrency: int = DEFAULT_IO_CONCURRENCY,
+) -> Iterator[Tuple[T, R]]:
+    """
+    The `iter_read_ahead` function is a synchronous bridge over `AsyncFileReader.read_many`.
+
+    The event loop only runs while the caller waits for the next result, but the reads keep
+    progressing on the pool threads in between, so I/O overlaps with whatever the caller does
+    with each result. `items` is consumed in the caller's thread. A read that raised is yielded
+    as the exception instance.
+
+    :param items: The items to read, typically file paths
+    :param read: The blocking function performing one read
+    :param concurrency: The maximum number of reads in flight
+    :type concurrency: int
+    """
+    loop = asyncio.new_event_loop()
+    results = AsyncFileReader(read, concurrency).read_many(items)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
@@ -0,0 +1,353 @@
+"""
+A compact binary container for analysis results.
+
+Layout (all integers little-endian)::
+
+    header   magic "FIRB", version u16, reserved u16, record count u32,
+             string table offset u64, index offset u64
+    records  one encoded result per file, back to back
+    strings  varint count, then each string as varint length + UTF-8
+    index    per file, sorted by the UTF-8 bytes of its path: record offset u64,
+             record length u32, path offset u32 and path length u32, then the
+             UTF-8 paths back to back (path offsets are relative to them)
+
+Values are encoded with a one-byte tag. Identifier-like strings (names, import
+targets, call targets, dictionary keys) are stored once in the string table and
+referenced by a varint id; other strings, such as docstrings, are stored inline.
+A list of strings that are not all identifiers, such as the head lines of a file,
+is stored as its character lengths followed by one UTF-8 blob, so that it decodes
+in a single call. The fixed-width, sorted index lets `results_store.ResultsStore`
+find a file's record by binary search and decode it without touching the others.
+"""
+
+import sys
+import struct
+from array import array
+from typing import Dict, List, Tuple
+
+MAGIC = b"FIRB"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIQQ")
+INDEX_ENTRY = struct.Struct("<QIII")
+FLOAT = struct.Struct("<d")
+
+# Strings longer than this are stored inline even if they look like identifiers.
+MAX_INTERNED_LENGTH = 128
+
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR_REF = 5
+TAG_STR = 6
+TAG_LIST = 7
+TAG_DICT = 8
+TAG_STR_LIST = 9
+TAG_TABLE = 10
+TAG_MISSING = 11
+
+# Column layouts of a table.
+COLUMN_INT = 0
+COLUMN_REF = 1
+COLUMN_ANY = 2
+INT32_MIN, INT32_MAX = -(2**31), 2**31 - 1
+
+# Placeholder for a key that a row of a table does not have.
+_MISSING = object()
+
+
+class BinaryFormatError(ValueError):
+    """Raised when a results file is not in the expected binary format."""
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _should_intern(value: str) -> bool:
+    return len(value) <= MAX_INTERNED_LENGTH and value.replace(".", "_").isidentifier()
+
+
+def _is_table(value) -> bool:
+    return len(value) > 1 and all(
+        type(item) is dict and all(isinstance(key, str) for key in item)
+        for item in value
+    )
+
+
+def _int_array(values) -> array:
+    column = array("i", values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def _encode_table(rows, strings, out: bytearray):
+    """Encode a list of dictionaries column by column, for lists of similar records."""
+    keys = {}
+    for row in rows:
+        for key in row:
+            keys.setdefault(key, None)
+    out.append(TAG_TABLE)
+    _write_varint(out, len(rows))
+    _write_varint(out, len(keys))
+    for key in keys:
+        _write_varint(out, strings.id_for(key))
+    for key in keys:
+        column = [row.get(key, _MISSING) for row in rows]
+        if all(type(v) is int and INT32_MIN <= v <= INT32_MAX for v in column):
+            out.append(COLUMN_INT)
+            out += _int_array(column).tobytes()
+        elif all(type(v) is str and _should_intern(v) for v in column):
+            out.append(COLUMN_REF)
+            ids = array("I", [strings.id_for(v) for v in column])
+            if sys.byteorder == "big":
+                ids.byteswap()
+            out += ids.tobytes()
+        else:
+            out.append(COLUMN_ANY)
+            for v in column:
+                if v is _MISSING:
+                    out.append(TAG_MISSING)
+                else:
+                    encode_value(v, strings, out)
+
+
+def _decode_table(data, pos: int, strings: List[str]):
+    count, pos = _read_varint(data, pos)
+    key_count, pos = _read_varint(data, pos)
+    keys = []
+    for _ in range(key_count):
+        key_id, pos = _read_varint(data, pos)
+        keys.append(strings[key_id])
+    rows = [{} for _ in range(count)]
+    for key in keys:
+        layout = data[pos]
+        pos += 1
+        if layout == COLUMN_ANY:
+            for row in rows:
+                if data[pos] == TAG_MISSING:
+                    pos += 1
+                else:
+                    row[key], pos = decode_value(data, pos, strings)
+            continue
+        column = array("i" if layout == COLUMN_INT else "I")
+        end = pos + count * column.itemsize
+        column.frombytes(data[pos:end])
+        if sys.byteorder == "big":
+            column.byteswap()
+        pos = end
+        if layout == COLUMN_REF:
+            column = [strings[string_id] for string_id in column]
+        for row, item in zip(rows, column):
+            row[key] = item
+    return rows, pos
+
+
+def _is_text_list(value) -> bool:
+    return (
+        len(value) > 1
+        and all(isinstance(item, str) for item in value)
+        and not all(_should_intern(item) for item in value)
+    )
+
+
+class StringTable:
+    """Assigns ids to interned strings in order of first use."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def id_for(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def encode(self) -> bytes:
+        out = bytearray()
+        _write_varint(out, len(self.strings))
+        for value in self.strings:
+            raw = value.encode("utf-8")
+            _write_varint(out, len(raw))
+            out += raw
+        return bytes(out)
+
+
+def encode_value(value, strings: StringTable, out: bytearray):
+    """Append the tagged encoding of a JSON-compatible `value` to `out`."""
+    if value is None:
+        out.append(TAG_NONE)
+    elif value is True:
+        out.append(TAG_TRUE)
+    elif value is False:
+        out.append(TAG_FALSE)
+    elif isinstance(value, int):
+        out.append(TAG_INT)
+        # Zigzag encoding keeps small negative numbers small.
+        _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif isinstance(value, float):
+        out.append(TAG_FLOAT)
+        out += FLOAT.pack(value)
+    elif isinstance(value, str):
+        if _should_intern(value):
+            out.append(TAG_STR_REF)
+            _write_varint(out, strings.id_for(value))
+        else:
+            raw = value.encode("utf-8", errors="surrogatepass")
+            out.append(TAG_STR)
+            _write_varint(out, len(raw))
+            out += raw
+    elif isinstance(value, (list, tuple)) and _is_table(value):
+        _encode_table(value, strings, out)
+    elif isinstance(value, (list, tuple)) and _is_text_list(value):
+        out.append(TAG_STR_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _write_varint(out, len(item))
+        raw = "".join(value).encode("utf-8", errors="surrogatepass")
+        _write_varint(out, len(raw))
+        out += raw
+    elif isinstance(value, (list, tuple)):
+        out.append(TAG_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            encode_value(item, strings, out)
+    elif isinstance(value, dict):
+        out.append(TAG_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"Dictionary keys must be strings, not {key!r}")
+            _write_varint(out, strings.id_for(key))
+            encode_value(item, strings, out)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} values")
+
+
+def decode_value(data, pos: int, strings: List[str]):
+    """Decode one value from `data` at `pos`, returning `(value, next_pos)`."""
+    # Varints below 128 are a single byte; the loops below inline that common case.
+    tag = data[pos]
+    pos += 1
+    if tag == TAG_STR_REF:
+        string_id = data[pos]
+        if string_id < 0x80:
+            return strings[string_id], pos + 1
+        string_id, pos = _read_varint(data, pos)
+        return strings[string_id], pos
+    if tag == TAG_INT:
+        zigzag = data[pos]
+        if zigzag < 0x80:
+            pos += 1
+        else:
+            zigzag, pos = _read_varint(data, pos)
+        return (zigzag >> 1) ^ -(zigzag & 1), pos
+    if tag == TAG_DICT:
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            key_id = data[pos]
+            if key_id < 0x80:
+                pos += 1
+            else:
+                key_id, pos = _read_varint(data, pos)
+            # Scalars are decoded in place, saving a call per dictionary entry.
+            tag = data[pos]
+            if tag == TAG_STR_REF and data[pos + 1] < 0x80:
+                result[strings[key_id]] = strings[data[pos + 1]]
+                pos += 2
+            elif tag == TAG_INT and data[pos + 1] < 0x80:
+                zigzag = data[pos + 1]
+                result[strings[key_id]] = (zigzag >> 1) ^ -(zigzag & 1)
+                pos += 2
+            else:
+                result[strings[key_id]], pos = decode_value(data, pos, strings)
+        return result, pos
+    if tag == TAG_LIST:
+        count, pos = _read_varint(data, pos)
+        result = []
+        append = result.append
+        for _ in range(count):
+            if data[pos] == TAG_STR_REF and data[pos + 1] < 0x80:
+                append(strings[data[pos + 1]])
+                pos += 2
+            else:
+                item, pos = decode_value(data, pos, strings)
+                append(item)
+        return result, pos
+    if tag == TAG_TABLE:
+        return _decode_table(data, pos, strings)
+    if tag == TAG_STR_LIST:
+        count, pos = _read_varint(data, pos)
+        lengths = []
+        for _ in range(count):
+            length, pos = _read_varint(data, pos)
+            lengths.append(length)
+        size, pos = _read_varint(data, pos)
+        end = pos + size
+        text = str(data[pos:end], "utf-8", "surrogatepass")
+        result = []
+        start = 0
+        for length in lengths:
+            result.append(text[start : start + length])
+            start += length
+        return result, end
+    if tag == TAG_STR:
+        length, pos = _read_varint(data, pos)
+        end = pos + length
+        return str(data[pos:end], "utf-8", "surrogatepass"), end
+    if tag == TAG_NONE:
+        return None, pos
+    if tag == TAG_TRUE:
+        return True, pos
+    if tag == TAG_FALSE:
+        return False, pos
+    if tag == TAG_FLOAT:
+        return FLOAT.unpack_from(data, pos)[0], pos + FLOAT.size
+    raise BinaryFormatError(f"Unknown value tag {tag} at offset {pos - 1}")
+
+
+def encode_index(entries: List[Tuple[str, int, int]]) -> bytes:
+    """
+    Encode `(path, offset, length)` index entries as fixed-width entries sorted by the
+    UTF-8 bytes of their path, followed by the paths themselves.
+    """
+    encoded = sorted(
+        (path.encode("utf-8", errors="surrogatepass"), offset, length)
+        for path, offset, length in entries
+    )
+    out = bytearray()
+    paths = bytearray()
+    for raw, offset, length in encoded:
+        out += INDEX_ENTRY.pack(offset, length, len(paths), len(raw))
+        paths += raw
+    return bytes(out + paths)
+
+
+def decode_strings(data) -> List[str]:
+    count, pos = _read_varint(data, 0)
+    strings = []
+    for _ in range(count):
+        length, pos = _read_varint(data, pos)
+        strings.append(str(data[pos : pos + length], "utf-8"))
+        pos += length
+    return strings
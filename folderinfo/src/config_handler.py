@@ -7,8 +7,6 @@ from io import StringIO
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_CONFIG_PATH = os.path.join(BASE_DIR, "default_config.ini")
 
-logging.basicConfig(level=logging.INFO)
-
 
 class ConfigHandler:
     """Handles reading configurations from files and environment variables."""
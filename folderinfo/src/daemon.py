@@ -0,0 +1,198 @@
+import os
+import json
+import logging
+import socketserver
+from typing import Optional
+
+from .daemon_client import DaemonClient, DaemonError, default_socket_path
+from .config_handler import ConfigHandler
+from .file_processor import FileProcessor
+from .analysis_cache import AnalysisCache, CacheStats, default_cache_dir
+from .discovery import DiscoveryCache
+from .output_writers import get_writer, read_results
+from .project_summary import ProjectSummary
+from .token_budget import TokenBudget
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                result = self.server.dispatch(
+                    request["command"], request.get("args", {}), request.get("cwd")
+                )
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                logging.warning(f"Daemon request failed: {e}")
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class AnalysisDaemon(socketserver.UnixStreamServer):
+    """
+    A local server that answers `generate`, `analyze` and `summary` requests while keeping the
+    parsed configuration, the `FileProcessor`, the discovered file lists (see `DiscoveryCache`)
+    and the open analysis cache in memory between them.
+
+    Requests are handled one at a time, which keeps the per-run state of the processor and the
+    SQLite cache connection on a single thread. The cache is committed at the end of every
+    request, so other runs on the same cache directory are not locked out. A processor is rebuilt when its configuration
+    file changes on disk.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self.socket_path = socket_path or default_socket_path()
+        if os.path.exists(self.socket_path):
+            if DaemonClient(self.socket_path).is_running():
+                raise OSError(f"A daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        self._processors = {}
+        self._caches = {}
+        self.discovery_cache = DiscoveryCache()
+        self._shutdown_requested = False
+        previous_umask = os.umask(0o077)
+        try:
+            super().__init__(self.socket_path, _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def serve(self):
+        """Serve until a `shutdown` request arrives, then remove the socket."""
+        try:
+            while not self._shutdown_requested:
+                self.handle_request()
+        finally:
+            self.close()
+
+    def close(self):
+        self.server_close()
+        for cache in self._caches.values():
+            cache.close()
+        self._caches.clear()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def dispatch(self, command: str, args: dict, cwd: Optional[str] = None):
+        handler = getattr(self, f"_handle_{command}", None)
+        if handler is None:
+            raise ValueError(f"Unknown command: {command}")
+        # Requests are served one at a time, so the working directory can follow the client.
+        home = os.getcwd()
+        os.chdir(cwd or home)
+        try:
+            return handler(**args)
+        finally:
+            os.chdir(home)
+
+    def _processor(self, config: str, overrides=()) -> FileProcessor:
+        config = os.path.abspath(config)
+        mtime_ns = os.stat(config).st_mtime_ns if os.path.exists(config) else None
+        key = (config, mtime_ns, tuple(map(tuple, overrides)))
+        processor = self._processors.get(key)
+        if processor is None:
+            # Drop processors built from an older version of the same file.
+            for stale in [k for k in self._processors if k[0] == config]:
+                del self._processors[stale]
+            config_handler = ConfigHandler(config)
+            for section, option, value in overrides:
+                config_handler.config.set(section, option, value)
+            processor = self._processors[key] = FileProcessor(config_handler)
+            processor.discovery_cache = self.discovery_cache
+        return processor
+
+    def _cache(self, processor: FileProcessor, cache_dir=None, rebuild=False):
+        cache_dir = os.path.abspath(
+            cache_dir
+            or processor.config.get("Cache", "Directory", fallback=None)
+            or default_cache_dir()
+        )
+        fingerprint = processor.config_fingerprint()
+        key = (fingerprint, cache_dir)
+        cache = self._caches.get(key)
+        if cache is None or rebuild:
+            if cache is not None:
+                cache.close()
+            cache = self._caches[key] = AnalysisCache.from_config(
+                processor.config, fingerprint, cache_dir=cache_dir, rebuild=rebuild
+            )
+        cache.stats = CacheStats()
+        return cache
+
+    def _handle_ping(self):
+        return {"pid": os.getpid()}
+
+    def _handle_shutdown(self):
+        self._shutdown_requested = True
+        return {"pid": os.getpid()}
+
+    def _handle_generate(
+        self, config, directory, output, fmt=None, manifest=None, overrides=()
+    ):
+        processor = self._processor(config, overrides)
+        processor.generate_file_list(directory, output, fmt, manifest)
+        return {"output": output}
+
+    def _handle_analyze(
+        self,
+        config,
+        file_list=None,
+        directory=None,
+        jobs=1,
+        io_concurrency=1,
+        output=None,
+        fmt="text",
+        cache_dir=None,
+        no_cache=False,
+        rebuild_cache=False,
+        token_budget=None,
+    ):
+        processor = self._processor(config)
+        cache = None if no_cache else self._cache(processor, cache_dir, rebuild_cache)
+        writer = get_writer(fmt, output, directory) if output else None
+        budget = None
+        if token_budget is not None:
+            budget = TokenBudget(token_budget, processor.specified_files, directory)
+        stream = writer is not None and budget is None
+        options = dict(
+            jobs=jobs,
+            cache=cache,
+            writer=writer if stream else None,
+            retain=not stream,
+            io_concurrency=io_concurrency,
+        )
+        try:
+            if directory:
+                analysis = processor.analyze_directory(directory, **options)
+            else:
+                analysis = processor.analyze_from_list(file_list, **options)
+            if budget is not None:
+                analysis = budget.select(analysis)
+                if writer is not None:
+                    for file_path, result in analysis.items():
+                        writer.write(file_path, result)
+        finally:
+            if writer is not None:
+                writer.close()
+            # Runs outside the daemon may share the cache, so none of it stays locked between
+            # requests.
+            if cache is not None:
+                cache.flush()
+        return {
+            "analysis": None if writer is not None else analysis,
+            "count": writer.count if writer is not None else len(analysis),
+            "cache": str(cache.stats) if cache is not None else None,
+            "budget": str(budget) if budget is not None else None,
+        }
+
+    def _handle_summary(
+        self, config, directory, lines=True, top=10, depth=1, results=None
+    ):
+        processor = self._processor(config)
+        analysis = read_results(results, directory) if results else None
+        return ProjectSummary(directory, processor.config, processor).collect(
+            lines=lines, top=top, depth=depth, results=analysis
+        )
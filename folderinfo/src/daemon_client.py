@@ -0,0 +1,83 @@
+import os
+import json
+import socket
+from typing import Optional
+
+SOCKET_ENV_VAR = "FOLDERINFO_SOCKET"
+# Seconds a client waits for the daemon to accept before running the command itself.
+CONNECT_TIMEOUT = 0.5
+
+
+def default_socket_path() -> str:
+    """Return `$FOLDERINFO_SOCKET`, or a per-user socket under `$XDG_RUNTIME_DIR` or the temp dir."""
+    if os.environ.get(SOCKET_ENV_VAR):
+        return os.environ[SOCKET_ENV_VAR]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "folderinfo.sock")
+    import tempfile
+
+    return os.path.join(tempfile.gettempdir(), f"folderinfo-{os.getuid()}.sock")
+
+
+class DaemonError(Exception):
+    """Raised by `DaemonClient.request` when the daemon reports a failed request."""
+
+
+class DaemonClient:
+    """
+    Sends requests to a running `folderinfo serve` daemon.
+
+    Each request is a single JSON line `{"command": ..., "args": {...}, "cwd": ...}`
+    answered by a single JSON line `{"ok": true, "result": ...}` or
+    `{"ok": false, "error": ...}`. The daemon runs the request from the client's working
+    directory, so relative paths in the arguments and the output are the same as when
+    the command runs in the client.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self.socket_path = socket_path or default_socket_path()
+
+    def _connect(self) -> Optional[socket.socket]:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            return None
+        sock.settimeout(None)
+        return sock
+
+    def is_running(self) -> bool:
+        sock = self._connect()
+        if sock is None:
+            return False
+        sock.close()
+        return True
+
+    def request(self, command: str, **args):
+        """
+        The `request` function sends one request and waits for its response.
+
+        :param command: The `command` parameter is one of `ping`, `generate`, `analyze`, `summary`
+        or `shutdown`
+        :type command: str
+        :return: the result of the request, or None when no daemon is listening.
+        :raises DaemonError: if the daemon could not carry out the request.
+        """
+        sock = self._connect()
+        if sock is None:
+            return None
+        with sock, sock.makefile("rwb") as stream:
+            request = {"command": command, "args": args, "cwd": os.getcwd()}
+            stream.write(json.dumps(request).encode("utf-8"))
+            stream.write(b"\n")
+            stream.flush()
+            line = stream.readline()
+        if not line:
+            raise DaemonError("The daemon closed the connection.")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error", "Unknown daemon error."))
+        return response.get("result")
@@ -0,0 +1,268 @@
+import os
+import re
+import time
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Directories whose file lists a `DiscoveryCache` keeps at most.
+DEFAULT_CACHED_DIRECTORIES = 16
+# A directory modified this close to the start of a walk may have changed during it
+# without its mtime showing it, as with git's "racily clean" entries.
+RACY_WINDOW_NS = 1_000_000_000
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression matching a relative path."""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex.append("/.*")
+            i += 3
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                body = pattern[i + 1 : end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex.append(f"[{body}]")
+                i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(regex)
+
+
+class GitIgnore:
+    """
+    The rules of a single `.gitignore` file, matched against paths relative to it.
+
+    Supports the common subset of the format: comments, `!` negation, trailing `/`
+    for directory-only rules, leading or inner `/` for anchored rules, and `*`,
+    `?`, `[...]` and `**` globs. As in git, the last matching rule wins.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            if "/" in line:
+                regex = _translate(line.lstrip("/"))
+            else:
+                regex = "(?:.*/)?" + _translate(line)
+            self.rules.append((re.compile(regex + r"\Z"), negate, dir_only))
+
+    @classmethod
+    def from_file(cls, path: str) -> "GitIgnore":
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return cls(f)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Return True if the path is ignored, False if a negated rule re-includes it, or None if
+        no rule applies.
+        """
+        verdict = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                verdict = not negate
+        return verdict
+
+
+def _is_gitignored(matchers: List[tuple], path: str, is_dir: bool) -> bool:
+    ignored = False
+    for base, gitignore in matchers:
+        verdict = gitignore.match(
+            os.path.relpath(path, base).replace(os.sep, "/"), is_dir
+        )
+        if verdict is not None:
+            ignored = verdict
+    return ignored
+
+
+def iter_files(
+    directory: str,
+    ignored_dirs: Iterable[str] = (),
+    ignored_files: Iterable[str] = (),
+    file_types: Iterable[str] = (),
+    specified_files: Iterable[str] = (),
+    use_gitignore: bool = False,
+    on_directory: Optional[Callable[[str], None]] = None,
+) -> Iterator[str]:
+    """
+    The `iter_files` function walks a directory with `os.scandir` and yields the paths of the files
+    selected by the `Ignores`, `IgnoredFiles`, `FileTypes` and `SpecifiedFiles` settings.
+
+    Ignored directories are pruned before they are entered, entry types come from the cached
+    `DirEntry` data instead of an extra stat per path, and every filter is a set lookup. Entries
+    are visited in name order so the output is stable between runs.
+
+    :param directory: The directory to walk
+    :type directory: str
+    :param ignored_dirs: Directory names that are never entered, at any depth
+    :param ignored_files: File names that are never reported
+    :param file_types: File suffixes (including the dot) to report
+    :param specified_files: File names to report whatever their suffix
+    :param use_gitignore: Also skip `.git` and the paths matched by `.gitignore` files found during
+    the walk
+    :type use_gitignore: bool (optional)
+    :param on_directory: Called with the path of every directory before it is listed
+    :return: an iterator over the selected file paths, each joined onto `directory`.
+    """
+    ignored_dirs = set(ignored_dirs)
+    ignored_files = set(ignored_files)
+    file_types = set(file_types)
+    specified_files = set(specified_files)
+
+    stack = [(str(Path(directory)), [])]
+    while stack:
+        current, matchers = stack.pop()
+        if on_directory is not None:
+            on_directory(current)
+        gitignore_path = os.path.join(current, ".gitignore")
+        if use_gitignore and os.path.isfile(gitignore_path):
+            matchers = matchers + [(current, GitIgnore.from_file(gitignore_path))]
+
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logging.warning(f"Skipping unreadable directory {current}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if name in ignored_dirs or (use_gitignore and name == ".git"):
+                    continue
+                if matchers and _is_gitignored(matchers, entry.path, True):
+                    continue
+                subdirs.append(entry.path)
+                continue
+            if name in ignored_files:
+                continue
+            if (
+                name not in specified_files
+                and os.path.splitext(name)[1] not in file_types
+            ):
+                continue
+            if matchers and _is_gitignored(matchers, entry.path, False):
+                continue
+            yield entry.path
+
+        stack.extend((subdir, matchers) for subdir in reversed(subdirs))
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class _CachedListing:
+    def __init__(self, files: List[str], watched: Dict[str, Optional[int]], git_index):
+        self.files = files
+        self.watched = watched
+        self.git_index = git_index
+
+    def is_fresh(self) -> bool:
+        return all(_mtime_ns(path) == mtime for path, mtime in self.watched.items())
+
+
+class DiscoveryCache:
+    """
+    The file lists of recent `FileProcessor.discover_files` calls, kept between requests by a
+    long-running process such as the daemon.
+
+    Lists are keyed by the directory, both as given and resolved, and by the discovery settings.
+    A list is reused while the mtimes of every directory the walk visited, and of the
+    `.gitignore` files it read, are unchanged: adding, removing or renaming a file changes the
+    mtime of its directory, and the filters only look at names. Lists read from a git index are
+    reused while the index file is unchanged. Walks that saw a directory modified within
+    `RACY_WINDOW_NS` of their start are not kept, since a change during the walk could be missed.
+    """
+
+    def __init__(self, max_directories: int = DEFAULT_CACHED_DIRECTORIES):
+        self.max_directories = max_directories
+        self.hits = 0
+        self.misses = 0
+        self._listings = OrderedDict()
+
+    def files(self, processor, directory: str) -> Iterator[str]:
+        """Return the files `processor` discovers under `directory`, walking it only if it changed."""
+        key = (
+            os.path.realpath(directory),
+            directory,
+            processor.discovery,
+            processor.use_gitignore,
+            tuple(sorted(processor.ignored_dirs)),
+            tuple(sorted(processor.ignored_files)),
+            tuple(sorted(processor.file_types)),
+            tuple(sorted(processor.specified_files)),
+        )
+        listing = self._listings.get(key)
+        if listing is not None and listing.is_fresh():
+            self.hits += 1
+            self._listings.move_to_end(key)
+            processor.git_index = listing.git_index
+            return iter(listing.files)
+
+        self.misses += 1
+        started = time.time_ns()
+        watched = {}
+
+        def on_directory(path):
+            watched[path] = _mtime_ns(path)
+            if processor.use_gitignore:
+                gitignore_path = os.path.join(path, ".gitignore")
+                watched[gitignore_path] = _mtime_ns(gitignore_path)
+
+        files = list(processor.walk_files(directory, on_directory))
+        if processor.git_index is not None:
+            watched = {
+                processor.git_index.index_path: _mtime_ns(
+                    processor.git_index.index_path
+                )
+            }
+        racy = any(
+            mtime is not None and mtime >= started - RACY_WINDOW_NS
+            for mtime in watched.values()
+        )
+        if racy:
+            self._listings.pop(key, None)
+        else:
+            self._listings[key] = _CachedListing(files, watched, processor.git_index)
+            self._listings.move_to_end(key)
+            while len(self._listings) > self.max_directories:
+                self._listings.popitem(last=False)
+        return iter(files)
@@ -0,0 +1,64 @@
+import json
+from typing import Iterable, Iterator, Optional
+
+FORMATS = ("json", "jsonl")
+
+
+def infer_format(file_list_path: str, fmt: Optional[str] = None) -> str:
+    """Return the explicit format, or guess it from the file extension."""
+    if fmt:
+        return fmt
+    return "jsonl" if file_list_path.endswith(".jsonl") else "json"
+
+
+def write_file_list(
+    paths: Iterable[str], output_file: str, fmt: Optional[str] = None
+) -> int:
+    """
+    The `write_file_list` function writes file paths as they are produced, either as a JSON array
+    or as JSON Lines (one JSON string per line), without collecting them first.
+
+    :param paths: The file paths to write, typically a discovery generator
+    :type paths: Iterable[str]
+    :param output_file: The path of the file list to write
+    :type output_file: str
+    :param fmt: `"json"` or `"jsonl"`; guessed from the extension of `output_file` when omitted
+    :type fmt: str (optional)
+    :return: the number of paths written.
+    """
+    fmt = infer_format(output_file, fmt)
+    count = 0
+    with open(output_file, "w", encoding="utf-8") as f:
+        if fmt == "jsonl":
+            for path in paths:
+                f.write(json.dumps(path) + "\n")
+                count += 1
+        else:
+            f.write("[")
+            for path in paths:
+                f.write(", " if count else "")
+                f.write(json.dumps(path))
+                count += 1
+            f.write("]")
+    return count
+
+
+def iter_file_list(file_list_path: str) -> Iterator[str]:
+    """
+    The `iter_file_list` function yields the paths stored in a file list. JSON Lines lists are read
+    one line at a time; JSON array lists, the original format, are loaded in one go.
+
+    :param file_list_path: The path of a file list written by `write_file_list`
+    :type file_list_path: str
+    """
+    with open(file_list_path, "r", encoding="utf-8") as f:
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == "[":
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -1,11 +1,66 @@
 import os
 import json
+import hashlib
+import time
 import logging
+from collections import deque
+from itertools import islice
 from .ast_analyzer import AstAnalyzer
+from .discovery import iter_files
+from .git_index import GitIndex
+from .file_list import iter_file_list, write_file_list
+from .file_reader import (
+    DEFAULT_MAX_HEAD_BYTES,
+    SNIFF_BYTES,
+    BinaryFileError,
+    comment_syntax_for,
+    detect_encoding,
+    extract_head,
+    is_decoding_error,
+    iter_head_lines,
+    iter_lines,
+    read_bytes,
+    source_for_parser,
+)
+from .line_counter import count_file_lines, count_lines
+from .instrumentation import RunStats
+from .manifest import write_manifest
+from .output_writers import TextReportWriter
 from . import utils
 
 from pathlib import Path
 
+# Each pool worker receives a copy of the FileProcessor once and reuses it per chunk.
+_worker_processor = None
+
+
+def _init_worker(processor):
+    global _worker_processor
+    _worker_processor = processor
+
+
+def _process_chunk_in_worker(file_paths):
+    _worker_processor.stats = RunStats()
+    results = [_worker_processor._process_file_safe(path) for path in file_paths]
+    return results, _worker_processor.stats
+
+
+def _cacheable(result: dict) -> bool:
+    """Errors and timeouts depend on the run, not only on the file, so they are not cached."""
+    return "error" not in result and result.get("truncated") != "timeout"
+
+
+# Values of `[Main] Discovery`.
+DISCOVERY_BACKENDS = ("filesystem", "git")
+
+# Chunk size used when the number of files is not known up front.
+DEFAULT_CHUNKSIZE = 32
+
+# Defaults of the `[Main]` limits on AST analysis; 0 turns a limit off.
+DEFAULT_MAX_PARSE_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_AST_NODES = 2_000_000
+DEFAULT_PARSE_TIMEOUT = 30.0
+
 
 class FileProcessor:
     def __init__(self, config):
@@ -14,8 +69,21 @@ class FileProcessor:
 
         self.ast_analyzer = AstAnalyzer()
         self.analysis = None
+        self.git_index = None
+        # An optional `DiscoveryCache` that keeps discovered file lists between calls.
+        self.discovery_cache = None
+        self.stats = RunStats()
         # Add more settings here as needed
 
+    def __getstate__(self):
+        """Drop per-run state so the processor can be shipped to worker processes."""
+        state = self.__dict__.copy()
+        state["analysis"] = None
+        state["ast_analyzer"] = AstAnalyzer()
+        state["stats"] = RunStats()
+        state["discovery_cache"] = None
+        return state
+
     def _initialize_settings_from_config(self):
         """Extract settings from config and set as instance variables."""
         try:
@@ -26,6 +94,29 @@ class FileProcessor:
                 self.config.get("Main", "SpecifiedFiles").split(",")
             )
             self.ignored_files = set(self.config.get("Main", "IgnoredFiles").split(","))
+            self.use_gitignore = utils.str_to_bool(
+                self.config.get("Main", "UseGitignore", fallback=False)
+            )
+            self.discovery = self.config.get("Main", "Discovery", fallback="filesystem")
+            if self.discovery not in DISCOVERY_BACKENDS:
+                raise ValueError(f"Unknown discovery backend: {self.discovery}")
+            self.max_head_bytes = int(
+                self.config.get("Main", "MaxHeadBytes", fallback=DEFAULT_MAX_HEAD_BYTES)
+            )
+            self.count_lines = utils.str_to_bool(
+                self.config.get("Main", "CountLines", fallback=False)
+            )
+            self.max_parse_bytes = int(
+                self.config.get(
+                    "Main", "MaxParseBytes", fallback=DEFAULT_MAX_PARSE_BYTES
+                )
+            )
+            self.max_ast_nodes = int(
+                self.config.get("Main", "MaxAstNodes", fallback=DEFAULT_MAX_AST_NODES)
+            )
+            self.parse_timeout = float(
+                self.config.get("Main", "ParseTimeout", fallback=DEFAULT_PARSE_TIMEOUT)
+            )
             self.analyze_function_names = self.config.get(
                 "AST", "AnalyzeFunctionNames", fallback=False
             )
@@ -44,10 +135,38 @@ class FileProcessor:
             self.analyze_class_names = self.config.get(
                 "AST", "AnalyzeClasses", fallback=False
             )
+            # Only the categories requested above are collected by the AST analyzer.
+            self.ast_categories = {
+                category
+                for category, enabled in (
+                    ("functions", self.analyze_function_names),
+                    ("global_variables", self.analyze_global_variables),
+                    ("imports", self.analyze_imports),
+                    ("docstring", self.analyze_docstring),
+                    ("classes", self.analyze_class_names),
+                )
+                if enabled
+            }
         except Exception as e:
             logging.error(f"Error initializing settings from config: {e}")
             raise
 
+    def config_fingerprint(self) -> str:
+        """Return a digest of the settings that shape a file's result, for cache keys."""
+        settings = {
+            "lines_to_read": self.lines_to_read,
+            "max_head_bytes": self.max_head_bytes,
+            "count_lines": self.count_lines,
+            "max_parse_bytes": self.max_parse_bytes,
+            "max_ast_nodes": self.max_ast_nodes,
+            "parse_timeout": self.parse_timeout,
+            "specified_files": sorted(self.specified_files),
+            "ast_categories": sorted(self.ast_categories),
+        }
+        return hashlib.sha1(
+            json.dumps(settings, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
     def set_lines_to_read(self, lines: int):
         """Set the number of lines to read for analysis."""
         self.lines_to_read = lines
@@ -56,7 +175,64 @@ class FileProcessor:
         """Set the file types to be considered for analysis."""
         self.file_types = types
 
-    def generate_file_list(self, directory: str, output_file="file_list.json"):
+    def discover_files(self, directory: str):
+        """
+        The `discover_files` function lazily yields the files under `directory` that the configured
+        `Ignores`, `IgnoredFiles`, `FileTypes` and `SpecifiedFiles` settings select.
+
+        With `[Main] Discovery = git` the tracked files are listed from the repository's index
+        instead of walking the directory, and the index is kept in `git_index` so its blob hashes
+        can stand in for content digests. Outside a repository it falls back to the walk.
+
+        With a `discovery_cache`, a list discovered earlier is reused while the directory is
+        unchanged.
+
+        :param directory: The `directory` parameter is the path of the directory to walk
+        :type directory: str
+        """
+        if self.discovery_cache is not None:
+            return self.discovery_cache.files(self, directory)
+        return self.walk_files(directory)
+
+    def walk_files(self, directory: str, on_directory=None):
+        """
+        The `walk_files` function is `discover_files` without the `discovery_cache`: it always lists
+        the directory, or the git index, again.
+
+        :param directory: The `directory` parameter is the path of the directory to walk
+        :type directory: str
+        :param on_directory: The `on_directory` parameter is called with every directory the walk
+        lists; it is not called when the files come from a git index
+        """
+        self.git_index = None
+        if self.discovery == "git":
+            self.git_index = GitIndex.find(directory)
+            if self.git_index is not None:
+                return self.git_index.iter_files(
+                    directory,
+                    ignored_dirs=self.ignored_dirs,
+                    ignored_files=self.ignored_files,
+                    file_types=self.file_types,
+                    specified_files=self.specified_files,
+                )
+            logging.warning(f"No git index found for {directory}, walking it instead.")
+        return iter_files(
+            directory,
+            ignored_dirs=self.ignored_dirs,
+            ignored_files=self.ignored_files,
+            file_types=self.file_types,
+            specified_files=self.specified_files,
+            use_gitignore=self.use_gitignore,
+            on_directory=on_directory,
+        )
+
+    def generate_file_list(
+        self,
+        directory: str,
+        output_file="file_list.json",
+        fmt: str = None,
+        manifest_file: str = None,
+    ):
         """
         The `generate_file_list` function takes a directory path as input, generates a list of files in that
         directory (excluding ignored files and directories), and saves the list to a JSON file.
@@ -67,56 +243,253 @@ class FileProcessor:
         :param output_file: The `output_file` parameter is a string that specifies the name of the file
         where the generated file list will be saved. By default, it is set to "file_list.json", defaults to
         file_list.json (optional)
+        :param fmt: The `fmt` parameter is either `"json"` (a JSON array) or `"jsonl"` (one path per
+        line). When omitted it is guessed from the extension of `output_file`
+        :type fmt: str (optional)
+        :param manifest_file: The `manifest_file` parameter is an optional path where the size, mtime
+        and hash of every listed file are recorded, for a later `analyze --since`. An existing
+        manifest there is updated, re-hashing only the files whose size or mtime changed
+        :type manifest_file: str (optional)
         :return: the name of the output file that was generated.
         """
-        directory_path = Path(directory)
-        file_list = []
-
-        for file_path in directory_path.rglob("*"):
-            if file_path.is_dir() or file_path.name in self.ignored_files:
-                continue
-            if any(
-                ignored_dir in str(file_path.parts) for ignored_dir in self.ignored_dirs
-            ):
-                continue
-            if (
-                file_path.name in self.specified_files
-                or file_path.suffix in self.file_types
-            ):
-                file_list.append(str(file_path))
-
-        with open(output_file, "w") as f:
-            json.dump(file_list, f)
-
-        logging.info(f"Generated file list saved to {output_file}.")
+        paths = self.discover_files(directory)
+        if manifest_file:
+            paths = write_manifest(
+                paths,
+                manifest_file,
+                known_digests=self.git_index,
+                fingerprint=self.config_fingerprint(),
+            )
+        count = write_file_list(paths, output_file, fmt)
+
+        logging.info(f"Generated file list of {count} files saved to {output_file}.")
         return output_file
 
-    def analyze_from_list(self, file_list_path: str):
+    def analyze_from_list(
+        self,
+        file_list_path: str,
+        jobs: int = 1,
+        cache=None,
+        writer=None,
+        retain: bool = True,
+        io_concurrency: int = 1,
+        incremental=None,
+        index=None,
+    ):
         """
         The `analyze_from_list` function analyzes specific lines from files in a provided list and returns
         the results.
 
         :param file_list_path: The `file_list_path` parameter is a string that represents the path to a file
-        containing a list of file paths. This file should be in JSON format
+        containing a list of file paths, either as a JSON array or as JSON Lines
         :type file_list_path: str
+        :param jobs: The `jobs` parameter is the number of worker processes used to analyze the files.
+        `1` (the default) analyzes them serially in this process and `0` uses one worker per CPU
+        :type jobs: int (optional)
+        :param cache: The `cache` parameter is an optional `AnalysisCache`. Files it reports as
+        unchanged are served from it without being read, and new results are stored in it
+        :type cache: AnalysisCache (optional)
+        :param writer: The `writer` parameter is an optional `AnalysisWriter` that receives each
+        result as soon as its file is analyzed
+        :type writer: AnalysisWriter (optional)
+        :param retain: The `retain` parameter controls whether results are also kept in memory. Set it
+        to False together with a `writer` to analyze any number of files in constant memory
+        :type retain: bool (optional)
+        :param io_concurrency: The `io_concurrency` parameter is the number of reads kept in flight
+        ahead of a serial analysis, for slow or network filesystems
+        :type io_concurrency: int (optional)
+        :param incremental: The `incremental` parameter is an optional `IncrementalAnalysis`. Only
+        files changed since its manifest are analyzed; the others keep their previous results
+        :type incremental: IncrementalAnalysis (optional)
+        :param index: The `index` parameter is an optional `ImportGraphBuilder` that records the imports,
+        functions and calls of each result for the cross-file import graph
+        :type index: ImportGraphBuilder (optional)
         :return: The method `analyze_from_list` returns the `results` dictionary, which contains the
-        analysis results for each file in the provided list.
+        analysis results for each file in the provided list, in the order of the list. It is empty
+        when `retain` is False.
+        """
+        return self._collect_analysis(
+            iter_file_list(file_list_path),
+            jobs,
+            cache,
+            writer,
+            retain,
+            io_concurrency,
+            incremental,
+            index,
+        )
+
+    def analyze_directory(
+        self,
+        directory: str,
+        jobs: int = 1,
+        cache=None,
+        writer=None,
+        retain: bool = True,
+        io_concurrency: int = 1,
+        incremental=None,
+        index=None,
+    ):
         """
+        The `analyze_directory` function discovers and analyzes the files under `directory` in one
+        pipeline, so analysis starts on the first file while the walk is still running.
+
+        :param directory: The `directory` parameter is the path of the directory to analyze
+        :type directory: str
+        :param jobs: The `jobs` parameter is the number of worker processes, as in `analyze_from_list`
+        :type jobs: int (optional)
+        :param cache: The `cache` parameter is an optional `AnalysisCache`
+        :type cache: AnalysisCache (optional)
+        :param writer: The `writer` parameter is an optional `AnalysisWriter`, as in `analyze_from_list`
+        :type writer: AnalysisWriter (optional)
+        :param retain: The `retain` parameter controls whether results are also kept in memory
+        :type retain: bool (optional)
+        :param io_concurrency: The `io_concurrency` parameter is as in `analyze_from_list`
+        :type io_concurrency: int (optional)
+        :param incremental: The `incremental` parameter is as in `analyze_from_list`
+        :type incremental: IncrementalAnalysis (optional)
+        :param index: The `index` parameter is as in `analyze_from_list`
+        :type index: ImportGraphBuilder (optional)
+        :return: the `results` dictionary, in discovery order, empty when `retain` is False.
+        """
+        return self._collect_analysis(
+            self.discover_files(directory),
+            jobs,
+            cache,
+            writer,
+            retain,
+            io_concurrency,
+            incremental,
+            index,
+        )
+
+    def _collect_analysis(
+        self,
+        files,
+        jobs: int = 1,
+        cache=None,
+        writer=None,
+        retain: bool = True,
+        io_concurrency: int = 1,
+        incremental=None,
+        index=None,
+    ):
         results = {}
+        count = 0
+        self.stats = RunStats()
+        options = dict(jobs=jobs, cache=cache, io_concurrency=io_concurrency)
+        if incremental is not None:
+            analysis = incremental.run(self, files, **options)
+        else:
+            analysis = self.iter_analysis(files, **options)
         try:
-            with open(file_list_path, "r", encoding="utf-8") as f:
-                files = json.load(f)
+            for file_path, file_result in analysis:
+                if writer is not None:
+                    with self.stats.stage("write"):
+                        writer.write(file_path, file_result)
+                if index is not None:
+                    index.add(file_path, file_result)
+                if retain:
+                    results[file_path] = file_result
+                count += 1
 
-            for file_path in files:
-                file_result = self._process_file(file_path)
-                results[file_path] = file_result
-
-            logging.info(f"Analysis complete for {len(files)} files.")
-            self.analysis = results
+            logging.info(f"Analysis complete for {count} files.")
+            self.analysis = results if retain else None
         except Exception as e:
             logging.error(f"Error during analysis: {e}")
+        self.stats.log_summary()
         return results
 
+    def _cache_hit(self, cache, file_path: str) -> bool:
+        if cache is None:
+            return False
+        with self.stats.stage("stat"):
+            hit = cache.is_fresh(file_path)
+        if hit:
+            self.stats.count("cache_hits")
+        return hit
+
+    def iter_analysis(self, files, jobs: int = 1, cache=None, io_concurrency: int = 1):
+        """
+        The `iter_analysis` function lazily yields `(file_path, result)` pairs for an iterable of file
+        paths, in order. Files are pulled from `files` only as fast as they are analyzed, so the input
+        can be a generator that is still discovering files.
+
+        :param files: The `files` parameter is an iterable of file paths to process
+        :param jobs: The `jobs` parameter is the number of worker processes, `0` meaning one per CPU
+        :type jobs: int
+        :param cache: The `cache` parameter is an optional `AnalysisCache`. Unchanged files are served
+        from it and new results are stored in it
+        :type cache: AnalysisCache
+        :param io_concurrency: The `io_concurrency` parameter is the number of file reads kept in flight
+        ahead of the analysis when running in this process. Values above 1 hide the latency of slow
+        or network filesystems. Worker processes already overlap their reads, so it is ignored when
+        `jobs` is above 1
+        :type io_concurrency: int
+        """
+        jobs = jobs or os.cpu_count() or 1
+        if cache is not None and self.git_index is not None:
+            cache.known_digests = self.git_index
+        if isinstance(files, (list, tuple)):
+            jobs = max(1, min(jobs, len(files)))
+            # Several chunks per worker keeps the pool balanced without paying IPC per file.
+            chunksize = max(1, len(files) // (jobs * 4))
+        else:
+            chunksize = DEFAULT_CHUNKSIZE
+        files = self.stats.timed_iter("discover", files)
+        if jobs == 1:
+            checked = ((path, self._cache_hit(cache, path)) for path in files)
+            if io_concurrency > 1:
+                # asyncio is only imported by runs that read ahead.
+                from .async_reader import iter_read_ahead
+
+                loaded = iter_read_ahead(checked, self._preload, io_concurrency)
+            else:
+                loaded = ((item, None) for item in checked)
+
+            for (file_path, hit), preloaded in loaded:
+                if hit:
+                    yield file_path, cache.get(file_path)
+                    continue
+                file_result = self._process_file_safe(file_path, preloaded)
+                if cache is not None and _cacheable(file_result):
+                    cache.store(file_path, file_result)
+                yield file_path, file_result
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(self,)
+        ) as executor:
+            # Only a bounded window of chunks is in flight, which keeps memory flat and
+            # lets results be yielded in input order as soon as the oldest chunk is done.
+            pending = deque()
+            while True:
+                chunk = list(islice(files, chunksize))
+                if chunk:
+                    fresh = [self._cache_hit(cache, path) for path in chunk]
+                    misses = [path for path, hit in zip(chunk, fresh) if not hit]
+                    future = executor.submit(_process_chunk_in_worker, misses)
+                    pending.append((chunk, fresh, future))
+                if not pending or (chunk and len(pending) < jobs * 2):
+                    if not chunk:
+                        break
+                    continue
+
+                chunk_paths, fresh, future = pending.popleft()
+                computed, worker_stats = future.result()
+                computed = iter(computed)
+                self.stats.merge(worker_stats)
+                for file_path, hit in zip(chunk_paths, fresh):
+                    if hit:
+                        yield file_path, cache.get(file_path)
+                        continue
+                    file_result = next(computed)
+                    if cache is not None and _cacheable(file_result):
+                        cache.store(file_path, file_result)
+                    yield file_path, file_result
+
     def output_analysis(self, directory, output_filename):
         """
         The `output_analysis` function writes the analysis results to an output file.
@@ -126,41 +499,136 @@ class FileProcessor:
         :param output_filename: The `output_filename` parameter is a string that represents the name of the
         file where the analysis results will be written
         """
-        with open(output_filename, "w", encoding="utf-8") as f:
-            f.write(f"Project dir: {directory}\n")
-            for key in self.analysis:
-                body = self.analysis[key]
-                if isinstance(body, dict):
-                    if "lines" in body:
-                        f.write(f"{key.replace(directory, '')}\n")
-                        for line in body.get("lines", []):
-                            f.write(line.strip() + "\n")
-                    if "ast" in body:
-                        f.write(f"AST: \n")
-                        f.write(str(body.get("ast")) + "\n")
+        with TextReportWriter(output_filename, directory) as writer:
+            for key, body in self.analysis.items():
+                writer.write(key, body)
 
-                else:
-                    f.write(f"Unexpected item in analysis: {body}\n")
+    def _preload(self, checked):
+        """Read a `(file_path, cache_hit)` pair's file on a reader thread, unless it was a hit."""
+        file_path, hit = checked
+        if hit:
+            return None
+        bytes_read = []
+        loaded = self._load_file(file_path, on_read=bytes_read.append)
+        return (*loaded, sum(bytes_read))
+
+    def _process_file_safe(self, file_path: str, preloaded=None):
+        """
+        The `_process_file_safe` function processes a single file, turning any failure into an error
+        entry so that one unreadable or unparsable file does not abort the whole batch.
 
-    def _process_file(self, file_path: str):
+        :param file_path: The `file_path` parameter is a string that represents the path to the file
+        :type file_path: str
+        :param preloaded: The `preloaded` parameter is passed on to `_process_file`
+        :return: the result of `_process_file`, or a dictionary with `lines`, `file_path` and `error`
+        """
+        start = time.perf_counter()
+        try:
+            return self._process_file(file_path, preloaded)
+        except Exception as e:
+            logging.warning(f"Error processing {file_path}: {e}")
+            self.stats.count("errors")
+            return {
+                "lines": [],
+                "file_path": file_path,
+                "error": f"{type(e).__name__}: {e}",
+            }
+        finally:
+            self.stats.count("files")
+            self.stats.record_file(file_path, time.perf_counter() - start)
+
+    def _needs_ast(self, file_path: str) -> bool:
+        return (
+            file_path.endswith(".py")
+            and os.path.basename(file_path) not in self.specified_files
+        )
+
+    def _load_file(self, file_path: str, on_read=None):
+        """
+        The `_load_file` function is the I/O half of `_process_file`: it reads the head lines of a file
+        and, when the file will be AST-analyzed, its whole source. It does not touch shared state, so
+        it can run on reader threads.
+
+        :param file_path: The `file_path` parameter is the path of the file to read
+        :type file_path: str
+        :param on_read: The `on_read` parameter is called with the number of bytes read
+        :return: a tuple `(lines, source_code, line_counts)` as returned by `_read_file`. `source_code`
+        is None for a file that needs AST analysis but is larger than `MaxParseBytes`.
+        """
+        needs_source = self._needs_ast(file_path)
+        if needs_source and self.max_parse_bytes:
+            needs_source = os.path.getsize(file_path) <= self.max_parse_bytes
+        return self._read_file(
+            file_path,
+            os.path.basename(file_path) in self.specified_files,
+            needs_source=needs_source,
+            on_read=on_read,
+        )
+
+    def _process_file(self, file_path: str, preloaded=None):
         """
         The `_process_file` function reads a file, analyzes its contents using an AST analyzer, and returns
         the result.
 
+        The `[Main]` limits keep one huge file from stalling the run. A Python file larger than
+        `MaxParseBytes` is not parsed: its result has its head lines and `skipped` set to `size`. An
+        analysis that visits more than `MaxAstNodes` nodes, or is still running `ParseTimeout` seconds
+        after the file was started, keeps what it collected so far and sets `truncated` to `nodes` or
+        `timeout`. Parsing itself cannot be interrupted, so the timeout is checked between nodes.
+
         :param file_path: The `file_path` parameter is a string that represents the path to the file that
         needs to be processed. It should be a valid file path on the system
         :type file_path: str
+        :param preloaded: The `preloaded` parameter is the outcome of `_preload` when the file was already
+        read ahead: a `(lines, source_code, line_counts, bytes_read)` tuple, or the exception the read
+        raised
         :return: a dictionary with the following keys and values:
         """
-        lines, source_code = self._read_file(
-            file_path, os.path.basename(file_path) in self.specified_files
+        needs_ast = self._needs_ast(file_path)
+        deadline = (
+            time.perf_counter() + self.parse_timeout if self.parse_timeout else None
         )
+        try:
+            with self.stats.stage("read"):
+                if preloaded is None:
+                    lines, source_code, line_counts = self._load_file(file_path)
+                elif isinstance(preloaded, Exception):
+                    raise preloaded
+                else:
+                    lines, source_code, line_counts, bytes_read = preloaded
+                    self._count_bytes_read(bytes_read)
+        except BinaryFileError:
+            self.stats.count("files_skipped")
+            return {"lines": [], "file_path": file_path, "skipped": "binary"}
         result = {"lines": lines, "file_path": file_path}
-        if file_path.endswith(".py") and not (
-            os.path.basename(file_path) in self.specified_files
-        ):
+        if line_counts is not None:
+            result["line_counts"] = line_counts.as_dict()
+        if needs_ast and source_code is None:
+            logging.warning(f"Skipped AST of {file_path}: larger than MaxParseBytes.")
+            self.stats.count("ast_skipped")
+            result["skipped"] = "size"
+        elif needs_ast:
             result["ast"] = {}
-            self.ast_analyzer.analyze(source_code)
+            limits = dict(max_nodes=self.max_ast_nodes, deadline=deadline)
+            try:
+                self.ast_analyzer.analyze(source_code, self.ast_categories, **limits)
+            except SyntaxError as e:
+                # UTF-8 was only checked at the start of the file; parse the rest as decoded text.
+                if not isinstance(source_code, bytes) or not is_decoding_error(e):
+                    raise
+                self.ast_analyzer.analyze(
+                    source_code.decode("utf-8-sig", errors="replace"),
+                    self.ast_categories,
+                    **limits,
+                )
+            if self.ast_analyzer.truncated:
+                logging.warning(
+                    f"Truncated AST of {file_path}: {self.ast_analyzer.truncated} limit reached."
+                )
+                self.stats.count("ast_truncated")
+                result["truncated"] = self.ast_analyzer.truncated
+            for stage, seconds in self.ast_analyzer.timings.items():
+                self.stats.add_time(stage, seconds)
             if self.analyze_function_names:
                 result["ast"]["functions"] = self.ast_analyzer.functions
             if self.analyze_global_variables:
@@ -172,14 +640,31 @@ class FileProcessor:
             if self.analyze_class_names:
                 result["ast"]["classes"] = self.ast_analyzer.classes
 
-            result["ast"] = utils.reduce_tokens(result["ast"])
+            with self.stats.stage("reduce"):
+                result["ast"] = utils.reduce_tokens(result["ast"])
 
         return result
 
-    def _read_file(self, file_path: str, return_all: bool = False):
+    def _read_file(
+        self,
+        file_path: str,
+        return_all: bool = False,
+        needs_source: bool = False,
+        on_read=None,
+    ):
         """
-        The `_read_file` function reads a file and returns a list of lines up to a specified limit,
-        excluding lines that start with a "#" character.
+        The `_read_file` function reads a file and returns its first `lines_to_read` lines that are not
+        comments, detected according to the file type (`#`, `//`, block comments, shebangs, ...).
+
+        Unless the whole file is needed, only its head is read: chunks are read until enough lines
+        have been collected, and never more than `MaxHeadBytes`. Binary files raise
+        `BinaryFileError`. The file is read as bytes and its encoding detected from its first bytes
+        (see `detect_encoding`); only the lines returned are decoded, unless all of them are needed.
+
+        With `[Main] CountLines` on, the total, blank and comment lines of the whole file are also
+        counted on its bytes: from the same read when the whole file was needed, and with a separate
+        chunked or memory-mapped pass otherwise. It is off by default, as that pass reads past
+        `MaxHeadBytes`.
 
         :param file_path: The `file_path` parameter is a string that represents the path to the file that
         you want to read. It should be the absolute or relative path to the file on your system
@@ -188,19 +673,41 @@ class FileProcessor:
         the file should be returned or only up to a specified limit. If `return_all` is set to `True`, all
         lines will be returned. If it is set to `False` (default), only up to, defaults to False
         :type return_all: bool (optional)
-        :return: The `_read_file` function returns a tuple containing two elements: `lines` and
-        `source_code`. `lines` is a list of strings, which are the lines of code read from the file.
-        `source_code` is a string, which is the entire content of the file.
-        """
-        lines = []
-        with open(file_path, "r") as file:
-            source_code = file.read()
-            for i, line in enumerate(source_code.splitlines()):
-                if line.strip().startswith("#"):
-                    self.lines_to_read = self.lines_to_read + 1
-                    continue
-                if return_all or (i < self.lines_to_read):
-                    lines.append(line.strip())
-                else:
-                    break
-        return lines, source_code
+        :param needs_source: The `needs_source` parameter is a boolean flag that requests the entire
+        content of the file, for AST analysis, defaults to False
+        :type needs_source: bool (optional)
+        :param on_read: The `on_read` parameter is called with the number of bytes read, defaults to
+        counting them in the run statistics
+        :return: The `_read_file` function returns a tuple containing three elements: `lines`,
+        `source_code` and `line_counts`. `lines` is a list of strings, which are the lines of code read
+        from the file. `source_code` is the entire content of the file as `ast.parse` should get it (see
+        `source_for_parser`) when `needs_source` is set, and None otherwise. `line_counts` is a `LineCounts`, or None when `CountLines` is off.
+        """
+        count_bytes = on_read or self._count_bytes_read
+        syntax = comment_syntax_for(file_path)
+        line_counts = None
+        if return_all or needs_source:
+            raw = read_bytes(file_path, on_read=count_bytes)
+            if self.count_lines:
+                line_counts = count_lines(raw, syntax)
+            encoding = detect_encoding(raw[:SNIFF_BYTES], file_path)
+            source_code = source_for_parser(raw, encoding) if needs_source else None
+            line_iter = iter_lines(raw, encoding)
+        else:
+            source_code = None
+            line_iter = iter_head_lines(
+                file_path, self.max_head_bytes, on_read=count_bytes
+            )
+
+        lines = extract_head(
+            line_iter,
+            self.lines_to_read,
+            syntax,
+            return_all=return_all,
+        )
+        if self.count_lines and line_counts is None:
+            line_counts = count_file_lines(file_path, syntax, on_read=count_bytes)
+        return lines, source_code, line_counts
+
+    def _count_bytes_read(self, size: int):
+        self.stats.count("bytes_read", size)
@@ -0,0 +1,308 @@
+import os
+import re
+import codecs
+from typing import Callable, Iterable, Iterator, List, Optional
+
+DEFAULT_MAX_HEAD_BYTES = 64 * 1024
+CHUNK_SIZE = 8 * 1024
+# Like git and grep, a NUL byte near the start of a file marks it as binary.
+SNIFF_BYTES = 8 * 1024
+# Decodes any byte sequence, so text that is not valid UTF-8 is still read.
+FALLBACK_ENCODING = "latin-1"
+
+# Longest first, as the UTF-32 little-endian mark starts with the UTF-16 one.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Encodings whose text has NUL bytes, which only a byte order mark tells apart from binary data.
+_WIDE_BOMS = tuple(bom for bom, encoding in _BOMS if encoding != "utf-8-sig")
+# Encodings that Python's parser reads from bytes by itself.
+_PARSER_ENCODINGS = ("utf-8", "utf-8-sig")
+# PEP 263, as matched by `tokenize.detect_encoding`.
+_CODING_COOKIE = re.compile(rb"^[ \t\f]*#.*?coding[:=][ \t]*([-\w.]+)")
+_BLANK_OR_COMMENT = re.compile(rb"^[ \t\f]*(?:[#\r\n]|$)")
+
+
+class CommentSyntax:
+    """How comments are written in a family of file types."""
+
+    def __init__(self, line_markers=(), block=None):
+        self.line_markers = tuple(line_markers)
+        self.block_start, self.block_end = block or (None, None)
+
+
+HASH_COMMENTS = CommentSyntax(["#"])
+C_COMMENTS = CommentSyntax(["//", "#!"], ("/*", "*/"))
+MARKUP_COMMENTS = CommentSyntax([], ("<!--", "-->"))
+
+COMMENT_SYNTAX = {
+    ".py": HASH_COMMENTS,
+    ".sh": HASH_COMMENTS,
+    ".yaml": HASH_COMMENTS,
+    ".yml": HASH_COMMENTS,
+    ".toml": HASH_COMMENTS,
+    ".cfg": CommentSyntax(["#", ";"]),
+    ".ini": CommentSyntax(["#", ";"]),
+    ".bat": CommentSyntax(["::", "@REM", "@rem", "REM ", "rem "]),
+    ".js": C_COMMENTS,
+    ".jsx": C_COMMENTS,
+    ".ts": C_COMMENTS,
+    ".tsx": C_COMMENTS,
+    ".java": C_COMMENTS,
+    ".c": C_COMMENTS,
+    ".h": C_COMMENTS,
+    ".cpp": C_COMMENTS,
+    ".go": C_COMMENTS,
+    ".rs": C_COMMENTS,
+    ".css": CommentSyntax([], ("/*", "*/")),
+    ".html": MARKUP_COMMENTS,
+    ".xml": MARKUP_COMMENTS,
+    # In Markdown a leading "#" is a heading, so only HTML comments are skipped.
+    ".md": MARKUP_COMMENTS,
+}
+
+
+def comment_syntax_for(file_path: str) -> CommentSyntax:
+    """Return the comment syntax for a file, defaulting to "#" line comments."""
+    return COMMENT_SYNTAX.get(os.path.splitext(file_path)[1].lower(), HASH_COMMENTS)
+
+
+def extract_head(
+    lines: Iterable[str],
+    max_lines: int,
+    syntax: CommentSyntax = HASH_COMMENTS,
+    return_all: bool = False,
+) -> List[str]:
+    """
+    Return the first `max_lines` lines that are not comments, stripped.
+
+    Lines made only of comments, including every line of a block comment, are
+    skipped and do not count towards `max_lines`. Blank lines are kept. The input
+    is consumed only as far as needed, so it can be a lazy reader.
+
+    :param lines: The lines of the file, without line endings
+    :param max_lines: The number of non-comment lines to return
+    :type max_lines: int
+    :param syntax: The comment syntax of the file
+    :type syntax: CommentSyntax
+    :param return_all: Return every non-comment line instead of the first `max_lines`
+    :type return_all: bool
+    """
+    head = []
+    in_block = False
+    for line in lines:
+        if not return_all and len(head) >= max_lines:
+            break
+        stripped = line.strip()
+        if in_block:
+            end = stripped.find(syntax.block_end)
+            if end == -1:
+                continue
+            in_block = False
+            if not stripped[end + len(syntax.block_end) :].strip():
+                continue
+        elif syntax.block_start and stripped.startswith(syntax.block_start):
+            end = stripped.find(syntax.block_end, len(syntax.block_start))
+            if end == -1:
+                in_block = True
+                continue
+            if not stripped[end + len(syntax.block_end) :].strip():
+                continue
+        elif stripped.startswith(syntax.line_markers):
+            continue
+        head.append(stripped)
+    return head
+
+
+class BinaryFileError(ValueError):
+    """Raised when a file selected for reading turns out not to be text."""
+
+
+def is_binary(sample: bytes) -> bool:
+    """Return True if a sample from the start of a file looks like binary data."""
+    return b"\0" in sample[:SNIFF_BYTES] and not sample.startswith(_WIDE_BOMS)
+
+
+def coding_cookie(sample: bytes) -> Optional[str]:
+    """Return the encoding a PEP 263 comment on the first two lines declares, if Python knows it."""
+    lines = sample.split(b"\n", 2)[:2]
+    for i, line in enumerate(lines):
+        match = _CODING_COOKIE.match(line)
+        if match:
+            try:
+                return codecs.lookup(match.group(1).decode("ascii")).name
+            except LookupError:
+                return None
+        # The second line is only looked at after a blank or comment first line.
+        if i == 0 and not _BLANK_OR_COMMENT.match(line):
+            return None
+    return None
+
+
+def detect_encoding(sample: bytes, file_path: str = "") -> str:
+    """
+    Guess the encoding of a file from a sample of its first bytes, without decoding the rest.
+
+    A byte order mark wins, then a PEP 263 coding comment in Python files. Otherwise the sample
+    is UTF-8 if it decodes as such, allowing a character cut at its end, and `FALLBACK_ENCODING`
+    if not.
+
+    :param sample: The first bytes of the file
+    :type sample: bytes
+    :param file_path: The path of the file, whose extension tells if it is Python
+    :type file_path: str
+    :return: the name of a codec that decodes the file.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if file_path.endswith(".py"):
+        declared = coding_cookie(sample)
+        if declared:
+            return declared
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.reason != "unexpected end of data" or e.end < len(sample):
+            return FALLBACK_ENCODING
+    return "utf-8"
+
+
+def source_for_parser(raw: bytes, encoding: str):
+    """
+    Return the source of a Python file in the form `ast.parse` should get it: the bytes themselves
+    when the parser can decode them (UTF-8, a byte order mark or the coding comment that set
+    `encoding`), saving a decoded copy of the whole file, and the decoded text otherwise.
+    """
+    if encoding in _PARSER_ENCODINGS or coding_cookie(raw[:SNIFF_BYTES]) == encoding:
+        return raw
+    return raw.decode(encoding, errors="replace")
+
+
+def is_decoding_error(error: SyntaxError) -> bool:
+    """Return True if `ast.parse` failed to decode bytes, rather than to parse the code in them."""
+    return (error.msg or "").startswith(("unknown encoding", "(unicode error) 'utf-8'"))
+
+
+def read_bytes(
+    file_path: str, on_read: Optional[Callable[[int], None]] = None
+) -> bytes:
+    """
+    Read a whole text file without decoding it, refusing binary files.
+
+    :param file_path: The path of the file to read
+    :type file_path: str
+    :param on_read: Called with the number of bytes read
+    :return: the raw content of the file.
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    if on_read is not None:
+        on_read(len(raw))
+    if is_binary(raw):
+        raise BinaryFileError(file_path)
+    return raw
+
+
+def read_source(file_path: str, on_read: Optional[Callable[[int], None]] = None) -> str:
+    """
+    Read and decode a whole text file, refusing binary files.
+
+    :param file_path: The path of the file to read
+    :type file_path: str
+    :param on_read: Called with the number of bytes read
+    :return: the decoded content of the file.
+    """
+    raw = read_bytes(file_path, on_read)
+    encoding = detect_encoding(raw[:SNIFF_BYTES], file_path)
+    return raw.decode(encoding, errors="replace")
+
+
+def _decode_lines(chunks: Iterable[bytes], encoding: str) -> Iterator[str]:
+    """
+    Decode chunks of bytes as they are consumed and yield their lines without line endings.
+    Undecodable bytes become U+FFFD, and a character cut by the end of the last chunk is dropped.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+        # The last line may continue in the next chunk, or be half of a "\r\n".
+        last = lines[-1] if lines else ""
+        if last and (last.endswith("\r") or last.splitlines()[0] == last):
+            pending = lines.pop()
+        else:
+            pending = ""
+        for line in lines:
+            yield line.splitlines()[0]
+    tail = pending + decoder.decode(b"")
+    if tail:
+        yield tail.splitlines()[0]
+
+
+def iter_lines(
+    raw: bytes, encoding: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Lazily yield the lines of a file already in memory, decoding it only as far as the caller
+    consumes lines.
+
+    :param raw: The content of the file
+    :type raw: bytes
+    :param encoding: The encoding of the file, as returned by `detect_encoding`
+    :type encoding: str
+    :param chunk_size: The number of bytes decoded at a time
+    :type chunk_size: int
+    """
+    view = memoryview(raw)
+    return _decode_lines(
+        (view[i : i + chunk_size] for i in range(0, len(view), chunk_size)), encoding
+    )
+
+
+def iter_head_lines(
+    file_path: str,
+    max_bytes: int = DEFAULT_MAX_HEAD_BYTES,
+    chunk_size: int = CHUNK_SIZE,
+    on_read: Optional[Callable[[int], None]] = None,
+) -> Iterator[str]:
+    """
+    Lazily yield the lines at the start of a file, without their line endings.
+
+    The file is read in chunks only as far as the caller consumes lines, and never
+    past `max_bytes`; a line cut by that cap is yielded as it stands. Binary files
+    are detected from the first chunk and refused, and the encoding is detected
+    from it too.
+
+    :param file_path: The path of the file to read
+    :type file_path: str
+    :param max_bytes: The maximum number of bytes read from the file
+    :type max_bytes: int
+    :param chunk_size: The size of each read
+    :type chunk_size: int
+    :param on_read: Called with the size of every chunk read
+    """
+    with open(file_path, "rb") as f:
+        first = f.read(min(chunk_size, max_bytes))
+        if on_read is not None:
+            on_read(len(first))
+        if is_binary(first):
+            raise BinaryFileError(file_path)
+
+        def chunks():
+            chunk = first
+            remaining = max_bytes - len(first)
+            while chunk:
+                yield chunk
+                if remaining <= 0:
+                    return
+                chunk = f.read(min(chunk_size, remaining))
+                remaining -= len(chunk)
+                if on_read is not None:
+                    on_read(len(chunk))
+
+        yield from _decode_lines(chunks(), detect_encoding(first, file_path))
@@ -0,0 +1,312 @@
+import os
+import struct
+import logging
+import configparser
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+INDEX_SIGNATURE = b"DIRC"
+SUPPORTED_VERSIONS = (2, 3, 4)
+
+# ctime, mtime (seconds and nanoseconds), dev, ino, mode, uid, gid, size, sha1, flags.
+_ENTRY_HEADER = struct.Struct(">10I20sH")
+_NAME_MASK = 0x0FFF
+_EXTENDED_FLAG = 0x4000
+_SKIP_WORKTREE_FLAG = 0x4000
+_STAGE_MASK = 0x3000
+_OBJECT_TYPE_MASK = 0o170000
+_GITLINK_TYPE = 0o160000
+# Attributes under which the worktree content may differ from the blob git stores.
+_CONVERTING_ATTRIBUTES = (
+    "text",
+    "eol",
+    "crlf",
+    "filter",
+    "ident",
+    "working-tree-encoding",
+)
+
+
+class GitIndexError(ValueError):
+    """Raised when a `.git/index` file cannot be parsed."""
+
+
+class IndexEntry(NamedTuple):
+    """A tracked file as recorded in the index, with its path relative to the worktree."""
+
+    path: str
+    mode: int
+    size: int
+    mtime_ns: int
+    sha: str
+
+
+def _read_varint(data: memoryview, offset: int):
+    """Decode the offset-style varint used by index v4 path compression."""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def read_index(index_path: str) -> Iterator[IndexEntry]:
+    """
+    The `read_index` function parses a git index file (versions 2, 3 and 4) without running git,
+    yielding the stage-0 entries in index order, which is sorted by path. Submodules and entries
+    marked skip-worktree, which have no file in the worktree, are left out.
+
+    :param index_path: The path of the index file, usually `.git/index`
+    :type index_path: str
+    :return: an iterator over `IndexEntry` tuples.
+    """
+    with open(index_path, "rb") as f:
+        data = memoryview(f.read())
+    if len(data) < 12 or data[:4] != INDEX_SIGNATURE:
+        raise GitIndexError(f"Not a git index: {index_path}")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in SUPPORTED_VERSIONS:
+        raise GitIndexError(f"Unsupported index version {version}: {index_path}")
+
+    offset = 12
+    previous_name = b""
+    for _ in range(count):
+        start = offset
+        fields = _ENTRY_HEADER.unpack_from(data, offset)
+        offset += _ENTRY_HEADER.size
+        mtime_ns = fields[2] * 1_000_000_000 + fields[3]
+        mode, size, sha, flags = fields[6], fields[9], fields[10], fields[11]
+        extended_flags = 0
+        if version >= 3 and flags & _EXTENDED_FLAG:
+            (extended_flags,) = struct.unpack_from(">H", data, offset)
+            offset += 2
+
+        if version == 4:
+            strip, offset = _read_varint(data, offset)
+            end = data.obj.index(b"\0", offset)
+            name = previous_name[: len(previous_name) - strip] + bytes(data[offset:end])
+            offset = end + 1
+        else:
+            length = flags & _NAME_MASK
+            if length == _NAME_MASK:
+                end = data.obj.index(b"\0", offset)
+            else:
+                end = offset + length
+            name = bytes(data[offset:end])
+            # Entries are NUL-padded to a multiple of eight bytes.
+            offset = start + ((end - start + 8) & ~7)
+        previous_name = name
+
+        if flags & _STAGE_MASK or extended_flags & _SKIP_WORKTREE_FLAG:
+            continue
+        if mode & _OBJECT_TYPE_MASK == _GITLINK_TYPE:
+            continue
+        yield IndexEntry(
+            name.decode("utf-8", errors="surrogateescape"),
+            mode,
+            size,
+            mtime_ns,
+            sha.hex(),
+        )
+
+
+def _sets_converting_attribute(attributes_path: str) -> bool:
+    """Return True if a gitattributes file sets an attribute that converts content on checkout."""
+    try:
+        with open(attributes_path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.readlines()
+    except OSError:
+        return False
+    for line in lines:
+        tokens = line.split()
+        if not tokens or tokens[0].startswith("#"):
+            continue
+        for token in tokens[1:]:
+            # "-text" and "!text" turn a conversion off or leave it unspecified.
+            if not token.startswith(("-", "!")):
+                if token.split("=", 1)[0] in _CONVERTING_ATTRIBUTES:
+                    return True
+    return False
+
+
+def _config_sets_autocrlf(config_paths: Iterable[str]) -> bool:
+    """Return True if `core.autocrlf` is `true` or `input` in the last config file setting it."""
+    value = None
+    for config_path in config_paths:
+        parser = configparser.ConfigParser(strict=False, interpolation=None)
+        try:
+            parser.read(config_path, encoding="utf-8")
+        except (OSError, configparser.Error):
+            continue
+        for section in parser.sections():
+            if section.strip().lower() == "core" and "autocrlf" in parser[section]:
+                value = parser[section]["autocrlf"].strip().lower()
+    return value in ("true", "input", "yes", "on", "1")
+
+
+def find_git_dir(directory: str):
+    """
+    Return `(worktree, git_dir)` for the repository containing `directory`, following
+    `gitdir:` files used by linked worktrees and submodules, or None outside a repository.
+    """
+    current = os.path.abspath(directory)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return current, dot_git
+        if os.path.isfile(dot_git):
+            with open(dot_git, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            if content.startswith("gitdir:"):
+                git_dir = content[len("gitdir:") :].strip()
+                return current, os.path.normpath(os.path.join(current, git_dir))
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+class GitIndex:
+    """
+    The tracked files of a git worktree, read from its index.
+
+    Listing files from the index replaces walking the worktree, so untracked build
+    artifacts are never visited. The index also records each file's blob SHA-1,
+    which is the same digest as `utils.file_digest`; `digest` hands it out for
+    files whose stat data still matches the index, so they need not be hashed.
+
+    That digest is of the content as git stores it, which only equals the worktree
+    file when checkout does not convert it. Index digests are therefore not used at
+    all when `core.autocrlf` is set, or when a `.gitattributes` file (tracked, or
+    `info/attributes`) sets `text`, `eol`, `filter`, `ident` or a similar attribute.
+    Without running git, only the repository, user (`~/.gitconfig`,
+    `$XDG_CONFIG_HOME/git/config`) and system (`/etc/gitconfig`) config files are
+    read, without following `include`s or `core.attributesFile`.
+    """
+
+    def __init__(self, worktree: str, index_path: str):
+        self.worktree = worktree
+        self.index_path = index_path
+        self._entries: Optional[Dict[str, IndexEntry]] = None
+        self._index_mtime_ns = os.stat(index_path).st_mtime_ns
+        self._converts_content: Optional[bool] = None
+
+    @classmethod
+    def find(cls, directory: str) -> Optional["GitIndex"]:
+        """Return the index of the repository containing `directory`, or None if there is none."""
+        found = find_git_dir(directory)
+        if found is None:
+            return None
+        worktree, git_dir = found
+        index_path = os.path.join(git_dir, "index")
+        if not os.path.isfile(index_path):
+            return None
+        return cls(worktree, index_path)
+
+    def iter_files(
+        self,
+        directory: str,
+        ignored_dirs: Iterable[str] = (),
+        ignored_files: Iterable[str] = (),
+        file_types: Iterable[str] = (),
+        specified_files: Iterable[str] = (),
+    ) -> Iterator[str]:
+        """
+        The `iter_files` function yields the tracked files under `directory` selected by the same
+        filters as `discovery.iter_files`, joined onto `directory` the same way, in index order.
+        Files deleted from the worktree but still in the index are reported as well.
+
+        :param directory: The directory to list, inside the worktree
+        :type directory: str
+        :param ignored_dirs: Directory names whose contents are skipped, at any depth below `directory`
+        :param ignored_files: File names that are never reported
+        :param file_types: File suffixes (including the dot) to report
+        :param specified_files: File names to report whatever their suffix
+        :return: an iterator over the selected file paths.
+        """
+        ignored_dirs = set(ignored_dirs)
+        ignored_files = set(ignored_files)
+        file_types = set(file_types)
+        specified_files = set(specified_files)
+
+        base = str(Path(directory))
+        prefix = os.path.relpath(os.path.abspath(directory), self.worktree)
+        prefix = "" if prefix == os.curdir else prefix.replace(os.sep, "/") + "/"
+
+        for entry in read_index(self.index_path):
+            if not entry.path.startswith(prefix):
+                continue
+            relative = entry.path[len(prefix) :]
+            *parents, name = relative.split("/")
+            if name in ignored_files or ignored_dirs.intersection(parents):
+                continue
+            if (
+                name not in specified_files
+                and os.path.splitext(name)[1] not in file_types
+            ):
+                continue
+            yield os.path.join(base, *parents, name)
+
+    def digest(self, file_path: str, stat: os.stat_result) -> Optional[str]:
+        """
+        The `digest` function returns the blob SHA-1 recorded for a file when `stat` still matches
+        the index entry, and None otherwise.
+
+        As in git, an entry modified in the same instant the index was written ("racily clean")
+        may have changed without its stat data showing it, so no digest is returned for it.
+
+        :param file_path: The path of the file
+        :type file_path: str
+        :param stat: The current `os.stat` result of the file
+        :type stat: os.stat_result
+        :return: the hex digest, or None if it must be computed from the content.
+        """
+        if self._entries is None:
+            try:
+                self._entries = {
+                    os.path.join(self.worktree, *entry.path.split("/")): entry
+                    for entry in read_index(self.index_path)
+                }
+            except (OSError, GitIndexError) as e:
+                logging.warning(f"Ignoring git index {self.index_path}: {e}")
+                self._entries = {}
+        if self._converts_content is None:
+            self._converts_content = self._checkout_converts_content()
+            if self._converts_content:
+                logging.info(
+                    f"Not reusing digests of {self.index_path}: checkout converts content."
+                )
+        if self._converts_content:
+            return None
+        entry = self._entries.get(os.path.abspath(file_path))
+        if entry is None or entry.mtime_ns >= self._index_mtime_ns:
+            return None
+        # The index keeps the low 32 bits of sizes and seconds.
+        if entry.size != stat.st_size & 0xFFFFFFFF:
+            return None
+        seconds, nanoseconds = divmod(stat.st_mtime_ns, 1_000_000_000)
+        if entry.mtime_ns != (seconds & 0xFFFFFFFF) * 1_000_000_000 + nanoseconds:
+            return None
+        return entry.sha
+
+    def _checkout_converts_content(self) -> bool:
+        """Return True if line ending conversion or filters may apply to the worktree."""
+        git_dir = os.path.dirname(self.index_path)
+        home = os.path.expanduser("~")
+        xdg_config = os.environ.get("XDG_CONFIG_HOME") or os.path.join(home, ".config")
+        config_paths = (
+            "/etc/gitconfig",
+            os.path.join(xdg_config, "git", "config"),
+            os.path.join(home, ".gitconfig"),
+            os.path.join(git_dir, "config"),
+        )
+        if _config_sets_autocrlf(config_paths):
+            return True
+        attributes_paths = [os.path.join(git_dir, "info", "attributes")]
+        attributes_paths += [
+            path for path in self._entries if os.path.basename(path) == ".gitattributes"
+        ]
+        return any(_sets_converting_attribute(path) for path in attributes_paths)
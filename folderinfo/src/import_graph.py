@@ -0,0 +1,350 @@
+"""
+A cross-file index of the analyzed Python modules: which files import which, and which
+functions call which.
+
+Imports are resolved to files inside the analyzed directory, by dotted module name
+derived from the file's relative path; relative imports are resolved against the
+importing module's package. An absolute name that does not match (because the scan
+started below the package root) is retried without its leading components. Bare-name
+calls are resolved to a function defined in the same file, or to one defined in the
+file a `from ... import name` brought it from. Everything else (the standard library,
+third-party packages, method calls) is left out.
+
+Both graphs are kept as compressed sparse rows: an `offsets` array with one entry per
+node plus one, and a `targets` array holding every node's neighbours back to back, in
+both directions, so that neighbour queries are two array lookups and a slice.
+"""
+
+import os
+import sys
+import json
+import struct
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+MAGIC = b"FIIG"
+VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+# Stands for the module of an `import a.b` statement, which has none.
+_PLAIN_IMPORT = object()
+
+
+class ImportGraphError(ValueError):
+    """Raised when an import graph file cannot be read."""
+
+
+def module_name(relative_path: str) -> Optional[str]:
+    """Return the dotted module name of a `/`-separated relative path, or None for non-Python files."""
+    if not relative_path.endswith(".py"):
+        return None
+    parts = relative_path[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts) if parts else None
+
+
+def _csr(adjacency: List[Iterable[int]]) -> Tuple[array, array]:
+    offsets = array("I", [0])
+    targets = array("I")
+    for neighbours in adjacency:
+        targets.extend(sorted(set(neighbours)))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+def _reverse(offsets: array, targets: array, size: int) -> Tuple[array, array]:
+    reverse = [[] for _ in range(size)]
+    for source in range(len(offsets) - 1):
+        for target in targets[offsets[source] : offsets[source + 1]]:
+            reverse[target].append(source)
+    return _csr(reverse)
+
+
+def _array_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array("I", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class ImportGraphBuilder:
+    """
+    Collects the imports, functions and calls of each result during an analysis, keeping
+    only what the graph needs, and resolves them into an `ImportGraph` at the end.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+        self._files: Dict[str, tuple] = {}
+
+    def add(self, file_path: str, result: dict):
+        """
+        Record the reduced AST summary of one file's result. Python files without one, such as
+        `SpecifiedFiles`, are still nodes that other files can import.
+        """
+        if not file_path.endswith(".py"):
+            return
+        summary = result.get("ast") or {}
+        relative = os.path.relpath(os.path.abspath(file_path), self.directory)
+        if relative.startswith(os.pardir):
+            return
+        imports = [
+            (
+                entry["n"],
+                entry["m"] if "m" in entry else _PLAIN_IMPORT,
+                entry.get("lv", 0),
+                entry.get("as"),
+            )
+            for entry in summary.get("i", ())
+        ]
+        functions = [(entry["n"], entry.get("a", ())) for entry in summary.get("f", ())]
+        self._files[relative.replace(os.sep, "/")] = (imports, functions)
+
+    def build(self) -> "ImportGraph":
+        files = sorted(self._files)
+        ids = {path: i for i, path in enumerate(files)}
+        modules = {}
+        for path in files:
+            name = module_name(path)
+            if name:
+                modules[name] = ids[path]
+
+        def resolve(name: str) -> Optional[int]:
+            parts = name.split(".")
+            for start in range(len(parts)):
+                found = modules.get(".".join(parts[start:]))
+                if found is not None:
+                    return found
+            return None
+
+        functions: List[Tuple[int, str]] = []
+        defined: List[Dict[str, int]] = []
+        for file_id, path in enumerate(files):
+            local = {}
+            for function_name, _ in self._files[path][1]:
+                local.setdefault(function_name, len(functions))
+                functions.append((file_id, function_name))
+            defined.append(local)
+
+        imports = []
+        imported_names: List[Dict[str, Tuple[int, str]]] = []
+        for file_id, path in enumerate(files):
+            package = (module_name(path) or "").split(".")
+            if not (path == "__init__.py" or path.endswith("/__init__.py")):
+                package.pop()
+            targets = []
+            names = {}
+            for name, module, level, alias in self._files[path][0]:
+                if module is _PLAIN_IMPORT:
+                    # `import a.b.c` binds `a`; link the deepest module of the chain found.
+                    parts = name.split(".")
+                    while parts and resolve(".".join(parts)) is None:
+                        parts.pop()
+                    if parts:
+                        targets.append(resolve(".".join(parts)))
+                    continue
+                if level:
+                    if level - 1 > len(package):
+                        continue
+                    base = package[: len(package) - (level - 1)]
+                    source = ".".join(base + ([module] if module else []))
+                    lookup = modules.get
+                else:
+                    source, lookup = module, resolve
+                # `from package import submodule` imports a file; otherwise `name` is defined in `source`.
+                found = lookup(f"{source}.{name}" if source else name)
+                if found is None and source:
+                    found = lookup(source)
+                    if found is not None:
+                        names[alias or name] = (found, name)
+                if found is not None:
+                    targets.append(found)
+            imports.append([target for target in targets if target != file_id])
+            imported_names.append(names)
+
+        calls = []
+        for file_id, path in enumerate(files):
+            for function_name, called in self._files[path][1]:
+                callees = []
+                for call in set(called):
+                    callee = defined[file_id].get(call)
+                    if callee is None and call in imported_names[file_id]:
+                        source_id, original = imported_names[file_id][call]
+                        callee = defined[source_id].get(original)
+                    if callee is not None:
+                        callees.append(callee)
+                calls.append(callees)
+
+        import_offsets, import_targets = _csr(imports)
+        call_offsets, call_targets = _csr(calls)
+        return ImportGraph(
+            self.directory,
+            files,
+            functions,
+            (import_offsets, import_targets),
+            (call_offsets, call_targets),
+        )
+
+
+class ImportGraph:
+    """
+    The import and call graphs of a project, with queries by relative path (`pkg/mod.py`) or
+    dotted module name (`pkg.mod`) for files, and by `path:function` for functions.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        files: List[str],
+        functions: List[Tuple[int, str]],
+        imports: Tuple[array, array],
+        calls: Tuple[array, array],
+        importers: Optional[Tuple[array, array]] = None,
+        callers: Optional[Tuple[array, array]] = None,
+    ):
+        self.directory = directory
+        self.files = files
+        self.functions = functions
+        self._file_ids = {path: i for i, path in enumerate(files)}
+        self._modules = {module_name(path): i for i, path in enumerate(files)}
+        self._function_ids = {}
+        for function_id, (file_id, name) in enumerate(functions):
+            self._function_ids.setdefault(f"{files[file_id]}:{name}", function_id)
+        self._imports = imports
+        self._calls = calls
+        self._importers = importers or _reverse(*imports, len(files))
+        self._callers = callers or _reverse(*calls, len(functions))
+
+    @classmethod
+    def build(cls, analysis: Dict[str, dict], directory: str) -> "ImportGraph":
+        """Build the graph from the `{file_path: result}` dictionary of an analysis of `directory`."""
+        builder = ImportGraphBuilder(directory)
+        for file_path, result in analysis.items():
+            builder.add(file_path, result)
+        return builder.build()
+
+    def file_id(self, name: str) -> int:
+        """Return the node of a relative path or dotted module name, raising KeyError if unknown."""
+        found = self._file_ids.get(name.replace(os.sep, "/"))
+        if found is None:
+            found = self._modules.get(name)
+        if found is None:
+            raise KeyError(name)
+        return found
+
+    def function_id(self, name: str) -> int:
+        """Return the node of a `path:function` (or `module:function`) name."""
+        path, _, function = name.rpartition(":")
+        key = f"{self.files[self.file_id(path)]}:{function}"
+        if key not in self._function_ids:
+            raise KeyError(name)
+        return self._function_ids[key]
+
+    @staticmethod
+    def _neighbours(graph: Tuple[array, array], node: int) -> array:
+        offsets, targets = graph
+        return targets[offsets[node] : offsets[node + 1]]
+
+    @staticmethod
+    def _closure(graph: Tuple[array, array], node: int) -> Set[int]:
+        offsets, targets = graph
+        seen = {node}
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            for neighbour in targets[offsets[current] : offsets[current + 1]]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        seen.discard(node)
+        return seen
+
+    def _paths(self, ids: Iterable[int]) -> List[str]:
+        return sorted(self.files[i] for i in ids)
+
+    def _function_names(self, ids: Iterable[int]) -> List[str]:
+        return sorted(
+            f"{self.files[self.functions[i][0]]}:{self.functions[i][1]}" for i in ids
+        )
+
+    def imports_of(self, name: str) -> List[str]:
+        """The files that `name` imports directly."""
+        return self._paths(self._neighbours(self._imports, self.file_id(name)))
+
+    def importers_of(self, name: str) -> List[str]:
+        """The files that import `name` directly."""
+        return self._paths(self._neighbours(self._importers, self.file_id(name)))
+
+    def dependencies(self, name: str) -> List[str]:
+        """Every file that `name` imports, directly or through other files."""
+        return self._paths(self._closure(self._imports, self.file_id(name)))
+
+    def reverse_dependencies(self, name: str) -> List[str]:
+        """Every file that imports `name`, directly or through other files."""
+        return self._paths(self._closure(self._importers, self.file_id(name)))
+
+    def callees_of(self, name: str) -> List[str]:
+        """The functions that the `path:function` `name` calls by bare name."""
+        return self._function_names(
+            self._neighbours(self._calls, self.function_id(name))
+        )
+
+    def callers_of(self, name: str) -> List[str]:
+        """The functions that call the `path:function` `name` by bare name."""
+        return self._function_names(
+            self._neighbours(self._callers, self.function_id(name))
+        )
+
+    def save(self, filename: str):
+        """Write the graph, with its reverse edges, to `filename`."""
+        arrays = (*self._imports, *self._importers, *self._calls, *self._callers)
+        metadata = json.dumps(
+            {
+                "directory": self.directory,
+                "files": self.files,
+                "functions": self.functions,
+                "arrays": [len(values) for values in arrays],
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        with open(filename, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(metadata)))
+            f.write(metadata)
+            for values in arrays:
+                f.write(_array_bytes(values))
+
+    @classmethod
+    def load(cls, filename: str) -> "ImportGraph":
+        with open(filename, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ImportGraphError(f"Not an import graph: {filename}")
+        magic, version, metadata_length = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ImportGraphError(f"Not an import graph: {filename}")
+        if version != VERSION:
+            raise ImportGraphError(f"Unsupported graph version {version}: {filename}")
+        pos = _HEADER.size + metadata_length
+        metadata = json.loads(data[_HEADER.size : pos])
+        arrays = []
+        for length in metadata["arrays"]:
+            values = array("I")
+            end = pos + length * values.itemsize
+            values.frombytes(data[pos:end])
+            if sys.byteorder == "big":
+                values.byteswap()
+            arrays.append(values)
+            pos = end
+        if pos != len(data):
+            raise ImportGraphError(f"Truncated import graph: {filename}")
+        return cls(
+            metadata["directory"],
+            metadata["files"],
+            [tuple(function) for function in metadata["functions"]],
+            (arrays[0], arrays[1]),
+            (arrays[4], arrays[5]),
+            importers=(arrays[2], arrays[3]),
+            callers=(arrays[6], arrays[7]),
+        )
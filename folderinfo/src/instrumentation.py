@@ -0,0 +1,145 @@
+import time
+import heapq
+import logging
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# Pipeline stages, in the order they are reported.
+STAGES = ("discover", "stat", "read", "parse", "visit", "reduce", "write")
+DEFAULT_SLOWEST = 10
+
+
+class RunStats:
+    """
+    Timers and counters for one analysis run.
+
+    Stage timers accumulate the time spent in each pipeline stage, counters
+    track quantities such as bytes read or files skipped, and the slowest files
+    are kept in a bounded heap. Stats gathered in worker processes are folded in
+    with `merge`.
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        self.slowest = slowest
+        self.started = time.perf_counter()
+        self.stage_seconds = defaultdict(float)
+        self.stage_calls = Counter()
+        self.counters = Counter()
+        self._slowest_files = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the body of a `with` block as part of stage `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float):
+        self.stage_seconds[name] += seconds
+        self.stage_calls[name] += 1
+
+    def timed_iter(self, name: str, iterable):
+        """Yield from `iterable`, charging the time spent producing items to stage `name`."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.stage_seconds[name] += time.perf_counter() - start
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def record_file(self, file_path: str, seconds: float):
+        """Record the total processing time of a file, keeping only the slowest."""
+        entry = (seconds, file_path)
+        if len(self._slowest_files) < self.slowest:
+            heapq.heappush(self._slowest_files, entry)
+        elif entry > self._slowest_files[0]:
+            heapq.heapreplace(self._slowest_files, entry)
+
+    def merge(self, other: "RunStats"):
+        """Fold the stats of another run, typically a worker's chunk, into this one."""
+        for name, seconds in other.stage_seconds.items():
+            self.stage_seconds[name] += seconds
+        self.stage_calls.update(other.stage_calls)
+        self.counters.update(other.counters)
+        for seconds, file_path in other._slowest_files:
+            self.record_file(file_path, seconds)
+
+    def slowest_files(self) -> list:
+        return [
+            {"path": file_path, "seconds": round(seconds, 6)}
+            for seconds, file_path in sorted(self._slowest_files, reverse=True)
+        ]
+
+    def as_dict(self) -> dict:
+        stages = [name for name in STAGES if name in self.stage_seconds]
+        stages += sorted(set(self.stage_seconds) - set(STAGES))
+        return {
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": {
+                name: {
+                    "seconds": round(self.stage_seconds[name], 6),
+                    "calls": self.stage_calls[name],
+                }
+                for name in stages
+            },
+            "counters": dict(self.counters),
+            "slowest_files": self.slowest_files(),
+        }
+
+    def log_summary(self):
+        """
+        Log the stage timings and the run summary on the `folderinfo.stats` logger. The fields are
+        written into the message as `key=value` pairs and also set as record attributes.
+        """
+        logger = logging.getLogger("folderinfo.stats")
+        summary = self.as_dict()
+        for name, timing in summary["stages"].items():
+            _log_event(logger, "stage_timing", {"stage": name, **timing})
+        _log_event(
+            logger,
+            "run_summary",
+            {"wall_seconds": summary["wall_seconds"], **summary["counters"]},
+        )
+        return summary
+
+
+def _log_event(logger: logging.Logger, event: str, fields: dict):
+    message = " ".join([event] + [f"{key}=%s" for key in fields])
+    logger.info(message, *fields.values(), extra=fields)
+
+
+@contextmanager
+def profiled(output_path: str, top: int = 25):
+    """
+    Run the body of a `with` block under cProfile and tracemalloc.
+
+    The cProfile statistics are dumped to `output_path` (readable with `pstats`
+    or snakeviz) and the `top` allocation sites to `output_path` + ".mem.txt".
+    """
+    import cProfile
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profiler.dump_stats(output_path)
+        with open(output_path + ".mem.txt", "w", encoding="utf-8") as f:
+            f.write(f"Peak traced memory: {peak} bytes\n")
+            for stat in snapshot.statistics("lineno")[:top]:
+                f.write(f"{stat}\n")
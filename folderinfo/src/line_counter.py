@@ -0,0 +1,153 @@
+"""
+Count the lines, blank lines and comment lines of a file without decoding it.
+
+Lines end with `\\n`, as for `wc -l`, and a last line without one counts too. A blank line
+holds only whitespace; a comment line holds only a comment in the file's `CommentSyntax`,
+the same rules `extract_head` skips lines by, so every line of a block comment counts.
+
+Buffers are scanned with `bytes.count`, `bytes.translate` and regular expressions that
+start with a line break, which keeps the work per line in C; only a buffer that opens a
+block comment is walked line by line. Small files are read in one call, larger ones are
+memory-mapped and scanned in windows that end on a line break.
+"""
+
+import os
+import re
+import mmap
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional
+
+from .file_reader import HASH_COMMENTS, CommentSyntax, comment_syntax_for
+
+MMAP_THRESHOLD = 1 << 20
+WINDOW_SIZE = 4 << 20
+
+# What `bytes.strip` removes, besides the line break itself.
+_WHITESPACE = b" \t\r\f\v"
+
+
+class LineCounts(NamedTuple):
+    total: int = 0
+    blank: int = 0
+    comment: int = 0
+
+    @property
+    def code(self) -> int:
+        return self.total - self.blank - self.comment
+
+    def as_dict(self) -> dict:
+        return {"total": self.total, "blank": self.blank, "comment": self.comment}
+
+
+@lru_cache(maxsize=None)
+def _comment_patterns(syntax: CommentSyntax):
+    """
+    Patterns for a line comment of `syntax` at the start of a buffer, and after any line break.
+    Matching the break first lets the regular expression engine skip from one to the next.
+    """
+    if not syntax.line_markers:
+        return None
+    markers = b"|".join(re.escape(m.encode("utf-8")) for m in syntax.line_markers)
+    comment = b"[" + re.escape(_WHITESPACE) + b"]*(?:" + markers + b")"
+    return re.compile(comment), re.compile(b"\n" + comment)
+
+
+def _walk(data: bytes, syntax: CommentSyntax, in_block: bool):
+    """Classify the lines of `data` one by one, following block comments across lines."""
+    start = syntax.block_start.encode("utf-8")
+    end = syntax.block_end.encode("utf-8")
+    markers = tuple(m.encode("utf-8") for m in syntax.line_markers)
+    lines = data.split(b"\n")
+    if data.endswith(b"\n"):
+        lines.pop()
+    blank = comment = 0
+    for line in lines:
+        stripped = line.strip()
+        if in_block:
+            found = stripped.find(end)
+            if found == -1:
+                comment += 1
+                continue
+            in_block = False
+            if not stripped[found + len(end) :].strip():
+                comment += 1
+        elif stripped.startswith(start):
+            found = stripped.find(end, len(start))
+            if found == -1:
+                in_block = True
+                comment += 1
+            elif not stripped[found + len(end) :].strip():
+                comment += 1
+        elif markers and stripped.startswith(markers):
+            comment += 1
+        elif not stripped:
+            blank += 1
+    return blank, comment, in_block
+
+
+def _count(data: bytes, syntax: CommentSyntax, in_block: bool = False):
+    if not data:
+        return LineCounts(), in_block
+    ends_with_newline = data.endswith(b"\n")
+    total = data.count(b"\n") + (not ends_with_newline)
+    if in_block or (syntax.block_start and syntax.block_start.encode("utf-8") in data):
+        blank, comment, in_block = _walk(data, syntax, in_block)
+        return LineCounts(total, blank, comment), in_block
+    # With whitespace removed, blank lines are empty; after a final "\n" split adds one more.
+    blank = (
+        data.translate(None, _WHITESPACE).split(b"\n").count(b"") - ends_with_newline
+    )
+    comment = 0
+    patterns = _comment_patterns(syntax)
+    if patterns is not None:
+        first, following = patterns
+        comment = len(following.findall(data)) + (first.match(data) is not None)
+    return LineCounts(total, blank, comment), False
+
+
+def count_lines(data: bytes, syntax: CommentSyntax = HASH_COMMENTS) -> LineCounts:
+    """Return the line counts of the content of a file."""
+    return _count(data, syntax)[0]
+
+
+def count_file_lines(
+    file_path: str,
+    syntax: Optional[CommentSyntax] = None,
+    on_read: Optional[Callable[[int], None]] = None,
+) -> LineCounts:
+    """
+    Return the line counts of a file, with the comment syntax of its type by default.
+
+    :param file_path: The path of the file to count
+    :type file_path: str
+    :param syntax: The comment syntax of the file
+    :type syntax: CommentSyntax
+    :param on_read: Called with the number of bytes read
+    """
+    syntax = syntax or comment_syntax_for(file_path)
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            data = f.read()
+            if on_read is not None:
+                on_read(len(data))
+            return count_lines(data, syntax)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            size = len(mapped)
+            if on_read is not None:
+                on_read(size)
+            total = blank = comment = 0
+            in_block = False
+            start = 0
+            while start < size:
+                end = min(start + WINDOW_SIZE, size)
+                if end < size:
+                    newline = mapped.rfind(b"\n", start, end)
+                    if newline == -1:
+                        newline = mapped.find(b"\n", end)
+                    end = newline + 1 if newline != -1 else size
+                counts, in_block = _count(mapped[start:end], syntax, in_block)
+                total += counts.total
+                blank += counts.blank
+                comment += counts.comment
+                start = end
+            return LineCounts(total, blank, comment)
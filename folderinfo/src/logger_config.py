@@ -1,7 +1,9 @@
+import logging
 import structlog
 
 
 def configure_logging():
+    logging.basicConfig(level=logging.INFO)
     structlog.configure(
         processors=[
             structlog.stdlib.add_log_level,
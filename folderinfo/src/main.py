@@ -1,17 +1,44 @@
-from folderinfo.src.config_handler import ConfigHandler
-from folderinfo.src.file_processor import FileProcessor
-from folderinfo.src.project_summary import ProjectSummary
-from folderinfo.src.logger_config import configure_logging
+# Only what the command line itself needs is imported here; each command imports the
+# modules it runs, so that `--help` and daemon-backed commands start quickly.
+from folderinfo.src.output_writers import WRITERS
+from folderinfo.src.daemon_client import SOCKET_ENV_VAR, DaemonClient, DaemonError
 import click
 import json
+import contextlib
+import os
 
 
 @click.group()
-def cli():
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    help="Run commands in this process even if a `folderinfo serve` daemon is running.",
+)
+def cli(no_daemon):
     """Main CLI group for folderinfo."""
     pass
 
 
+def daemon_request(command, **args):
+    """Run `command` on a running daemon, returning None when it should run here instead."""
+    if click.get_current_context().find_root().params.get("no_daemon"):
+        return None
+    try:
+        return DaemonClient().request(command, **args)
+    except DaemonError as e:
+        raise click.ClickException(f"Daemon: {e}")
+
+
+def echo_analysis(analysis):
+    for key, body in analysis.items():
+        if isinstance(body, dict) and "lines" in body:
+            click.echo(f"Processing file: {key}")
+            for line in body.get("lines", []):
+                click.echo(line.strip())
+        else:
+            click.echo(f"Unexpected item in analysis: {body}")
+
+
 @cli.command()
 @click.option("--config", default="config.ini", help="Path to the configuration file.")
 @click.option(
@@ -24,18 +51,71 @@ def cli():
 @click.option(
     "--file-types", type=str, help="File types to include in the list. Comma-separated."
 )
-def generate(config, directory, output, lines_to_read, file_types):
+@click.option(
+    "--gitignore",
+    is_flag=True,
+    help="Skip paths matched by .gitignore files. Overrides [Main] UseGitignore.",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(["json", "jsonl"]),
+    help="File list format. Defaults to jsonl for .jsonl outputs, json otherwise.",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(dir_okay=False),
+    help="Also record each file's size, mtime and hash here, for analyze --since.",
+)
+@click.option(
+    "--discovery",
+    type=click.Choice(["filesystem", "git"]),
+    help="List files by walking the directory or from the git index. "
+    "Overrides [Main] Discovery.",
+)
+def generate(
+    config,
+    directory,
+    output,
+    lines_to_read,
+    file_types,
+    gitignore,
+    fmt,
+    manifest,
+    discovery,
+):
     """Generate a file list based on the provided directory and config."""
-    configure_logging()
-    config_handler = ConfigHandler(config)
-
+    overrides = []
     if lines_to_read:
-        config_handler.config.set("Main", "LinesToRead", str(lines_to_read))
+        overrides.append(("Main", "LinesToRead", str(lines_to_read)))
     if file_types:
-        config_handler.config.set("Main", "FileTypes", file_types)
+        overrides.append(("Main", "FileTypes", file_types))
+    if gitignore:
+        overrides.append(("Main", "UseGitignore", "true"))
+    if discovery:
+        overrides.append(("Main", "Discovery", discovery))
 
-    processor = FileProcessor(config_handler)
-    processor.generate_file_list(directory, output)
+    result = daemon_request(
+        "generate",
+        config=config,
+        directory=directory,
+        output=output,
+        fmt=fmt,
+        manifest=manifest,
+        overrides=overrides,
+    )
+    if result is None:
+        from folderinfo.src.config_handler import ConfigHandler
+        from folderinfo.src.file_processor import FileProcessor
+        from folderinfo.src.logger_config import configure_logging
+
+        configure_logging()
+        config_handler = ConfigHandler(config)
+        for section, key, value in overrides:
+            config_handler.config.set(section, key, value)
+
+        processor = FileProcessor(config_handler)
+        processor.generate_file_list(directory, output, fmt, manifest)
 
     click.echo(f"File list generated and saved to {output}.")
 
@@ -44,23 +124,453 @@ def generate(config, directory, output, lines_to_read, file_types):
 @click.option("--config", default="config.ini", help="Path to the configuration file.")
 @click.option(
     "--file-list",
-    required=True,
     type=click.Path(exists=True),
-    help="File list generated in previous phase.",
+    help="File list generated in previous phase (JSON or JSON Lines).",
 )
-def analyze(config, file_list):
-    """Analyze files based on a given file list."""
+@click.option(
+    "--directory",
+    type=click.Path(exists=True, file_okay=False),
+    help="Discover and analyze files in one pass instead of reading a file list.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes to analyze with; 0 uses one per CPU.",
+)
+@click.option(
+    "--io-concurrency",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="File reads kept in flight ahead of a serial analysis (for NFS/FUSE).",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory of the analysis cache. Overrides [Cache] Directory.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    help="Stream results to this file instead of echoing them.",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(sorted(WRITERS)),
+    default="text",
+    show_default=True,
+    help="Format of the --output file.",
+)
+@click.option(
+    "--no-cache", is_flag=True, help="Analyze every file, bypassing the cache."
+)
+@click.option(
+    "--rebuild-cache", is_flag=True, help="Discard cached results before analyzing."
+)
+@click.option(
+    "--since",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Manifest of a previous run; only files changed since are analyzed.",
+)
+@click.option(
+    "--previous",
+    type=click.Path(exists=True, dir_okay=False),
+    help="jsonl or binary results of the --since run. Defaults to --output.",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(dir_okay=False),
+    help="Write the manifest of this run (may be the --since manifest).",
+)
+@click.option(
+    "--stats",
+    "stats_output",
+    type=click.Path(dir_okay=False),
+    help="Write per-stage timings, counters and the slowest files as JSON.",
+)
+@click.option(
+    "--token-budget",
+    type=click.IntRange(min=1),
+    help="Keep the results that fit in about this many tokens, truncating the last ones.",
+)
+@click.option(
+    "--graph",
+    "graph_output",
+    type=click.Path(dir_okay=False),
+    help="Write the cross-file import and call graph to this file.",
+)
+@click.option("--profile", is_flag=True, help="Run under cProfile and tracemalloc.")
+@click.option(
+    "--profile-output",
+    default="folderinfo.prof",
+    show_default=True,
+    help="cProfile dump for --profile; allocations go to <file>.mem.txt.",
+)
+def analyze(
+    config,
+    file_list,
+    directory,
+    jobs,
+    io_concurrency,
+    output,
+    fmt,
+    cache_dir,
+    no_cache,
+    rebuild_cache,
+    since,
+    previous,
+    manifest,
+    stats_output,
+    token_budget,
+    graph_output,
+    profile,
+    profile_output,
+):
+    """Analyze files based on a given file list or directory."""
+    if bool(file_list) == bool(directory):
+        raise click.UsageError("Provide exactly one of --file-list or --directory.")
+
+    # Incremental runs and diagnostics need this process; everything else can use a daemon.
+    if not (since or previous or manifest or stats_output or graph_output or profile):
+        result = daemon_request(
+            "analyze",
+            config=config,
+            file_list=file_list,
+            directory=directory,
+            jobs=jobs,
+            io_concurrency=io_concurrency,
+            output=output,
+            fmt=fmt,
+            cache_dir=cache_dir,
+            no_cache=no_cache,
+            rebuild_cache=rebuild_cache,
+            token_budget=token_budget,
+        )
+        if result is not None:
+            if result["cache"]:
+                click.echo(f"Cache: {result['cache']}")
+            if result.get("budget"):
+                click.echo(f"Token budget: {result['budget']}")
+            if output:
+                click.echo(f"Analysis of {result['count']} files written to {output}.")
+            else:
+                echo_analysis(result["analysis"])
+            return
+
+    from folderinfo.src.config_handler import ConfigHandler
+    from folderinfo.src.file_processor import FileProcessor
+    from folderinfo.src.analysis_cache import AnalysisCache
+    from folderinfo.src.output_writers import get_writer
+    from folderinfo.src.instrumentation import profiled
+    from folderinfo.src.import_graph import ImportGraphBuilder
+    from folderinfo.src.logger_config import configure_logging
+
+    configure_logging()
     config_handler = ConfigHandler(config)
     processor = FileProcessor(config_handler)
-    analysis = processor.analyze_from_list(file_list)
+    # Previous results must be loaded before the writer truncates --output.
+    fingerprint = processor.config_fingerprint()
+    incremental = load_incremental(
+        since, previous, manifest, output, fmt, directory, fingerprint
+    )
+    writer = get_writer(fmt, output, directory) if output else None
+    index = ImportGraphBuilder(directory or os.curdir) if graph_output else None
 
-    for key, body in analysis.items():
-        if isinstance(body, dict) and "lines" in body:
-            click.echo(f"Processing file: {key}")
-            for line in body.get("lines", []):
-                click.echo(line.strip())
-        else:
-            click.echo(f"Unexpected item in analysis: {body}")
+    def run(cache=None):
+        # With an output file, results are streamed to it and not kept in memory,
+        # unless a token budget has to see all of them first.
+        stream = writer is not None and token_budget is None
+        options = dict(
+            jobs=jobs,
+            cache=cache,
+            writer=writer if stream else None,
+            retain=not stream,
+            io_concurrency=io_concurrency,
+            incremental=incremental,
+            index=index,
+        )
+        if directory:
+            return processor.analyze_directory(directory, **options)
+        return processor.analyze_from_list(file_list, **options)
+
+    cache = None
+    # The manifest replaces the previous one only if the run completes; a failed run keeps it.
+    manifest_writer = incremental.manifest_writer if incremental is not None else None
+    with manifest_writer or contextlib.nullcontext():
+        try:
+            with profiled(profile_output) if profile else contextlib.nullcontext():
+                if no_cache:
+                    analysis = run()
+                else:
+                    with AnalysisCache.from_config(
+                        config_handler,
+                        fingerprint,
+                        cache_dir=cache_dir,
+                        rebuild=rebuild_cache,
+                    ) as cache:
+                        analysis = run(cache)
+                    click.echo(f"Cache: {cache.stats}")
+            if token_budget is not None:
+                analysis = apply_token_budget(
+                    analysis, token_budget, processor, directory, writer
+                )
+            if index is not None:
+                graph = index.build()
+                graph.save(graph_output)
+                click.echo(
+                    f"Import graph of {len(graph.files)} files written to {graph_output}."
+                )
+        finally:
+            if writer is not None:
+                writer.close()
+
+    if incremental is not None:
+        click.echo(
+            "Changes: "
+            + ", ".join(f"{n} {kind}" for kind, n in incremental.counts.items())
+        )
+
+    if stats_output:
+        summary = processor.stats.as_dict()
+        if cache is not None:
+            summary["cache"] = cache.stats.as_dict()
+        with open(stats_output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    if profile:
+        click.echo(f"Profile written to {profile_output}.")
+
+    if writer is not None:
+        click.echo(f"Analysis of {writer.count} files written to {output}.")
+        return
+
+    echo_analysis(analysis)
+
+
+@cli.command()
+@click.option("--config", default="config.ini", help="Path to the configuration file.")
+@click.option(
+    "--directory",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory to summarize.",
+)
+@click.option(
+    "--top",
+    default=10,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Number of largest files to list.",
+)
+@click.option(
+    "--depth",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Path components below the directory that group the per-directory totals.",
+)
+@click.option(
+    "--no-lines",
+    is_flag=True,
+    help="Only stat the files instead of reading them to count their lines.",
+)
+@click.option(
+    "--results",
+    type=click.Path(exists=True, dir_okay=False),
+    help="A jsonl or binary analysis of the directory to add function and class counts from.",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Print the summary as JSON instead of tables.",
+)
+def summary(config, directory, top, depth, no_lines, results, as_json):
+    """Summarize the sizes, lines and types of the files an analysis would cover."""
+    from folderinfo.src.project_summary import ProjectSummary
+
+    options = dict(lines=not no_lines, top=top, depth=depth)
+    result = daemon_request(
+        "summary", config=config, directory=directory, results=results, **options
+    )
+    if result is None:
+        from folderinfo.src.config_handler import ConfigHandler
+        from folderinfo.src.output_writers import read_results
+
+        analysis = read_results(results, directory) if results else None
+        result = ProjectSummary(directory, ConfigHandler(config)).collect(
+            results=analysis, **options
+        )
+    if as_json:
+        click.echo(json.dumps(result, indent=2))
+    else:
+        click.echo(ProjectSummary.render(result))
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help=f"Socket to listen on. Defaults to ${SOCKET_ENV_VAR} or a per-user runtime path.",
+)
+@click.option("--stop", is_flag=True, help="Stop the daemon listening on the socket.")
+def serve(socket_path, stop):
+    """Run a local daemon that answers generate, analyze and summary requests."""
+    if stop:
+        try:
+            result = DaemonClient(socket_path).request("shutdown")
+        except DaemonError as e:
+            raise click.ClickException(str(e))
+        if result is None:
+            raise click.ClickException("No daemon is running.")
+        click.echo(f"Stopped daemon {result['pid']}.")
+        return
+
+    from folderinfo.src.daemon import AnalysisDaemon
+    from folderinfo.src.logger_config import configure_logging
+
+    configure_logging()
+    try:
+        daemon = AnalysisDaemon(socket_path)
+    except OSError as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Listening on {daemon.socket_path}. Stop with `folderinfo serve --stop`."
+    )
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@click.option("--config", default="config.ini", help="Path to the configuration file.")
+@click.option(
+    "--directory",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory to analyze and watch.",
+)
+@click.option(
+    "--output",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="File kept up to date with the analysis.",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(sorted(WRITERS)),
+    default="jsonl",
+    show_default=True,
+    help="Format of the --output file.",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.01),
+    default=1.0,
+    show_default=True,
+    help="Seconds between scans when polling.",
+)
+@click.option(
+    "--polling", is_flag=True, help="Poll for changes instead of using inotify."
+)
+def watch(config, directory, output, fmt, interval, polling):
+    """Analyze a directory, then re-analyze files as they change."""
+    from folderinfo.src.config_handler import ConfigHandler
+    from folderinfo.src.file_processor import FileProcessor
+    from folderinfo.src.watcher import WatchSession, create_watcher
+    from folderinfo.src.logger_config import configure_logging
+
+    configure_logging()
+    processor = FileProcessor(ConfigHandler(config))
+    watcher = create_watcher(processor, directory, interval, polling)
+    session = WatchSession(processor, directory, output, fmt, watcher)
+    click.echo(f"Watching {directory}, writing {output}. Press Ctrl+C to stop.")
+    try:
+        session.run(lambda n: click.echo(f"Updated {n} files in {output}."))
+    except KeyboardInterrupt:
+        pass
+
+
+GRAPH_QUERIES = {
+    "imports": "imports_of",
+    "importers": "importers_of",
+    "dependencies": "dependencies",
+    "dependents": "reverse_dependencies",
+    "callees": "callees_of",
+    "callers": "callers_of",
+}
+
+
+@cli.command()
+@click.argument("graph_file", type=click.Path(exists=True, dir_okay=False))
+@click.argument("query", type=click.Choice(list(GRAPH_QUERIES)))
+@click.argument("name")
+def graph(graph_file, query, name):
+    """
+    Query an import graph written by `analyze --graph`.
+
+    NAME is a file, as a relative path or dotted module name, or a function as
+    `file:function` for `callers` and `callees`. `dependencies` and `dependents`
+    follow imports transitively.
+    """
+    from folderinfo.src.import_graph import ImportGraph
+
+    import_graph = ImportGraph.load(graph_file)
+    try:
+        found = getattr(import_graph, GRAPH_QUERIES[query])(name)
+    except KeyError:
+        raise click.ClickException(f"{name} is not in the graph.")
+    for item in found:
+        click.echo(item)
+
+
+def apply_token_budget(analysis, token_budget, processor, directory, writer=None):
+    """Cut `analysis` down to `token_budget` tokens, writing it to `writer` if there is one."""
+    from folderinfo.src.token_budget import TokenBudget
+
+    budget = TokenBudget(token_budget, processor.specified_files, directory)
+    analysis = budget.select(analysis)
+    if writer is not None:
+        for file_path, result in analysis.items():
+            writer.write(file_path, result)
+    click.echo(f"Token budget: {budget}")
+    return analysis
+
+
+def load_incremental(since, previous, manifest, output, fmt, directory, fingerprint):
+    """
+    Build the `IncrementalAnalysis` for `analyze --since`, or None without --since. The manifest
+    of this run is recorded with the `fingerprint` of its settings.
+    """
+    from folderinfo.src.manifest import IncrementalAnalysis, Manifest, ManifestWriter
+    from folderinfo.src.output_writers import read_results
+
+    if not since:
+        if manifest:
+            # Nothing to compare against: record a fresh manifest of this run.
+            return IncrementalAnalysis(
+                Manifest(fingerprint=fingerprint),
+                {},
+                ManifestWriter(manifest, fingerprint),
+            )
+        return None
+    if not previous:
+        if not (output and fmt in ("jsonl", "binary") and os.path.exists(output)):
+            raise click.UsageError(
+                "--since needs the previous results: pass --previous or a jsonl/binary --output."
+            )
+        previous = output
+    return IncrementalAnalysis(
+        Manifest.load(since),
+        read_results(previous, directory),
+        ManifestWriter(manifest, fingerprint) if manifest else None,
+    )
 
 
 @cli.command()
@@ -75,6 +585,8 @@ def set_config(section, key, value, raw_config):
     Set configuration values.
     If --raw-config is provided, it takes precedence.
     """
+    from folderinfo.src.config_handler import ConfigHandler
+
     config_handler = ConfigHandler(use_env_var=False)
 
     if raw_config:
@@ -0,0 +1,220 @@
+import os
+import json
+import logging
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from . import utils
+
+MANIFEST_VERSION = 1
+
+
+class Manifest:
+    """
+    The size, `mtime_ns` and content hash of every file seen by a run, keyed by path.
+
+    Manifests are stored as JSON Lines: a header line followed by one entry per
+    file. Hashes are git blob SHA-1s (see `utils.file_digest`). A file whose size
+    and mtime match its entry is considered unchanged without being opened. The
+    header records the `FileProcessor.config_fingerprint` of the run, if known.
+    """
+
+    def __init__(
+        self,
+        entries: Optional[Dict[str, dict]] = None,
+        known_digests=None,
+        fingerprint: Optional[str] = None,
+    ):
+        self.entries = entries or {}
+        # Optional source of already known content digests, such as a `GitIndex`.
+        self.known_digests = known_digests
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def load(cls, manifest_path: str) -> "Manifest":
+        entries = {}
+        fingerprint = None
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "path" in record:
+                    entries[record["path"]] = record
+                elif "version" in record:
+                    fingerprint = record.get("fingerprint")
+        return cls(entries, fingerprint=fingerprint)
+
+    @classmethod
+    def load_if_exists(cls, manifest_path: str) -> "Manifest":
+        return cls.load(manifest_path) if os.path.exists(manifest_path) else cls()
+
+    def compare(self, file_path: str) -> Tuple[bool, dict]:
+        """
+        The `compare` function checks a file against its recorded entry, hashing it only when its
+        size or mtime moved.
+
+        :param file_path: The path of the file, as recorded in the manifest
+        :type file_path: str
+        :return: a tuple `(unchanged, entry)` where `entry` describes the file as it is now.
+        """
+        stat = os.stat(file_path)
+        previous = self.entries.get(file_path)
+        if (
+            previous is not None
+            and previous["size"] == stat.st_size
+            and previous["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return True, previous
+        digest = None
+        if self.known_digests is not None:
+            digest = self.known_digests.digest(file_path, stat)
+        entry = {
+            "path": file_path,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": digest or utils.file_digest(file_path),
+        }
+        return previous is not None and previous["hash"] == entry["hash"], entry
+
+
+class ManifestWriter:
+    """Writes manifest entries to a temporary file that replaces the target on close."""
+
+    def __init__(self, manifest_path: str, fingerprint: Optional[str] = None):
+        self.manifest_path = manifest_path
+        self.count = 0
+        self._tmp_path = f"{manifest_path}.tmp"
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+        header = {"version": MANIFEST_VERSION}
+        if fingerprint is not None:
+            header["fingerprint"] = fingerprint
+        self._file.write(json.dumps(header) + "\n")
+
+    def write(self, entry: dict):
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+        os.replace(self._tmp_path, self.manifest_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(self._tmp_path)
+
+
+def write_manifest(
+    paths: Iterable[str],
+    manifest_path: str,
+    known_digests=None,
+    fingerprint: Optional[str] = None,
+) -> Iterable[str]:
+    """
+    The `write_manifest` function passes `paths` through unchanged while recording a manifest entry
+    for each of them. Hashes recorded in an existing manifest at `manifest_path` are reused for files
+    whose size and mtime did not change, so unchanged files are not read.
+
+    :param paths: The file paths, typically a discovery generator
+    :param manifest_path: The manifest to write (and update)
+    :type manifest_path: str
+    :param known_digests: An optional source of known digests, such as a `GitIndex`
+    :param fingerprint: The settings fingerprint recorded in the header
+    :type fingerprint: str (optional)
+    """
+    previous = Manifest.load_if_exists(manifest_path)
+    previous.known_digests = known_digests
+    with ManifestWriter(manifest_path, fingerprint) as writer:
+        for path in paths:
+            writer.write(previous.compare(path)[1])
+            yield path
+
+
+class IncrementalAnalysis:
+    """
+    Analyzes only the files that changed since a previous run's manifest.
+
+    Files whose entry in `since` is unchanged, and whose result is found in
+    `previous_results`, are carried forward without being opened; added and
+    modified files are analyzed; files missing from the new run are dropped.
+    The output stays complete and in input order. When `manifest_writer` is
+    given, the manifest of this run is written as it goes.
+
+    Previous results are only reused if `since` was recorded with the same
+    settings fingerprint as the processor of this run; otherwise every file
+    counts as modified.
+    """
+
+    def __init__(
+        self,
+        since: Manifest,
+        previous_results: Dict[str, dict],
+        manifest_writer: Optional[ManifestWriter] = None,
+    ):
+        self.since = since
+        self.previous_results = previous_results
+        self.manifest_writer = manifest_writer
+        self.counts = {"added": 0, "modified": 0, "unchanged": 0, "deleted": 0}
+        self.settings_changed = False
+
+    def _classify(self, file_path: str) -> bool:
+        try:
+            unchanged, entry = self.since.compare(file_path)
+        except OSError as e:
+            # Let the analysis report the missing or unreadable file.
+            logging.warning(f"Cannot stat {file_path}: {e}")
+            unchanged, entry = False, None
+        if self.manifest_writer is not None and entry is not None:
+            self.manifest_writer.write(entry)
+        unchanged = (
+            unchanged
+            and not self.settings_changed
+            and file_path in self.previous_results
+        )
+        if unchanged:
+            self.counts["unchanged"] += 1
+        elif file_path in self.since.entries:
+            self.counts["modified"] += 1
+        else:
+            self.counts["added"] += 1
+        return unchanged
+
+    def run(self, processor, files: Iterable[str], **options):
+        """
+        The `run` function yields `(file_path, result)` pairs for `files`, analyzing only changed
+        files with `processor.iter_analysis` (to which `options` are passed).
+        """
+        order = deque()
+        seen = set()
+        self.settings_changed = self.since.fingerprint != processor.config_fingerprint()
+        if self.settings_changed and self.since.entries:
+            logging.info("Settings changed since the manifest: analyzing every file.")
+
+        def changed_files():
+            for file_path in files:
+                seen.add(file_path)
+                unchanged = self._classify(file_path)
+                order.append((file_path, unchanged))
+                if not unchanged:
+                    yield file_path
+
+        for file_path, file_result in processor.iter_analysis(
+            changed_files(), **options
+        ):
+            while order[0][1]:
+                carried = order.popleft()[0]
+                yield carried, self.previous_results[carried]
+            order.popleft()
+            yield file_path, file_result
+        while order:
+            carried = order.popleft()[0]
+            yield carried, self.previous_results[carried]
+
+        self.counts["deleted"] = len(set(self.since.entries) - seen)
+        logging.info(f"Incremental analysis: {self.counts}")
@@ -0,0 +1,231 @@
+import os
+import json
+from typing import Optional
+
+# Number of rendered results held before they are written out in one call.
+DEFAULT_BUFFER_SIZE = 64
+
+
+def display_path(file_path: str, directory: Optional[str]) -> str:
+    """
+    Return `file_path` without its leading `directory`, if it lies inside it, so that
+    `directory + display_path(...)` gives the path back. A sibling such as `/a/bc` is not inside
+    `/a/b`.
+    """
+    if not directory or not file_path.startswith(directory):
+        return file_path
+    rest = file_path[len(directory) :]
+    if directory.endswith(os.sep) or rest.startswith(os.sep):
+        return rest
+    return file_path
+
+
+class AnalysisWriter:
+    """
+    Base class for sinks that receive analysis results one file at a time.
+
+    Rendered results are held in a bounded buffer and flushed every
+    `buffer_size` files, so a writer never holds more than that many results
+    regardless of how many files are analyzed.
+    """
+
+    # Binary writers render `bytes` and open their file in binary mode.
+    binary = False
+
+    def __init__(
+        self,
+        output_filename: str,
+        directory: Optional[str] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        self.output_filename = output_filename
+        self.directory = directory
+        self.buffer_size = max(1, buffer_size)
+        self.count = 0
+        self._buffer = []
+        if self.binary:
+            self._file = open(output_filename, "wb")
+        else:
+            self._file = open(output_filename, "w", encoding="utf-8")
+        self._write_header()
+
+    def display_path(self, file_path: str) -> str:
+        """Return `file_path` relative to the project directory, if it lies inside it."""
+        return display_path(file_path, self.directory)
+
+    def write(self, file_path: str, result: dict):
+        self._buffer.append(self._render(file_path, result))
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write((b"" if self.binary else "").join(self._buffer))
+            self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        self._write_footer()
+        self._file.close()
+
+    def _write_header(self):
+        pass
+
+    def _write_footer(self):
+        pass
+
+    def _render(self, file_path: str, result: dict) -> str:
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TextReportWriter(AnalysisWriter):
+    """The plain-text report: the head lines of each file followed by its AST summary."""
+
+    def _write_header(self):
+        self._file.write(f"Project dir: {self.directory}\n")
+
+    def _render(self, file_path: str, result: dict) -> str:
+        if not isinstance(result, dict):
+            return f"Unexpected item in analysis: {result}\n"
+        parts = []
+        if "lines" in result:
+            parts.append(f"{self.display_path(file_path)}\n")
+            parts.extend(line.strip() + "\n" for line in result.get("lines", []))
+        if "ast" in result:
+            parts.append("AST: \n")
+            parts.append(str(result.get("ast")) + "\n")
+        if "truncated" in result:
+            parts.append(f"AST truncated: {result['truncated']} limit reached\n")
+        if result.get("skipped") == "size":
+            parts.append("AST skipped: larger than MaxParseBytes\n")
+        if "error" in result:
+            parts.append(f"Error: {result['error']}\n")
+        return "".join(parts)
+
+
+class JsonLinesWriter(AnalysisWriter):
+    """One compact JSON object per line, each carrying its relative `path`."""
+
+    def _render(self, file_path: str, result: dict) -> str:
+        record = {"path": self.display_path(file_path), **result}
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+class JsonWriter(AnalysisWriter):
+    """A single compact JSON object mapping each relative path to its result."""
+
+    def _write_header(self):
+        self._file.write("{")
+
+    def _render(self, file_path: str, result: dict) -> str:
+        separator = "," if self.count else ""
+        key = json.dumps(self.display_path(file_path))
+        return f"{separator}{key}:{json.dumps(result, separators=(',', ':'))}"
+
+    def _write_footer(self):
+        self._file.write("}\n")
+
+
+def read_json_lines(filename: str, directory: Optional[str] = None) -> dict:
+    """
+    Load the results of a `JsonLinesWriter` output back into a `{file_path: result}` dictionary,
+    re-joining each relative `path` to the `directory` it was written for.
+    """
+    results = {}
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            path = result.pop("path")
+            results[directory + path if directory else path] = result
+    return results
+
+
+def read_results(filename: str, directory: Optional[str] = None) -> dict:
+    """
+    Load a `jsonl` or `binary` results file into a `{file_path: result}` dictionary, like
+    `read_json_lines`.
+    """
+    from .binary_format import MAGIC
+
+    with open(filename, "rb") as f:
+        is_binary = f.read(len(MAGIC)) == MAGIC
+    if not is_binary:
+        return read_json_lines(filename, directory)
+    from .results_store import ResultsStore
+
+    with ResultsStore(filename) as store:
+        return {
+            directory + path if directory else path: result
+            for path, result in store.items()
+        }
+
+
+class BinaryWriter(AnalysisWriter):
+    """
+    The compact binary format of `binary_format`: encoded records keyed by relative path, a
+    shared string table for identifiers and a sorted path index, read by `ResultsStore`.
+    """
+
+    binary = True
+
+    def _write_header(self):
+        # Imported here so that the command line does not load the encoder at startup.
+        from . import binary_format
+
+        self._format = binary_format
+        self._strings = binary_format.StringTable()
+        self._index = []
+        self._offset = binary_format.HEADER.size
+        self._file.write(b"\0" * binary_format.HEADER.size)
+
+    def _render(self, file_path: str, result: dict) -> bytes:
+        record = bytearray()
+        self._format.encode_value(result, self._strings, record)
+        self._index.append((self.display_path(file_path), self._offset, len(record)))
+        self._offset += len(record)
+        return bytes(record)
+
+    def _write_footer(self):
+        strings_offset = self._offset
+        strings = self._strings.encode()
+        self._file.write(strings)
+        self._file.write(self._format.encode_index(self._index))
+        self._file.seek(0)
+        self._file.write(
+            self._format.HEADER.pack(
+                self._format.MAGIC,
+                self._format.VERSION,
+                0,
+                len(self._index),
+                strings_offset,
+                strings_offset + len(strings),
+            )
+        )
+
+
+WRITERS = {
+    "text": TextReportWriter,
+    "jsonl": JsonLinesWriter,
+    "json": JsonWriter,
+    "binary": BinaryWriter,
+}
+
+
+def get_writer(
+    fmt: str, output_filename: str, directory: Optional[str] = None, **kwargs
+):
+    """Instantiate the writer registered for `fmt` (`text`, `jsonl`, `json` or `binary`)."""
+    try:
+        writer_class = WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown output format: {fmt}") from None
+    return writer_class(output_filename, directory, **kwargs)
@@ -1,26 +1,261 @@
 import os
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+from .line_counter import count_file_lines
+
+# Upper bounds (exclusive) of the file size histogram buckets, in bytes; the last
+# bucket holds everything from the last bound up.
+SIZE_BUCKETS = (1 << 10, 1 << 12, 1 << 14, 1 << 16, 1 << 18, 1 << 20)
+PERCENTILES = (50, 90, 99)
+DEFAULT_TOP = 10
+
+# Columns that are summed per extension, per directory and over the whole tree.
+_TOTALS = ("files", "bytes", "lines", "blank", "comment", "functions", "classes")
+
+
+def _percentile(sorted_values, percent: int) -> int:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0
+    rank = max(1, -(-percent * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _bucket_label(i: int) -> str:
+    if i == 0:
+        return f"< {_format_bytes(SIZE_BUCKETS[0])}"
+    if i == len(SIZE_BUCKETS):
+        return f">= {_format_bytes(SIZE_BUCKETS[-1])}"
+    return f"{_format_bytes(SIZE_BUCKETS[i - 1])} - {_format_bytes(SIZE_BUCKETS[i])}"
 
 
 class ProjectSummary:
-    def __init__(self, directory: str, config):
+    """
+    Statistics about the files a `FileProcessor` would analyze under a directory.
+
+    The files come from the processor's own discovery (so `Ignores`, `FileTypes`, `.gitignore`
+    and `Discovery = git` apply), and each one adds a row to column arrays: size, line count,
+    and the function and class counts of an analysis when results are given. Totals by
+    extension and by directory, percentiles, the largest files and a size histogram are then
+    computed over the columns rather than per file object.
+    """
+
+    def __init__(self, directory: str, config, processor=None):
         self.directory = directory
-        self.count_lines_extensions = config.get("Main", "FileTypes").split(",")
+        self.config = config
+        self._processor = processor
 
-    def generate_summary(self):
-        extension_counts = {}
-        directory_count = 0
+    @property
+    def processor(self):
+        if self._processor is None:
+            from .file_processor import FileProcessor
+
+            self._processor = FileProcessor(self.config)
+        return self._processor
 
-        for root, _, files in os.walk(self.directory):
-            if "venv" in root:
+    def _directory_key(self, file_path: str, depth: int) -> str:
+        relative = os.path.relpath(os.path.dirname(file_path), self.directory)
+        if relative == os.curdir:
+            return relative
+        return "/".join(relative.split(os.sep)[:depth])
+
+    def collect(
+        self,
+        lines: bool = True,
+        top: int = DEFAULT_TOP,
+        depth: int = 1,
+        results: Optional[Dict[str, dict]] = None,
+    ) -> dict:
+        """
+        The `collect` function walks the directory once and returns the summary as a dictionary.
+
+        :param lines: Count the total, blank and comment lines of every file, which reads them unless
+        `results` has their counts; sizes alone only need a stat
+        :type lines: bool
+        :param top: The number of largest files to list
+        :type top: int
+        :param depth: The number of path components below the directory that group files by directory
+        :type depth: int
+        :param results: An optional `{file_path: result}` analysis, whose function and class counts
+        are added to the summary and whose line counts are used instead of reading the files
+        :type results: dict
+        :return: a JSON-serializable dictionary of totals, groupings, percentiles and the histogram.
+        """
+        paths: List[str] = []
+        sizes = array("q")
+        line_counts = array("q")
+        blank_counts = array("q")
+        comment_counts = array("q")
+        functions = array("q")
+        classes = array("q")
+        extension_ids = array("I")
+        directory_ids = array("I")
+        extensions: Dict[str, int] = {}
+        directories: Dict[str, int] = {}
+        # Files come directory by directory, so the group of each parent is computed once.
+        parents: Dict[str, int] = {}
+        analysis = results or {}
+
+        for file_path in self.processor.discover_files(self.directory):
+            result = analysis.get(file_path, {})
+            try:
+                size = os.stat(file_path).st_size
+                if not lines:
+                    counts = (0, 0, 0)
+                elif "line_counts" in result:
+                    counts = (
+                        result["line_counts"]["total"],
+                        result["line_counts"]["blank"],
+                        result["line_counts"]["comment"],
+                    )
+                else:
+                    counts = count_file_lines(file_path)
+            except OSError:
                 continue
-            directory_count += 1
-            for file_name in files:
-                _, ext = os.path.splitext(file_name)
-                if ext in self.count_lines_extensions:
-                    extension_counts[ext] = extension_counts.get(ext, 0) + 1
-
-        print(f"Directory: {self.directory}")
-        print(f"Total directories: {directory_count}")
-        print("File counts by type:")
-        for ext, count in extension_counts.items():
-            print(f"{ext}: {count}")
+            parent, _, name = file_path.rpartition(os.sep)
+            directory_id = parents.get(parent)
+            if directory_id is None:
+                directory = self._directory_key(file_path, depth)
+                directory_id = directories.setdefault(directory, len(directories))
+                parents[parent] = directory_id
+            ext = os.path.splitext(name)[1]
+            paths.append(file_path)
+            sizes.append(size)
+            line_counts.append(counts[0])
+            blank_counts.append(counts[1])
+            comment_counts.append(counts[2])
+            extension_ids.append(extensions.setdefault(ext, len(extensions)))
+            directory_ids.append(directory_id)
+            ast_summary = result.get("ast") or {}
+            functions.append(len(ast_summary.get("f", ())))
+            classes.append(len(ast_summary.get("c", ())))
+
+        columns = {"bytes": sizes}
+        if lines:
+            columns["lines"] = line_counts
+            columns["blank"] = blank_counts
+            columns["comment"] = comment_counts
+        if results is not None:
+            columns["functions"] = functions
+            columns["classes"] = classes
+        sorted_sizes = sorted(sizes)
+        sorted_lines = sorted(line_counts) if lines else None
+        largest = heapq.nlargest(top, range(len(sizes)), key=sizes.__getitem__)
+        # Files below each bound, read off the sorted sizes.
+        below = [bisect_left(sorted_sizes, bound) for bound in SIZE_BUCKETS]
+        histogram = [
+            high - low for low, high in zip([0] + below, below + [len(sorted_sizes)])
+        ]
+
+        def relative(file_path):
+            return os.path.relpath(file_path, self.directory).replace(os.sep, "/")
+
+        return {
+            "directory": self.directory,
+            "directories": len(parents),
+            "totals": {
+                "files": len(paths),
+                **{name: sum(column) for name, column in columns.items()},
+            },
+            "extensions": self._group(extensions, extension_ids, columns),
+            "by_directory": self._group(directories, directory_ids, columns),
+            "percentiles": {
+                name: {f"p{p}": _percentile(values, p) for p in PERCENTILES}
+                for name, values in (("bytes", sorted_sizes), ("lines", sorted_lines))
+                if values is not None
+            },
+            "largest": [
+                {"path": relative(paths[i]), "bytes": sizes[i], "lines": line_counts[i]}
+                for i in largest
+            ],
+            "histogram": [
+                {"range": _bucket_label(i), "files": count}
+                for i, count in enumerate(histogram)
+            ],
+        }
+
+    @staticmethod
+    def _group(keys: Dict[str, int], ids: array, columns: Dict[str, array]) -> dict:
+        """
+        Sum every column per group id, returning the groups by decreasing size. The rows are
+        ordered by group once; each column is then permuted into that order and summed one
+        contiguous slice per group.
+        """
+        counts = Counter(ids)
+        files = [counts[group] for group in range(len(keys))]
+        ends = list(accumulate(files))
+        spans = list(zip([0] + ends[:-1], ends))
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        totals = {"files": files}
+        for name, column in columns.items():
+            grouped = array(column.typecode, map(column.__getitem__, order))
+            totals[name] = [sum(grouped[start:end]) for start, end in spans]
+        groups = {
+            key: {name: sums[i] for name, sums in totals.items()}
+            for key, i in keys.items()
+        }
+        return dict(
+            sorted(groups.items(), key=lambda item: (-item[1]["bytes"], item[0]))
+        )
+
+    @staticmethod
+    def render(summary: dict) -> str:
+        """Render a summary from `collect` as console tables."""
+        totals = summary["totals"]
+        columns = [name for name in _TOTALS if name in totals]
+        lines = [
+            f"Directory: {summary['directory']}",
+            f"Total directories: {summary['directories']}",
+            "Totals: " + ", ".join(f"{totals[name]} {name}" for name in columns),
+        ]
+
+        def table(title, groups):
+            width = max([len(title)] + [len(key) for key in groups])
+            lines.append("")
+            lines.append(
+                title.ljust(width) + "".join(name.rjust(12) for name in columns)
+            )
+            for key, row in groups.items():
+                lines.append(
+                    key.ljust(width)
+                    + "".join(str(row[name]).rjust(12) for name in columns)
+                )
+
+        table("Extension", summary["extensions"])
+        table("Directory", summary["by_directory"])
+
+        lines.append("")
+        for name, values in summary["percentiles"].items():
+            lines.append(
+                f"{name.capitalize()} percentiles: "
+                + ", ".join(f"{p} {value}" for p, value in values.items())
+            )
+        if summary["largest"]:
+            lines.append("")
+            lines.append("Largest files:")
+            lines.extend(
+                f"{_format_bytes(item['bytes']).rjust(12)}  {item['path']}"
+                for item in summary["largest"]
+            )
+        lines.append("")
+        lines.append("File sizes:")
+        peak = max([bucket["files"] for bucket in summary["histogram"]] + [1])
+        for bucket in summary["histogram"]:
+            bar = "#" * round(40 * bucket["files"] / peak)
+            lines.append(f"{bucket['range'].rjust(22)}  {bar} {bucket['files']}")
+        return "\n".join(lines)
+
+    def generate_summary(self):
+        print(self.render(self.collect()))
@@ -0,0 +1,161 @@
+import os
+import mmap
+from collections.abc import Mapping
+from typing import Iterator, List, Optional, Tuple
+
+from .binary_format import (
+    HEADER,
+    INDEX_ENTRY,
+    MAGIC,
+    VERSION,
+    BinaryFormatError,
+    decode_strings,
+    decode_value,
+)
+
+
+class ResultsStore(Mapping):
+    """
+    Random access to a binary results file written by `output_writers.BinaryWriter`.
+
+    The file is memory-mapped rather than read. Opening it only checks the header;
+    a lookup binary-searches the sorted, fixed-width index in place, so it costs
+    O(log n) path comparisons, and decodes that one record straight from the
+    mapping. The string table is decoded on the first record lookup.
+
+    Paths are the ones the writer stored, relative to its project directory when it
+    had one (for example `/src/app.py`). The store is a read-only `Mapping` from
+    those paths to results, iterated in path order.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise BinaryFormatError(f"Empty results file: {filename}")
+        try:
+            self._read_header()
+        except BinaryFormatError:
+            self._map.close()
+            raise
+        self._view = memoryview(self._map)
+        self._strings: Optional[List[str]] = None
+
+    def _read_header(self):
+        if len(self._map) < HEADER.size:
+            raise BinaryFormatError(f"Truncated header: {self.filename}")
+        magic, version, _, count, strings_offset, index_offset = HEADER.unpack_from(
+            self._map
+        )
+        if magic != MAGIC:
+            raise BinaryFormatError(
+                f"Not a folderinfo binary results file: {self.filename}"
+            )
+        if version != VERSION:
+            raise BinaryFormatError(
+                f"Unsupported format version {version}: {self.filename}"
+            )
+        self._count = count
+        self._strings_offset = strings_offset
+        self._index_offset = index_offset
+        self._paths_offset = index_offset + count * INDEX_ENTRY.size
+        if self._paths_offset > len(self._map):
+            raise BinaryFormatError(f"Truncated index: {self.filename}")
+
+    @property
+    def strings(self) -> List[str]:
+        if self._strings is None:
+            self._strings = decode_strings(
+                self._view[self._strings_offset : self._index_offset]
+            )
+        return self._strings
+
+    def _entry(self, i: int) -> Tuple[int, int, int, int]:
+        return INDEX_ENTRY.unpack_from(
+            self._map, self._index_offset + i * INDEX_ENTRY.size
+        )
+
+    def _path_bytes(self, i: int) -> bytes:
+        _, _, path_offset, path_length = self._entry(i)
+        start = self._paths_offset + path_offset
+        return self._map[start : start + path_length]
+
+    def _bisect(self, raw: bytes) -> int:
+        """Return the position of the first index entry whose path is not below `raw`."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._path_bytes(middle) < raw:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find(self, path: str) -> Optional[int]:
+        raw = path.encode("utf-8", errors="surrogatepass")
+        i = self._bisect(raw)
+        if i < self._count and self._path_bytes(i) == raw:
+            return i
+        return None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, path) -> bool:
+        return isinstance(path, str) and self._find(path) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return self.paths()
+
+    def raw(self, path: str) -> memoryview:
+        """
+        Return the encoded record of `path` as a view into the mapped file, without copying it.
+        Release the view before closing the store.
+        """
+        i = self._find(path)
+        if i is None:
+            raise KeyError(path)
+        offset, length, _, _ = self._entry(i)
+        return self._view[offset : offset + length]
+
+    def __getitem__(self, path: str) -> dict:
+        with self.raw(path) as record:
+            return decode_value(record, 0, self.strings)[0]
+
+    def paths(self, prefix: str = "") -> Iterator[str]:
+        """Iterate, in order, over the stored paths that start with `prefix`."""
+        raw_prefix = prefix.encode("utf-8", errors="surrogatepass")
+        for i in range(self._bisect(raw_prefix), self._count):
+            raw = self._path_bytes(i)
+            if not raw.startswith(raw_prefix):
+                break
+            yield raw.decode("utf-8", errors="surrogatepass")
+
+    def under(self, directory: str) -> Iterator[Tuple[str, dict]]:
+        """
+        The `under` function yields the `(path, result)` pairs of the files stored below `directory`,
+        at any depth, in path order. Only the records of those files are decoded.
+
+        :param directory: A stored directory path, such as `/src`, or an empty string for all files
+        :type directory: str
+        :return: an iterator over `(path, result)` tuples.
+        """
+        prefix = (
+            directory
+            if not directory or directory.endswith(os.sep)
+            else directory + os.sep
+        )
+        for path in self.paths(prefix):
+            yield path, self[path]
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,182 @@
+"""
+Fit analysis results into a token budget, for pasting a project into an LLM context.
+
+Tokens are estimated locally with a regular expression that approximates how
+byte-pair tokenizers split source code: runs of letters count one token per six
+characters, numbers one per three digits, and every punctuation mark or
+non-ASCII character one token; whitespace is free.
+"""
+
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .output_writers import display_path
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]{1,6}|\d{1,3}|[^\sA-Za-z\d]")
+
+# Estimated tokens of the "AST:" line and the braces of the AST summary.
+AST_OVERHEAD = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Return the estimated number of tokens of `text`."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _module_names(file_path: str) -> Tuple[str, ...]:
+    """The names other modules would import `file_path` by."""
+    stem, _ = os.path.splitext(os.path.basename(file_path))
+    if stem == "__init__":
+        return (os.path.basename(os.path.dirname(file_path)),)
+    return (stem,)
+
+
+def import_counts(analysis: Dict[str, dict]) -> Counter:
+    """
+    Count, for every module name, how many imports in `analysis` refer to it, by the last
+    component of the imported name (`from a.b import c` counts for `b` and `c`).
+    """
+    counts = Counter()
+    for result in analysis.values():
+        ast_summary = result.get("ast") or {}
+        for imported in ast_summary.get("i", ()):
+            names = {imported["n"].rsplit(".", 1)[-1]}
+            if imported.get("m"):
+                names.add(imported["m"].rsplit(".", 1)[-1])
+            counts.update(names)
+    return counts
+
+
+class TokenBudget:
+    """
+    Selects and truncates analysis results so that their text report fits in `budget` tokens.
+
+    Files are taken in priority order: `specified_files` first, then the modules imported most
+    often by the other files, then the cheapest. Each file is included whole when it fits;
+    otherwise its head lines and AST entries are cut to the tokens left, and files that no
+    longer fit at all are omitted. Every result is estimated once, so the whole report is
+    never rendered to be measured.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        specified_files: Iterable[str] = (),
+        directory: Optional[str] = None,
+    ):
+        self.budget = budget
+        self.specified_files = set(specified_files)
+        self.directory = directory
+        self.used = 0
+        self.counts = {"full": 0, "truncated": 0, "omitted": 0}
+
+    def _path_cost(self, file_path: str) -> int:
+        return estimate_tokens(display_path(file_path, self.directory)) + 1
+
+    def _costs(self, file_path: str, result: dict):
+        """Return the cost of the path, of each line and of each AST entry of `result`."""
+        line_costs = [estimate_tokens(line) + 1 for line in result.get("lines", ())]
+        ast_costs = []
+        for key, value in (result.get("ast") or {}).items():
+            if isinstance(value, list):
+                ast_costs.append((key, [estimate_tokens(str(v)) + 1 for v in value]))
+            else:
+                ast_costs.append((key, [estimate_tokens(str(value)) + 1]))
+        extra = estimate_tokens(str(result["error"])) + 2 if "error" in result else 0
+        return self._path_cost(file_path) + extra, line_costs, ast_costs
+
+    def rank(self, analysis: Dict[str, dict]) -> List[str]:
+        """Return the paths of `analysis` in the order they are given room in the budget."""
+        imports = import_counts(analysis)
+        sizes = {
+            path: sum(len(line) for line in result.get("lines", ()))
+            for path, result in analysis.items()
+        }
+
+        def priority(path):
+            centrality = sum(imports[name] for name in _module_names(path))
+            return (
+                os.path.basename(path) not in self.specified_files,
+                -centrality,
+                sizes[path],
+            )
+
+        return sorted(analysis, key=priority)
+
+    def _truncate(self, result: dict, line_costs, ast_costs, remaining: int):
+        """Return a copy of `result` cut to `remaining` tokens after its path."""
+        truncated = {
+            key: value for key, value in result.items() if key not in ("lines", "ast")
+        }
+        kept = 0
+        for cost in line_costs:
+            if cost > remaining:
+                break
+            remaining -= cost
+            kept += 1
+        truncated["lines"] = result.get("lines", [])[:kept]
+        if ast_costs and remaining > AST_OVERHEAD:
+            left = remaining - AST_OVERHEAD
+            ast_summary = {}
+            for key, costs in ast_costs:
+                count = 0
+                for cost in costs:
+                    if cost > left:
+                        break
+                    left -= cost
+                    count += 1
+                if count:
+                    value = result["ast"][key]
+                    ast_summary[key] = (
+                        value[:count] if isinstance(value, list) else value
+                    )
+            if ast_summary:
+                truncated["ast"] = ast_summary
+                remaining = left
+        return truncated, remaining
+
+    def select(self, analysis: Dict[str, dict]) -> Dict[str, dict]:
+        """
+        The `select` function returns the part of `analysis` that fits in the budget, in the
+        original order of `analysis`, truncating the results that only fit in part.
+
+        :param analysis: The `{file_path: result}` dictionary of an analysis run
+        :type analysis: dict
+        :return: a `{file_path: result}` dictionary of the selected, possibly truncated results.
+        """
+        selected = {}
+        for file_path in self.rank(analysis):
+            result = analysis[file_path]
+            remaining = self.budget - self.used
+            base, line_costs, ast_costs = self._costs(file_path, result)
+            total = base + sum(line_costs)
+            if ast_costs:
+                total += AST_OVERHEAD + sum(sum(costs) for _, costs in ast_costs)
+            if total <= remaining:
+                selected[file_path] = result
+                self.used += total
+                self.counts["full"] += 1
+                continue
+            # A truncated file must keep more than its path to be worth listing.
+            if base < remaining and (line_costs or ast_costs):
+                truncated, left = self._truncate(
+                    result, line_costs, ast_costs, remaining - base
+                )
+                if left < remaining - base:
+                    selected[file_path] = truncated
+                    self.used += remaining - left
+                    self.counts["truncated"] += 1
+                    continue
+            self.counts["omitted"] += 1
+        return {path: selected[path] for path in analysis if path in selected}
+
+    def as_dict(self) -> dict:
+        return {"budget": self.budget, "used": self.used, **self.counts}
+
+    def __str__(self):
+        return (
+            f"{self.used} of {self.budget} tokens, {self.counts['full']} files in full, "
+            f"{self.counts['truncated']} truncated, {self.counts['omitted']} omitted"
+        )
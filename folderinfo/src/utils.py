@@ -1,8 +1,69 @@
+import os
+import hashlib
+
+from .ast_analyzer import ClassRecord, FunctionRecord, ImportFromRecord, ImportRecord
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 16) -> str:
+    """
+    Return the SHA-1 of a file's content, computed the way git hashes blobs.
+
+    Using git's blob format means the digest matches the object id git stores for
+    the same content, so either can stand in for the other.
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha1(f"blob {size}\0".encode())
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def str_to_bool(value) -> bool:
+    """Interpret a configuration value such as "true", "no" or "1" as a boolean."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _legacy_records(items: list, record_type) -> list:
+    """
+    Convert a list of definitions in the dictionary shape of earlier results to records, once
+    per list. Lists of records are returned as they are.
+    """
+    if not isinstance(items[0], dict):
+        return items
+    return [
+        record_type(*(item.get(field) for field in record_type._fields))
+        for item in items
+    ]
+
+
+def _legacy_imports(imports: list) -> list:
+    """Like `_legacy_records` for imports, where a `module` key marks a `from` import."""
+    if not isinstance(imports[0], dict):
+        return imports
+    return [
+        (
+            ImportFromRecord(
+                imp["name"], imp.get("alias"), imp["module"], imp.get("level")
+            )
+            if "module" in imp
+            else ImportRecord(imp["name"], imp.get("alias"))
+        )
+        for imp in imports
+    ]
+
+
 def reduce_tokens(data):
     """
     The `reduce_tokens` function takes in a dictionary of data and returns a reduced version of the data
     with specific keys and values.
 
+    The short-key dictionaries are built straight from the `ast_analyzer` records, reading their
+    fields by attribute. Results in the dictionary shape of earlier versions are converted to
+    records first.
+
     :param data: The `data` parameter is a dictionary that contains information about a code file. It
     can have the following keys:
     :return: The function `reduce_tokens` returns a new dictionary `new_data` that contains reduced
@@ -17,35 +78,45 @@ def reduce_tokens(data):
 
     # Handle functions
     if data.get("functions"):
-        new_data["f"] = [
-            {
-                "n": func["name"],
-                "l": func["line"],
-                **({"d": func["docstring"]} if func.get("docstring") else {}),
-                **({"a": func["calls"]} if func.get("calls") else {}),
-            }
-            for func in data["functions"]
-        ]
+        functions = []
+        for func in _legacy_records(data["functions"], FunctionRecord):
+            reduced = {"n": func.name, "l": func.line}
+            docstring, calls = func.docstring, func.calls
+            if docstring:
+                reduced["d"] = docstring
+            if calls:
+                reduced["a"] = calls
+            functions.append(reduced)
+        new_data["f"] = functions
 
     # Handle classes
     if data.get("classes"):
-        new_data["c"] = [
-            {
-                "n": cls["name"],
-                "l": cls["line"],
-                **({"d": cls["docstring"]} if cls.get("docstring") else {}),
-                **({"m": cls["methods"]} if cls.get("methods") else {}),
-            }
-            for cls in data["classes"]
-        ]
-
-    # Handle imports
+        classes = []
+        for cls in _legacy_records(data["classes"], ClassRecord):
+            reduced = {"n": cls.name, "l": cls.line}
+            docstring, methods = cls.docstring, cls.methods
+            if docstring:
+                reduced["d"] = docstring
+            if methods:
+                reduced["m"] = methods
+            classes.append(reduced)
+        new_data["c"] = classes
+
+    # Handle imports; relative imports keep their level and renamed ones their alias,
+    # which the import graph needs to resolve them.
     if data.get("imports"):
-        new_data["i"] = [
-            {"n": imp["name"], **({"m": imp["module"]} if "module" in imp else {})}
-            if isinstance(imp, dict)
-            else imp["name"]
-            for imp in data["imports"]
-        ]
+        imports = []
+        for imp in _legacy_imports(data["imports"]):
+            reduced = {"n": imp.name}
+            if isinstance(imp, ImportFromRecord):
+                reduced["m"] = imp.module
+                level = imp.level
+                if level:
+                    reduced["lv"] = level
+            alias = imp.alias
+            if alias:
+                reduced["as"] = alias
+            imports.append(reduced)
+        new_data["i"] = imports
 
     return new_data
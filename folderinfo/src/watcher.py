@@ -0,0 +1,305 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from .output_writers import get_writer
+
+# Seconds between scans of the polling watcher.
+DEFAULT_POLL_INTERVAL = 1.0
+# Seconds to keep collecting events after the first one, so that editors that save
+# through a temporary file and a rename produce a single update.
+DEFAULT_SETTLE = 0.05
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONTFOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+    | IN_DONTFOLLOW
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _iter_dirs(directory: str, ignored_dirs: Set[str]):
+    """Yield `directory` and every directory below it that is not ignored by name."""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        yield current
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if (
+                        entry.is_dir(follow_symlinks=False)
+                        and entry.name not in ignored_dirs
+                    ):
+                        stack.append(entry.path)
+        except OSError:
+            continue
+
+
+def _iter_tree_files(directory: str, ignored_dirs: Set[str]):
+    for current in _iter_dirs(directory, ignored_dirs):
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if not entry.is_dir(follow_symlinks=False):
+                        yield entry.path
+        except OSError:
+            continue
+
+
+class InotifyWatcher:
+    """
+    Reports changed paths under a directory tree using Linux inotify, through `ctypes`.
+
+    Every directory that is not ignored gets a watch; directories created or
+    moved in later are watched as they appear, and the files they bring along
+    are reported. If the kernel queue overflows, `changes` returns None to ask
+    the caller for a full rescan.
+    """
+
+    def __init__(self, directory: str, ignored_dirs: Iterable[str] = ()):
+        # The symbols of the running process include the C library on Linux.
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directory = str(Path(directory))
+        self.ignored_dirs = set(ignored_dirs)
+        self._watches: Dict[int, str] = {}
+        for path in _iter_dirs(self.directory, self.ignored_dirs):
+            self._add_watch(path)
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), ctypes.c_uint32(_WATCH_MASK)
+        )
+        if wd < 0:
+            logging.warning(f"Cannot watch {path}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._watches[wd] = path
+
+    def _read_events(self, changed: Set[str]) -> bool:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return True
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return False
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            parent = self._watches.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, name)
+            if mask & IN_ISDIR:
+                if name in self.ignored_dirs:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    for subdir in _iter_dirs(path, self.ignored_dirs):
+                        self._add_watch(subdir)
+                    changed.update(_iter_tree_files(path, self.ignored_dirs))
+                else:
+                    # Let the caller drop what it knew under the removed directory.
+                    changed.add(path)
+                continue
+            changed.add(path)
+        return True
+
+    def changes(self, timeout: Optional[float] = None) -> Optional[Set[str]]:
+        """
+        The `changes` function waits up to `timeout` seconds for file system events and returns the
+        paths that were created, written, moved or deleted.
+
+        :param timeout: Seconds to wait for a first event, or None to wait indefinitely
+        :type timeout: float (optional)
+        :return: the set of changed paths (empty on timeout), or None after a queue overflow.
+        """
+        changed = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+        while ready:
+            if not self._read_events(changed):
+                return None
+            ready, _, _ = select.select([self._fd], [], [], DEFAULT_SETTLE)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """
+    Reports changed files by comparing the size and mtime of every file from one scan
+    to the next. Used where inotify is unavailable.
+    """
+
+    def __init__(self, list_files: Callable[[], Iterable[str]], interval: float):
+        self.list_files = list_files
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        for path in self.list_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout: Optional[float] = None) -> Optional[Set[str]]:
+        """Scan again after the polling interval (or `timeout`, if shorter) and return changed paths."""
+        delay = self.interval if timeout is None else min(timeout, self.interval)
+        time.sleep(delay)
+        snapshot = self._scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        return {
+            path
+            for path in previous.keys() | snapshot.keys()
+            if previous.get(path) != snapshot.get(path)
+        }
+
+    def close(self):
+        pass
+
+
+def create_watcher(
+    processor,
+    directory: str,
+    interval: float = DEFAULT_POLL_INTERVAL,
+    polling: bool = False,
+):
+    """
+    Return an `InotifyWatcher` for `directory` on Linux, or a `PollingWatcher` that rescans it
+    with `processor.discover_files` every `interval` seconds when inotify is unavailable or
+    `polling` is set.
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory, processor.ignored_dirs)
+        except OSError as e:
+            logging.warning(f"inotify unavailable ({e}), polling every {interval}s.")
+    return PollingWatcher(lambda: processor.discover_files(directory), interval)
+
+
+class WatchSession:
+    """
+    Keeps the analysis of a directory in memory and rewrites the output file each time
+    files change, re-analyzing only the changed files with `FileProcessor`.
+
+    The output is written to a temporary file that then replaces `output`, so readers
+    never see a partial file.
+    """
+
+    def __init__(self, processor, directory: str, output: str, fmt: str, watcher=None):
+        self.processor = processor
+        self.directory = str(Path(directory))
+        self.output = output
+        self.fmt = fmt
+        self.watcher = watcher
+        self.results: Dict[str, dict] = {}
+        self._tmp_path = f"{output}.tmp"
+        self._ignored_dirs = set(processor.ignored_dirs)
+        self._file_types = set(processor.file_types)
+
+    def _selected(self, file_path: str) -> bool:
+        """Apply the discovery filters to a single path reported by the watcher."""
+        relative = os.path.relpath(file_path, self.directory)
+        *parents, name = relative.split(os.sep)
+        if os.pardir in parents or self._ignored_dirs.intersection(parents):
+            return False
+        if name in self.processor.ignored_files:
+            return False
+        return (
+            name in self.processor.specified_files
+            or os.path.splitext(name)[1] in self._file_types
+        )
+
+    def analyze_all(self):
+        """Analyze the whole directory and write the output."""
+        self.results = self.processor.analyze_directory(self.directory)
+        self.write()
+
+    def update(self, paths: Optional[Set[str]]) -> int:
+        """
+        The `update` function re-analyzes the changed `paths` that are still selected files, drops
+        the results of the ones that are gone and rewrites the output. `None` triggers a full
+        re-analysis.
+
+        :param paths: The changed paths reported by the watcher
+        :return: the number of results that changed.
+        """
+        if paths is None:
+            self.analyze_all()
+            return len(self.results)
+        updated = 0
+        own_files = {os.path.abspath(self.output), os.path.abspath(self._tmp_path)}
+        for path in sorted(paths):
+            if os.path.abspath(path) in own_files:
+                continue
+            if os.path.isfile(path) and self._selected(path):
+                self.results[path] = self.processor._process_file_safe(path)
+                updated += 1
+                continue
+            prefix = path + os.sep
+            for stale in [p for p in self.results if p == path or p.startswith(prefix)]:
+                del self.results[stale]
+                updated += 1
+        if updated:
+            self.write()
+        return updated
+
+    def write(self):
+        with get_writer(self.fmt, self._tmp_path, self.directory) as writer:
+            for file_path, result in self.results.items():
+                writer.write(file_path, result)
+        os.replace(self._tmp_path, self.output)
+
+    def run(self, on_update: Optional[Callable[[int], None]] = None):
+        """Analyze the directory, then apply changes as they happen until interrupted."""
+        self.analyze_all()
+        try:
+            while True:
+                updated = self.update(self.watcher.changes())
+                if updated and on_update is not None:
+                    on_update(updated)
+        finally:
+            self.watcher.close()
@@ -0,0 +1,60 @@
+import os
+import json
+from folderinfo.src.analysis_cache import AnalysisCache
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+
+def _write_file_list(tmp_path, files):
+    file_list = tmp_path / "file_list.json"
+    file_list.write_text(json.dumps([str(f) for f in files]))
+    return str(file_list)
+
+
+def test_unchanged_files_are_served_from_cache(tmp_path):
+    """A second run serves unchanged files from the cache and re-analyzes edits."""
+    module = tmp_path / "module.py"
+    module.write_text("def hello():\n    return 1\n")
+    other = tmp_path / "other.py"
+    other.write_text("X = 1\n")
+    file_list = _write_file_list(tmp_path, [module, other])
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+    cache_dir = str(tmp_path / "cache")
+
+    with AnalysisCache(cache_dir, processor.config_fingerprint()) as cache:
+        first = processor.analyze_from_list(file_list, cache=cache)
+    assert cache.stats.misses == 2
+
+    other.write_text("Y = 2\n")
+    with AnalysisCache(cache_dir, processor.config_fingerprint()) as cache:
+        second = processor.analyze_from_list(file_list, cache=cache)
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert second[str(module)] == first[str(module)]
+    assert second[str(other)]["lines"] == ["Y = 2"]
+
+    with AnalysisCache(
+        cache_dir, processor.config_fingerprint(), rebuild=True
+    ) as cache:
+        processor.analyze_from_list(file_list, cache=cache)
+    assert cache.stats.hits == 0
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Entries beyond the size bound are evicted, oldest first."""
+    files = []
+    for i in range(5):
+        path = tmp_path / f"file{i}.md"
+        path.write_text(f"line {i}\n")
+        files.append(path)
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+
+    with AnalysisCache(
+        str(tmp_path / "cache"), processor.config_fingerprint(), max_bytes=100
+    ) as cache:
+        processor.analyze_from_list(_write_file_list(tmp_path, files), cache=cache)
+    assert cache.stats.stored == 5
+    assert cache.stats.evicted > 0
@@ -0,0 +1,119 @@
+import ast
+import time
+from folderinfo.src.ast_analyzer import AstAnalyzer, GlobalRecord
+from folderinfo.src.utils import reduce_tokens
+
+SOURCE = '''
+"""Module docstring.
+
+More details.
+"""
+import os
+from typing import List as L
+
+CONSTANT = 1
+
+
+class Greeter:
+    """Say hello."""
+
+    def greet(self, name):
+        return format_name(name)
+
+
+def outer(a, b):
+    """Outer function."""
+
+    def inner():
+        return helper()
+
+    return inner()
+'''
+
+
+def test_analyze_collects_all_categories():
+    """All categories are collected from a single parse."""
+    analyzer = AstAnalyzer()
+    results = analyzer.analyze(SOURCE)
+
+    assert results["docstring"].startswith("Module docstring.")
+    assert [f.name for f in results["functions"]] == ["greet", "outer", "inner"]
+    assert results["classes"][0].methods == ["greet"]
+    assert GlobalRecord("CONSTANT") in results["global_variables"]
+    assert [i.name for i in results["imports"]] == ["os", "List"]
+    assert results["imports"][1].module == "typing"
+
+
+def test_calls_match_per_function_walk():
+    """Calls are attributed to every enclosing function, like ast.walk did."""
+    analyzer = AstAnalyzer()
+    results = analyzer.analyze(SOURCE)
+
+    tree = ast.parse(SOURCE)
+    expected = {
+        node.name: analyzer.get_function_calls(node)
+        for node in ast.walk(tree)
+        if isinstance(node, ast.FunctionDef)
+    }
+    for func in results["functions"]:
+        assert sorted(func.calls) == sorted(expected[func.name])
+
+
+def test_unrequested_categories_are_skipped():
+    """Only the requested categories are reported."""
+    analyzer = AstAnalyzer()
+    results = analyzer.analyze(SOURCE, categories={"imports"})
+
+    assert results["functions"] is None
+    assert results["classes"] is None
+    assert results["docstring"] is None
+    assert len(results["imports"]) == 2
+
+
+def test_records_reduce_like_dictionaries():
+    """Records and the dictionaries they replaced reduce to the same short-key form."""
+    analyzer = AstAnalyzer()
+    results = analyzer.analyze(SOURCE)
+    outer = results["functions"][1]
+
+    assert outer.name == "outer"
+    assert outer._asdict()["arguments"] == ["a", "b"]
+    expected = {
+        "f": [
+            {"n": "greet", "l": 15, "a": ["format_name"]},
+            {"n": "outer", "l": 19, "d": "Outer function.", "a": ["helper", "inner"]},
+            {"n": "inner", "l": 22, "a": ["helper"]},
+        ],
+        "c": [{"n": "Greeter", "l": 12, "d": "Say hello.", "m": ["greet"]}],
+        "i": [{"n": "os"}, {"n": "List", "m": "typing", "as": "L"}],
+    }
+    assert reduce_tokens(results) == expected
+
+    # Results in the dictionary shape of earlier versions reduce the same way.
+    as_dicts = {
+        key: (
+            [record._asdict() for record in value] if isinstance(value, list) else value
+        )
+        for key, value in results.items()
+    }
+    assert reduce_tokens(as_dicts) == expected
+
+
+def test_limits_truncate_the_traversal():
+    """A node budget or an expired deadline keeps what was collected and says why it stopped."""
+    analyzer = AstAnalyzer()
+    assert analyzer.analyze(SOURCE)["functions"]
+    assert analyzer.truncated is None
+
+    results = analyzer.analyze(SOURCE, max_nodes=20)
+    assert analyzer.truncated == "nodes"
+    assert [f.name for f in results["functions"]] == ["greet"]
+    assert [c.name for c in results["classes"]] == ["Greeter"]
+
+    results = analyzer.analyze(SOURCE, deadline=0.0)
+    assert analyzer.truncated == "timeout"
+    assert results["functions"] == [] and results["classes"] == []
+    assert results["docstring"].startswith("Module docstring.")
+
+    analyzer.analyze(SOURCE, max_nodes=10_000, deadline=time.perf_counter() + 60)
+    assert analyzer.truncated is None
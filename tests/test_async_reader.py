@@ -0,0 +1,66 @@
+import time
+
+from folderinfo.src.async_reader import iter_read_ahead
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+
+CONFIG = {
+    "Main": {
+        "LinesToRead": "5",
+        "FileTypes": ".py,.md",
+        "Ignores": "",
+        "IgnoredFiles": "",
+        "SpecifiedFiles": "",
+    },
+    "AST": {"AnalyzeFunctionNames": "true"},
+}
+LATENCY = 0.02
+
+
+class ThrottledFileProcessor(FileProcessor):
+    """Stands in for a network filesystem: every file read pays a fixed latency."""
+
+    def _load_file(self, file_path, on_read=None):
+        time.sleep(LATENCY)
+        return super()._load_file(file_path, on_read)
+
+
+def test_read_ahead_keeps_order_and_returns_errors():
+    """Results come back in input order and failed reads are returned, not raised."""
+
+    def read(item):
+        time.sleep(0.001 * (10 - item))
+        if item == 3:
+            raise ValueError("bad item")
+        return item * 2
+
+    results = list(iter_read_ahead(range(10), read, concurrency=4))
+    assert [item for item, _ in results] == list(range(10))
+    assert isinstance(results[3][1], ValueError)
+    assert results[4][1] == 8
+
+
+def test_concurrent_reads_hide_filesystem_latency(tmp_path):
+    """With reads in flight ahead of the analysis, latency overlaps instead of adding up."""
+    files = []
+    for i in range(20):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text(f"def function_{i}():\n    return {i}\n")
+        files.append(str(path))
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+    files.append(str(tmp_path / "broken.py"))
+
+    processor = ThrottledFileProcessor(ConfigHandler(CONFIG))
+    start = time.perf_counter()
+    serial = dict(processor.iter_analysis(files))
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = dict(processor.iter_analysis(files, io_concurrency=10))
+    concurrent_seconds = time.perf_counter() - start
+
+    assert list(concurrent) == files
+    assert concurrent == serial
+    assert "error" in concurrent[str(tmp_path / "broken.py")]
+    assert serial_seconds >= len(files) * LATENCY
+    assert concurrent_seconds < serial_seconds / 2
@@ -0,0 +1,75 @@
+import os
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+from folderinfo.src.results_store import ResultsStore
+from folderinfo.src.output_writers import BinaryWriter, JsonLinesWriter, read_json_lines
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+
+def test_binary_results_match_json_lines(tmp_path):
+    """The binary output decodes to the same results as the JSON Lines output."""
+    directory = os.path.join(TEST_DIR, "sample_data")
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+    analysis = processor.analyze_directory(directory)
+    jsonl = str(tmp_path / "results.jsonl")
+    binary = str(tmp_path / "results.bin")
+    for path, writer_class in ((jsonl, JsonLinesWriter), (binary, BinaryWriter)):
+        with writer_class(path, directory) as writer:
+            for file_path, result in analysis.items():
+                writer.write(file_path, result)
+
+    expected = read_json_lines(jsonl)
+    with ResultsStore(binary) as store:
+        assert len(store) == len(expected)
+        assert list(store) == sorted(expected)
+        assert dict(store) == expected
+
+
+def test_reader_decodes_single_records(tmp_path):
+    """Records are fetched through the index, and repeated names are stored once."""
+    calls = [
+        {"n": "helper", "l": line, "a": ["os.path.join", "x"]} for line in range(50)
+    ]
+    results = {
+        "/src/a.py": {"f": calls, "h": ["import os", "", "x = 'é'"], "size": -3},
+        "/src/b.py": {"error": "unreadable", "ratio": 0.5, "empty": None, "ok": False},
+    }
+    output = str(tmp_path / "results.bin")
+    with BinaryWriter(output, "/src") as writer:
+        for file_path, result in results.items():
+            writer.write(file_path, result)
+
+    with ResultsStore(output) as store:
+        assert "/b.py" in store
+        assert store["/b.py"] == results["/src/b.py"]
+        assert store["/a.py"] == results["/src/a.py"]
+        assert store.strings.count("os.path.join") == 1
+    with open(output, "rb") as f:
+        assert f.read().count(b"os.path.join") == 1
+
+
+def test_store_lookups_and_directory_queries(tmp_path):
+    """Lookups binary-search the index; directory queries return only files below it."""
+    paths = [f"/pkg{i % 3}/sub/m{i}.py" for i in range(200)] + [
+        "/pkg1.py",
+        "/pkg1/x.py",
+    ]
+    output = str(tmp_path / "results.bin")
+    with BinaryWriter(output) as writer:
+        for path in paths:
+            writer.write(path, {"name": os.path.basename(path)})
+
+    with ResultsStore(output) as store:
+        assert "/pkg2/sub/m5.py" in store and "/pkg2/sub/m6.py" not in store
+        assert store.get("/missing.py") is None
+        below = dict(store.under("/pkg1"))
+        expected = sorted(p for p in paths if p.startswith("/pkg1/"))
+        assert list(below) == expected
+        assert below["/pkg1/x.py"] == {"name": "x.py"}
+        assert list(store.paths("/pkg0/sub/m1")) == sorted(
+            p for p in paths if p.startswith("/pkg0/sub/m1")
+        )
+        with store.raw("/pkg1.py") as record:
+            assert isinstance(record, memoryview)
@@ -0,0 +1,109 @@
+import os
+import threading
+import pytest
+from folderinfo.src.analysis_cache import AnalysisCache
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.daemon import AnalysisDaemon, DaemonClient, DaemonError
+from folderinfo.src.file_processor import FileProcessor
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+
+def test_daemon_answers_requests_from_client_directory(tmp_path, monkeypatch):
+    """Requests run in the client's working directory and match a local run."""
+    socket_path = str(tmp_path / "folderinfo.sock")
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "module.py").write_text("def hello():\n    return 1\n")
+    (project / "notes.md").write_text("notes\n")
+    monkeypatch.chdir(tmp_path)
+
+    client = DaemonClient(socket_path)
+    assert client.request("ping") is None
+
+    daemon = AnalysisDaemon(socket_path)
+    thread = threading.Thread(target=daemon.serve)
+    thread.start()
+    try:
+        assert client.request("ping")["pid"] == os.getpid()
+
+        result = client.request(
+            "analyze",
+            config=CONFIG_PATH,
+            directory="project",
+            cache_dir=str(tmp_path / "cache"),
+        )
+        local = FileProcessor(ConfigHandler(CONFIG_PATH)).analyze_directory("project")
+        assert result["analysis"] == local
+        assert result["cache"].startswith("0 hits, 2 misses")
+        again = client.request(
+            "analyze",
+            config=CONFIG_PATH,
+            directory="project",
+            cache_dir=str(tmp_path / "cache"),
+        )
+        assert again["cache"].startswith("2 hits, 0 misses")
+
+        # The daemon keeps its cache open but not locked: a local run can write to it.
+        processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+        with AnalysisCache(str(tmp_path / "cache"), "other", rebuild=True) as cache:
+            processor.analyze_directory("project", cache=cache)
+            assert cache.stats.stored == 2
+
+        summary = client.request("summary", config=CONFIG_PATH, directory="project")
+        assert {ext: row["files"] for ext, row in summary["extensions"].items()} == {
+            ".py": 1,
+            ".md": 1,
+        }
+        assert summary["totals"]["lines"] == 3
+
+        with pytest.raises(DaemonError):
+            client.request("unknown")
+    finally:
+        client.request("shutdown")
+        thread.join(timeout=5)
+    assert not os.path.exists(socket_path)
+
+
+def test_daemon_reuses_discovered_files_until_a_directory_changes(
+    tmp_path, monkeypatch
+):
+    """A warm daemon lists an unchanged tree from memory and re-walks it after a change."""
+    from folderinfo.src import file_processor
+
+    project = tmp_path / "project"
+    (project / "sub").mkdir(parents=True)
+    (project / "module.py").write_text("def hello():\n    return 1\n")
+    (project / "sub" / "notes.md").write_text("notes\n")
+    # Directories modified just before a walk are not trusted; age them.
+    for directory in (project, project / "sub"):
+        os.utime(directory, ns=(0, os.stat(directory).st_mtime_ns - 10 * 10**9))
+
+    walks = []
+
+    def counting_iter_files(directory, **options):
+        walks.append(directory)
+        return iter_files(directory, **options)
+
+    iter_files = file_processor.iter_files
+    monkeypatch.setattr(file_processor, "iter_files", counting_iter_files)
+
+    daemon = AnalysisDaemon(str(tmp_path / "folderinfo.sock"))
+    try:
+        args = dict(config=CONFIG_PATH, directory="project", no_cache=True)
+        first = daemon.dispatch("analyze", args, str(tmp_path))
+        second = daemon.dispatch("analyze", args, str(tmp_path))
+        summary = daemon.dispatch(
+            "summary", dict(config=CONFIG_PATH, directory="project"), str(tmp_path)
+        )
+        assert len(walks) == 1
+        assert second["analysis"] == first["analysis"]
+        assert summary["totals"]["files"] == 2
+
+        (project / "sub" / "added.md").write_text("added\n")
+        third = daemon.dispatch("analyze", args, str(tmp_path))
+        assert len(walks) == 2
+        assert os.path.join("project", "sub", "added.md") in third["analysis"]
+    finally:
+        daemon.close()
@@ -0,0 +1,56 @@
+import os
+from folderinfo.src.discovery import GitIgnore, iter_files
+
+
+def _touch(root, *relative_paths):
+    for relative_path in relative_paths:
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x\n")
+
+
+def test_iter_files_prunes_and_filters(tmp_path):
+    """Ignored directories are pruned by exact name and filters are applied."""
+    _touch(
+        tmp_path,
+        "app.py",
+        "notes.txt",
+        "routes.cfg",
+        "secret.py",
+        "rebuild/tool.py",
+        "build/out.py",
+        "pkg/node_modules/dep.js",
+        "pkg/mod.js",
+    )
+    files = list(
+        iter_files(
+            str(tmp_path),
+            ignored_dirs={"build", "node_modules"},
+            ignored_files={"secret.py"},
+            file_types={".py", ".js"},
+            specified_files={"routes.cfg"},
+        )
+    )
+    relative = [os.path.relpath(f, tmp_path).replace(os.sep, "/") for f in files]
+    assert relative == ["app.py", "routes.cfg", "pkg/mod.js", "rebuild/tool.py"]
+
+
+def test_iter_files_honours_gitignore(tmp_path):
+    """Nested .gitignore files are applied relative to their directory."""
+    _touch(tmp_path, "keep.py", "gen.py", "dist/app.py", "sub/a.py", "sub/b.py")
+    (tmp_path / ".gitignore").write_text("dist/\ngen.py\n")
+    (tmp_path / "sub" / ".gitignore").write_text("*.py\n!a.py\n")
+
+    files = iter_files(str(tmp_path), file_types={".py"}, use_gitignore=True)
+    relative = [os.path.relpath(f, tmp_path).replace(os.sep, "/") for f in files]
+    assert relative == ["keep.py", "sub/a.py"]
+
+
+def test_gitignore_patterns():
+    """Anchored, directory-only and double-star rules match like git."""
+    gitignore = GitIgnore(["/top.txt", "logs/", "docs/**/*.md", "# comment"])
+    assert gitignore.match("top.txt", False)
+    assert gitignore.match("nested/top.txt", False) is None
+    assert gitignore.match("a/logs", True)
+    assert gitignore.match("logs", False) is None
+    assert gitignore.match("docs/a/b/readme.md", False)
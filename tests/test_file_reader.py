@@ -0,0 +1,143 @@
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+from folderinfo.src.file_reader import (
+    BinaryFileError,
+    detect_encoding,
+    iter_head_lines,
+)
+
+import pytest
+
+CONFIG = {
+    "Main": {
+        "LinesToRead": "3",
+        "FileTypes": ".py,.json,.bin",
+        "Ignores": "build",
+        "IgnoredFiles": "",
+        "SpecifiedFiles": "",
+        "MaxHeadBytes": "1024",
+    }
+}
+
+
+def test_head_lines_match_splitlines_across_chunks(tmp_path):
+    """Chunk boundaries, CRLF pairs and multi-byte characters split cleanly."""
+    path = tmp_path / "mixed.txt"
+    content = "a\r\nb\n\nccc\rddée\nlast"
+    path.write_bytes(content.encode("utf-8"))
+
+    for chunk_size in (1, 2, 3, 64):
+        lines = list(iter_head_lines(str(path), chunk_size=chunk_size))
+        assert lines == content.splitlines()
+
+
+def test_head_read_is_bounded(tmp_path):
+    """Only the head of a large file is read, and binary files are refused."""
+    big = tmp_path / "big.json"
+    big.write_text("\n".join(f'"{i}"' for i in range(200000)))
+    assert list(iter_head_lines(str(big), max_bytes=10)) == ['"0"', '"1"', '"2']
+
+    processor = FileProcessor(ConfigHandler(CONFIG))
+    result = processor._process_file(str(big))
+    assert result["lines"] == ['"0"', '"1"', '"2"']
+
+    binary = tmp_path / "blob.bin"
+    binary.write_bytes(b"\x89PNG\r\n\x00\x00data")
+    with pytest.raises(BinaryFileError):
+        list(iter_head_lines(str(binary)))
+    assert processor._process_file(str(binary))["skipped"] == "binary"
+
+
+def test_head_skips_comments_per_file_without_drift(tmp_path):
+    """Each file gets exactly LinesToRead non-comment lines, however many came before."""
+    script = tmp_path / "script.py"
+    script.write_text(
+        "#!/usr/bin/env python\n# -*- coding: utf-8 -*-\na = 1\nb = 2\nc = 3\nd = 4\n"
+    )
+    module = tmp_path / "module.js"
+    module.write_text(
+        "/*\n * License\n */\n// note\nconst a = 1; /* x */\nlet b;\nlet c;\nlet d;\n"
+    )
+    readme = tmp_path / "README.md"
+    readme.write_text("# Title\n<!-- hidden -->\ntext\nmore\n")
+
+    processor = FileProcessor(ConfigHandler(CONFIG))
+    for _ in range(50):
+        assert processor._read_file(str(script))[0] == ["a = 1", "b = 2", "c = 3"]
+        assert processor._read_file(str(module))[0] == [
+            "const a = 1; /* x */",
+            "let b;",
+            "let c;",
+        ]
+        assert processor._read_file(str(readme))[0] == ["# Title", "text", "more"]
+    assert processor.lines_to_read == 3
+
+
+def test_detect_encoding_from_the_first_bytes():
+    assert detect_encoding("é".encode("utf-8")) == "utf-8"
+    # A character cut by the end of the sample does not make it invalid.
+    assert detect_encoding("aé".encode("utf-8")[:-1]) == "utf-8"
+    assert detect_encoding("é!".encode("latin-1")) == "latin-1"
+    assert detect_encoding("x".encode("utf-8-sig")) == "utf-8-sig"
+    assert detect_encoding("x".encode("utf-16")) == "utf-16"
+    cookie = b"#!/usr/bin/env python\n# -*- coding: latin-1 -*-\n"
+    assert detect_encoding(cookie, "m.py") == "iso8859-1"
+    assert detect_encoding(cookie, "m.txt") == "utf-8"
+    assert detect_encoding(b"x = 1\n# coding: latin-1\n", "m.py") == "utf-8"
+
+
+def test_files_in_other_encodings_are_analyzed(tmp_path):
+    """Legacy and UTF-16 text is decoded, and undecodable bytes do not abort the file."""
+    notes = tmp_path / "notes.json"
+    notes.write_bytes("caf\u00e9\n".encode("latin-1"))
+    wide = tmp_path / "wide.json"
+    wide.write_bytes("wide\u00e9\nline\n".encode("utf-16"))
+    declared = tmp_path / "declared.py"
+    declared.write_bytes(
+        "# coding: latin-1\ndef caf\u00e9():\n    pass\n".encode("latin-1")
+    )
+    # Valid UTF-8 at the start, a stray latin-1 byte much further down.
+    late = tmp_path / "late.py"
+    late.write_bytes(b"def f():\n    pass\n" + b"#" * 10000 + b"\nx = '\xe9'\n")
+
+    processor = FileProcessor(
+        ConfigHandler({**CONFIG, "AST": {"AnalyzeFunctionNames": "true"}})
+    )
+    assert processor._process_file(str(notes))["lines"] == ["caf\u00e9"]
+    assert processor._process_file(str(wide))["lines"] == ["wide\u00e9", "line"]
+    result = processor._process_file(str(declared))
+    assert result["lines"] == ["def caf\u00e9():", "pass"]
+    assert [f["n"] for f in result["ast"]["f"]] == ["caf\u00e9"]
+    assert [f["n"] for f in processor._process_file(str(late))["ast"]["f"]] == ["f"]
+
+
+def test_parse_limits_mark_results(tmp_path):
+    """Files over the limits keep their head lines and say how their AST was cut."""
+    module = tmp_path / "module.py"
+    module.write_text("".join(f"def f{i}():\n    return {i}\n" for i in range(50)))
+    limits = {"MaxParseBytes": "100000", "MaxAstNodes": "0", "ParseTimeout": "0"}
+
+    def process(**settings):
+        config = {"Main": {**CONFIG["Main"], **limits, **settings}}
+        config["AST"] = {"AnalyzeFunctionNames": "true"}
+        processor = FileProcessor(ConfigHandler(config))
+        return processor, processor._process_file(str(module))
+
+    processor, result = process()
+    assert len(result["ast"]["f"]) == 50
+    assert "skipped" not in result and "truncated" not in result
+
+    processor, result = process(MaxParseBytes="100")
+    assert result["skipped"] == "size" and "ast" not in result
+    assert result["lines"] == ["def f0():", "return 0", "def f1():"]
+    assert processor.stats.counters["ast_skipped"] == 1
+
+    processor, result = process(MaxAstNodes="20")
+    assert result["truncated"] == "nodes"
+    assert 0 < len(result["ast"]["f"]) < 50
+    assert processor.stats.counters["ast_truncated"] == 1
+
+    # Parsing alone outlasts a nanosecond, so the tree is not visited at all.
+    processor, result = process(ParseTimeout="0.000000001")
+    assert result["truncated"] == "timeout"
+    assert result["ast"] == {}
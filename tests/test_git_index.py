@@ -0,0 +1,117 @@
+import os
+import shutil
+import subprocess
+import pytest
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+from folderinfo.src.git_index import GitIndex, read_index
+from folderinfo.src import utils
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+
+
+def _git(root, *args):
+    return subprocess.run(
+        ["git", "-C", str(root), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _make_repo(root):
+    for relative_path in (
+        "app.py",
+        "docs/guide.md",
+        "docs/guide_with_a_much_longer_name.md",
+        "build/out.py",
+        "pkg/sub/mod.py",
+        "pkg/sub/data.bin",
+    ):
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"# {relative_path}\n")
+    _git(root, "init", "-q")
+    _git(root, "add", ".")
+    (root / "untracked.py").write_text("X = 1\n")
+
+
+@pytest.mark.parametrize("version", [2, 3, 4])
+def test_read_index_matches_git(tmp_path, version):
+    """Every index version lists the same paths and blob SHAs as `git ls-files`."""
+    _make_repo(tmp_path)
+    if version == 3:
+        # Extended flags switch the index to version 3.
+        _git(tmp_path, "add", "--intent-to-add", "untracked.py")
+    _git(tmp_path, "update-index", "--index-version", str(version))
+
+    expected = {}
+    for line in _git(tmp_path, "ls-files", "-s").splitlines():
+        info, path = line.split("\t")
+        expected[path] = info.split()[1]
+    entries = list(read_index(str(tmp_path / ".git" / "index")))
+    assert {entry.path: entry.sha for entry in entries} == expected
+    assert [entry.path for entry in entries] == sorted(expected)
+
+
+def test_git_discovery_filters_tracked_files_and_hashes(tmp_path):
+    """Git discovery applies the usual filters to tracked files and reuses their SHAs."""
+    _make_repo(tmp_path)
+    config = ConfigHandler(CONFIG_PATH)
+    config.config.set("Main", "Discovery", "git")
+    processor = FileProcessor(config)
+
+    files = list(processor.discover_files(str(tmp_path / "pkg")))
+    assert files == [os.path.join(str(tmp_path / "pkg"), "sub", "mod.py")]
+
+    files = list(processor.discover_files(str(tmp_path)))
+    relative = [os.path.relpath(f, tmp_path).replace(os.sep, "/") for f in files]
+    assert relative == [
+        "app.py",
+        "docs/guide.md",
+        "docs/guide_with_a_much_longer_name.md",
+        "pkg/sub/mod.py",
+    ]
+
+    assert processor.git_index is not None
+    module = str(tmp_path / "app.py")
+    # Entries written in the same instant as the index are racy; age them first.
+    stat = os.stat(module)
+    os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    _git(tmp_path, "update-index", "--refresh")
+    index = GitIndex.find(str(tmp_path))
+    assert index.digest(module, os.stat(module)) == utils.file_digest(module)
+
+    (tmp_path / "app.py").write_text("# edited\n")
+    assert index.digest(module, os.stat(module)) is None
+
+
+@pytest.mark.parametrize(
+    "setup",
+    [
+        lambda root: _git(root, "config", "core.autocrlf", "true"),
+        lambda root: (root / ".gitattributes").write_text("*.py text eol=crlf\n"),
+        lambda root: (root / ".git" / "info" / "attributes").write_text(
+            "*.py filter=lfs\n"
+        ),
+    ],
+)
+def test_index_digests_are_not_used_when_checkout_converts(
+    tmp_path, monkeypatch, setup
+):
+    """Line ending conversion and filters make the blob differ from the worktree file."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "home" / ".config"))
+    _make_repo(tmp_path)
+    (tmp_path / ".git" / "info").mkdir(exist_ok=True)
+    (tmp_path / ".git" / "info" / "attributes").write_text("*.bin -text\n")
+    module = str(tmp_path / "app.py")
+    stat = os.stat(module)
+    os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    _git(tmp_path, "update-index", "--refresh")
+    assert GitIndex.find(str(tmp_path)).digest(module, os.stat(module)) is not None
+
+    setup(tmp_path)
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "update-index", "--refresh")
+    assert GitIndex.find(str(tmp_path)).digest(module, os.stat(module)) is None
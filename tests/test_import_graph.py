@@ -0,0 +1,67 @@
+import os
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+from folderinfo.src.import_graph import ImportGraph, ImportGraphBuilder
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+PROJECT = {
+    "pkg/__init__.py": "",
+    "pkg/core.py": "def helper():\n    return 1\n\n\ndef unused():\n    return helper()\n",
+    "pkg/api.py": (
+        "from .core import helper as h\n"
+        "from . import core\n\n\n"
+        "def handler():\n    return h()\n"
+    ),
+    "app.py": (
+        "import os\n"
+        "import pkg.api\n"
+        "from pkg.api import handler\n\n\n"
+        "def main():\n    return handler()\n"
+    ),
+    "README.md": "A project.\n",
+}
+
+
+def _analyze(tmp_path):
+    for relative, content in PROJECT.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+    index = ImportGraphBuilder(str(tmp_path))
+    processor.analyze_directory(str(tmp_path), index=index)
+    return index.build()
+
+
+def test_imports_resolve_to_files(tmp_path):
+    """Absolute, relative and aliased imports are linked; outside modules are not."""
+    graph = _analyze(tmp_path)
+
+    assert graph.files == ["app.py", "pkg/__init__.py", "pkg/api.py", "pkg/core.py"]
+    assert graph.imports_of("app.py") == ["pkg/api.py"]
+    assert graph.imports_of("pkg.api") == ["pkg/core.py"]
+    assert graph.importers_of("pkg/core.py") == ["pkg/api.py"]
+    assert graph.dependencies("app") == ["pkg/api.py", "pkg/core.py"]
+    assert graph.reverse_dependencies("pkg.core") == ["app.py", "pkg/api.py"]
+
+
+def test_calls_resolve_through_imports(tmp_path):
+    graph = _analyze(tmp_path)
+
+    assert graph.callers_of("pkg/core.py:helper") == [
+        "pkg/api.py:handler",
+        "pkg/core.py:unused",
+    ]
+    assert graph.callees_of("app.py:main") == ["pkg/api.py:handler"]
+
+
+def test_graph_round_trips_through_a_file(tmp_path):
+    graph = _analyze(tmp_path / "project")
+    graph.save(str(tmp_path / "graph.idx"))
+    loaded = ImportGraph.load(str(tmp_path / "graph.idx"))
+
+    assert loaded.files == graph.files
+    assert loaded.reverse_dependencies("pkg.core") == ["app.py", "pkg/api.py"]
+    assert loaded.callers_of("pkg.api:handler") == ["app.py:main"]
@@ -0,0 +1,67 @@
+import os
+import pytest
+from folderinfo.src import line_counter
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+from folderinfo.src.file_reader import C_COMMENTS, MARKUP_COMMENTS
+from folderinfo.src.line_counter import LineCounts, count_file_lines, count_lines
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+JS = (
+    b"/* A block\n"
+    b"   comment */\n"
+    b"// line comment\n"
+    b"\n"
+    b"let a = 1; /* trailing */\n"
+    b"  \r\n"
+    b"/* one line */ let b = 2;\n"
+    b"let c = 3;"
+)
+
+
+def test_count_lines_classifies_blank_and_comment_lines():
+    assert count_lines(b"") == LineCounts(0, 0, 0)
+    assert count_lines(b"a\nb") == count_lines(b"a\nb\n") == LineCounts(2, 0, 0)
+    assert count_lines(b"# c\n\n  # d\n\t\nx = 1  # e\n") == LineCounts(5, 2, 2)
+    counts = count_lines(JS, C_COMMENTS)
+    assert counts == LineCounts(8, 2, 3)
+    assert counts.code == 3
+    assert count_lines(b"# Title\n<!-- x -->\n", MARKUP_COMMENTS).comment == 1
+
+
+@pytest.mark.parametrize("window_size", [7, 1 << 20])
+def test_count_file_lines_matches_in_memory_counts(tmp_path, monkeypatch, window_size):
+    """Memory-mapped windows end on line breaks and carry open block comments across."""
+    path = tmp_path / "big.js"
+    path.write_bytes(JS * 50)
+    monkeypatch.setattr(line_counter, "MMAP_THRESHOLD", 1)
+    monkeypatch.setattr(line_counter, "WINDOW_SIZE", window_size)
+
+    assert count_file_lines(str(path)) == count_lines(JS * 50, C_COMMENTS)
+
+
+def test_results_carry_line_counts(tmp_path):
+    """Counts come from the source already read for the AST, and from a separate pass otherwise."""
+    module = tmp_path / "module.py"
+    module.write_text("# header\n\ndef f():\n    return 1\n")
+    notes = tmp_path / "notes.md"
+    notes.write_text("".join(f"line {i}\n" for i in range(100000)))
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+
+    # Off by default, so files that are not analyzed whole are only read up to MaxHeadBytes.
+    assert "line_counts" not in processor._process_file(str(notes))
+    assert processor.stats.counters["bytes_read"] <= processor.max_head_bytes
+
+    processor.count_lines = True
+
+    assert processor._process_file(str(module))["line_counts"] == {
+        "total": 4,
+        "blank": 1,
+        "comment": 1,
+    }
+    assert processor._process_file(str(notes))["line_counts"]["total"] == 100000
+
+    processor.count_lines = False
+    assert "line_counts" not in processor._process_file(str(module))
@@ -0,0 +1,108 @@
+import os
+import json
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+from folderinfo.src.manifest import IncrementalAnalysis, Manifest, ManifestWriter
+from folderinfo.src.output_writers import JsonLinesWriter, read_json_lines
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+
+def test_since_manifest_analyzes_only_changed_files(tmp_path):
+    """Unchanged files keep their previous results; only edits and additions are read."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "kept.py").write_text("def kept():\n    return 1\n")
+    (project / "touched.md").write_text("same content\n")
+    (project / "edited.py").write_text("X = 1\n")
+    (project / "deleted.md").write_text("gone soon\n")
+    file_list = str(tmp_path / "file_list.json")
+    manifest = str(tmp_path / "manifest.jsonl")
+    results = str(tmp_path / "results.jsonl")
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+
+    processor.generate_file_list(str(project), file_list, manifest_file=manifest)
+    with JsonLinesWriter(results) as writer:
+        processor.analyze_from_list(file_list, writer=writer)
+    assert len(Manifest.load(manifest).entries) == 4
+
+    (project / "edited.py").write_text("X = 2\nY = 3\n")
+    (project / "deleted.md").unlink()
+    (project / "added.md").write_text("new file\n")
+    # A new mtime alone is resolved by the content hash.
+    stat = os.stat(project / "touched.md")
+    os.utime(project / "touched.md", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    processor.generate_file_list(str(project), file_list)
+
+    incremental = IncrementalAnalysis(
+        Manifest.load(manifest), read_json_lines(results), ManifestWriter(manifest)
+    )
+    updated = processor.analyze_from_list(file_list, incremental=incremental)
+    incremental.manifest_writer.close()
+
+    assert incremental.counts == {
+        "added": 1,
+        "modified": 1,
+        "unchanged": 2,
+        "deleted": 1,
+    }
+    assert processor.stats.counters["files"] == 2
+    assert updated == processor.analyze_from_list(file_list)
+    with open(file_list) as f:
+        assert list(updated) == json.load(f)
+    assert set(Manifest.load(manifest).entries) == set(updated)
+
+
+def test_changed_settings_invalidate_previous_results(tmp_path):
+    """Results produced under other settings are not carried forward."""
+    project = tmp_path / "project"
+    project.mkdir()
+    for name in ("a.py", "b.md"):
+        (project / name).write_text("".join(f"line_{i} = {i}\n" for i in range(30)))
+    file_list = str(tmp_path / "file_list.json")
+    manifest = str(tmp_path / "manifest.jsonl")
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+    processor.generate_file_list(str(project), file_list, manifest_file=manifest)
+    previous = processor.analyze_from_list(file_list)
+
+    config = ConfigHandler(CONFIG_PATH)
+    config.config.set("Main", "LinesToRead", "5")
+    changed = FileProcessor(config)
+    incremental = IncrementalAnalysis(
+        Manifest.load(manifest),
+        previous,
+        ManifestWriter(manifest, changed.config_fingerprint()),
+    )
+    updated = changed.analyze_from_list(file_list, incremental=incremental)
+    incremental.manifest_writer.close()
+
+    assert incremental.counts["modified"] == 2 and incremental.counts["unchanged"] == 0
+    assert updated == changed.analyze_from_list(file_list)
+    assert Manifest.load(manifest).fingerprint == changed.config_fingerprint()
+
+
+def test_failed_run_keeps_the_previous_manifest(tmp_path):
+    """A manifest is only replaced by a run that completes."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.md").write_text("a\n")
+    (project / "b.md").write_text("b\n")
+    manifest = str(tmp_path / "manifest.jsonl")
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+    processor.generate_file_list(
+        str(project), str(tmp_path / "files.json"), manifest_file=manifest
+    )
+
+    incremental = IncrementalAnalysis(
+        Manifest.load(manifest), {}, ManifestWriter(manifest)
+    )
+    try:
+        with incremental.manifest_writer:
+            for _ in incremental.run(processor, [str(project / "a.md")]):
+                raise RuntimeError("interrupted")
+    except RuntimeError:
+        pass
+
+    assert len(Manifest.load(manifest).entries) == 2
+    assert not os.path.exists(manifest + ".tmp")
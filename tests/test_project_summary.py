@@ -0,0 +1,68 @@
+import os
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.project_summary import ProjectSummary
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+PROJECT = {
+    "app.py": "def main():\n    return 1\n",
+    "pkg/core.py": "class Core:\n    pass\n\n\ndef helper():\n    pass",
+    "pkg/sub/util.py": "x = 1\n" * 300,
+    "docs/index.md": "# Docs\n",
+    "build/skipped.py": "ignored = True\n",
+    "image.png": "not a configured type",
+}
+
+
+def _project(tmp_path):
+    for relative, content in PROJECT.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return ProjectSummary(str(tmp_path), ConfigHandler(CONFIG_PATH))
+
+
+def test_collect_groups_the_discovered_files(tmp_path):
+    """Only the files discovery selects are counted, grouped by extension and top directory."""
+    summary = _project(tmp_path).collect(top=2)
+
+    assert summary["totals"] == {
+        "files": 4,
+        "bytes": 1877,
+        "lines": 309,
+        "blank": 2,
+        "comment": 0,
+    }
+    assert summary["directories"] == 4
+    assert summary["extensions"] == {
+        ".py": {"files": 3, "bytes": 1870, "lines": 308, "blank": 2, "comment": 0},
+        ".md": {"files": 1, "bytes": 7, "lines": 1, "blank": 0, "comment": 0},
+    }
+    assert list(summary["by_directory"]) == ["pkg", ".", "docs"]
+    assert summary["by_directory"]["pkg"]["files"] == 2
+    assert [item["path"] for item in summary["largest"]] == [
+        "pkg/sub/util.py",
+        "pkg/core.py",
+    ]
+    assert summary["percentiles"]["lines"] == {"p50": 2, "p90": 300, "p99": 300}
+    assert sum(bucket["files"] for bucket in summary["histogram"]) == 4
+    assert "Largest files:" in ProjectSummary.render(summary)
+
+
+def test_collect_adds_analysis_counts_without_reading_lines(tmp_path):
+    project = _project(tmp_path)
+    core = os.path.join(str(tmp_path), "pkg", "core.py")
+    results = {core: {"ast": {"f": [{"n": "helper"}], "c": [{"n": "Core"}]}}}
+
+    summary = project.collect(lines=False, depth=2, results=results)
+
+    assert summary["totals"] == {
+        "files": 4,
+        "bytes": 1877,
+        "functions": 1,
+        "classes": 1,
+    }
+    assert "lines" not in summary["percentiles"]
+    assert set(summary["by_directory"]) == {".", "docs", "pkg", "pkg/sub"}
+    assert summary["by_directory"]["pkg"]["classes"] == 1
@@ -0,0 +1,43 @@
+import os
+import sys
+import json
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFERRED_MODULES = (
+    "structlog",
+    "asyncio",
+    "sqlite3",
+    "concurrent.futures",
+    "folderinfo.src.file_processor",
+    "folderinfo.src.config_handler",
+)
+
+
+def test_cli_help_does_not_load_analysis_modules():
+    """The entry point and `--help` leave analysis, cache and logging modules unloaded."""
+    script = (
+        "import sys, json\n"
+        "from folderinfo.src import cli\n"
+        "try:\n"
+        "    cli.main(['--help'], standalone_mode=False)\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert json.loads(completed.stdout.splitlines()[-1]) == []
+
+
+def test_lazy_package_attributes():
+    import folderinfo.src
+
+    assert folderinfo.src.FileProcessor.__module__ == "folderinfo.src.file_processor"
+    assert folderinfo.src.reduce_tokens is folderinfo.src.utils.reduce_tokens
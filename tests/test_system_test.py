@@ -60,3 +60,139 @@ def test_analyze_files():
     for file in py_files:
         file_results = results[file]
         print(file_results)
+
+
+def test_analyze_files_in_parallel(tmp_path):
+    """Parallel analysis matches serial analysis and isolates broken files."""
+    config = ConfigHandler(CONFIG_PATH)
+    processor = FileProcessor(config)
+
+    broken_file = tmp_path / "broken.py"
+    broken_file.write_text("def broken(:\n")
+    processor.generate_file_list(SAMPLE_DIRECTORY, OUTPUT_FILE)
+    with open(OUTPUT_FILE, "r") as f:
+        files = json.load(f) + [str(broken_file)]
+    file_list = tmp_path / "file_list.json"
+    file_list.write_text(json.dumps(files))
+
+    serial = processor.analyze_from_list(str(file_list))
+    parallel = FileProcessor(config).analyze_from_list(str(file_list), jobs=2)
+
+    assert list(parallel) == files, "Results should keep the file list order."
+    assert parallel == serial
+    assert "SyntaxError" in parallel[str(broken_file)]["error"]
+
+
+def test_jsonl_file_list_and_directory_pipeline(tmp_path):
+    """JSON Lines lists and the discovery pipeline analyze the same files."""
+    config = ConfigHandler(CONFIG_PATH)
+    json_list = str(tmp_path / "files.json")
+    jsonl_list = str(tmp_path / "files.jsonl")
+
+    FileProcessor(config).generate_file_list(SAMPLE_DIRECTORY, json_list)
+    FileProcessor(config).generate_file_list(SAMPLE_DIRECTORY, jsonl_list)
+    with open(jsonl_list, "r") as f:
+        assert json.loads(f.readline()).startswith(SAMPLE_DIRECTORY)
+
+    from_json = FileProcessor(config).analyze_from_list(json_list)
+    from_jsonl = FileProcessor(config).analyze_from_list(jsonl_list)
+    from_directory = FileProcessor(config).analyze_directory(SAMPLE_DIRECTORY)
+
+    assert list(from_json) == list(from_jsonl) == list(from_directory)
+    assert from_jsonl == from_directory
+
+
+def test_streaming_writers_without_retaining_results(tmp_path):
+    """Results stream to a writer without being kept in memory."""
+    from folderinfo.src.output_writers import get_writer
+
+    config = ConfigHandler(CONFIG_PATH)
+    processor = FileProcessor(config)
+    output = str(tmp_path / "analysis.jsonl")
+
+    with get_writer("jsonl", output, SAMPLE_DIRECTORY, buffer_size=2) as writer:
+        results = processor.analyze_directory(
+            SAMPLE_DIRECTORY, writer=writer, retain=False
+        )
+    assert results == {}
+    assert processor.analysis is None
+
+    with open(output, "r") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == writer.count > 0
+    assert all(not record["path"].startswith(SAMPLE_DIRECTORY) for record in records)
+
+    processor.analyze_directory(SAMPLE_DIRECTORY)
+    report = str(tmp_path / "report.txt")
+    processor.output_analysis(SAMPLE_DIRECTORY, report)
+    with open(report, "r") as f:
+        assert f.readline() == f"Project dir: {SAMPLE_DIRECTORY}\n"
+
+
+def test_run_stats_are_recorded(capsys, caplog):
+    """Stage timers and counters are filled in during analysis, and logged rather than printed."""
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+    with caplog.at_level("INFO", logger="folderinfo.stats"):
+        results = processor.analyze_directory(SAMPLE_DIRECTORY)
+    assert capsys.readouterr().out == ""
+    run_summary = [r for r in caplog.records if r.msg.startswith("run_summary ")]
+    assert run_summary[0].files == len(results)
+    assert f" files={len(results)}" in run_summary[0].getMessage()
+
+    summary = processor.stats.as_dict()
+    assert summary["counters"]["files"] == len(results)
+    assert summary["counters"]["bytes_read"] > 0
+    assert {"discover", "read", "parse", "visit", "reduce"} <= set(summary["stages"])
+    assert 0 < len(summary["slowest_files"]) <= processor.stats.slowest
+
+
+def test_parallel_chunks_spread_a_file_list_over_the_workers(tmp_path, monkeypatch):
+    """A known number of files is cut into several chunks per worker."""
+    import concurrent.futures
+    import copy
+
+    chunk_sizes = []
+
+    class InlineExecutor:
+        def __init__(self, max_workers, initializer, initargs):
+            # A copy, as a worker process would get, so the worker stats stay separate.
+            initializer(*map(copy.copy, initargs))
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def submit(self, fn, file_paths):
+            chunk_sizes.append(len(file_paths))
+            future = concurrent.futures.Future()
+            future.set_result(fn(file_paths))
+            return future
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", InlineExecutor)
+    files = []
+    for i in range(100):
+        path = tmp_path / f"notes{i}.md"
+        path.write_text(f"note {i}\n")
+        files.append(str(path))
+
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+    results = dict(processor.iter_analysis(files, jobs=4))
+    assert list(results) == files
+    assert chunk_sizes == [6] * 16 + [4]
+
+
+def test_display_path_only_strips_the_directory_itself():
+    """Paths in a sibling directory sharing the prefix keep their full path."""
+    from folderinfo.src.output_writers import display_path
+
+    project = os.path.join(os.sep, "a", "b")
+    inside = os.path.join(project, "x.py")
+    sibling = os.path.join(os.sep, "a", "bc", "x.py")
+
+    assert display_path(inside, project) == os.sep + "x.py"
+    assert project + display_path(inside, project) == inside
+    assert display_path(inside, project + os.sep) == "x.py"
+    assert display_path(sibling, project) == sibling
+    assert display_path(sibling, None) == sibling
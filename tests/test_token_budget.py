@@ -0,0 +1,45 @@
+from folderinfo.src.token_budget import TokenBudget, estimate_tokens
+
+
+def _result(lines, imports=()):
+    return {
+        "lines": lines,
+        "file_path": "",
+        "ast": {"i": [{"n": name} for name in imports]} if imports else {},
+    }
+
+
+def test_estimate_tokens_splits_words_numbers_and_symbols():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("import os") == 2
+    # Eleven letters are two tokens, four digits two, and each symbol one.
+    assert estimate_tokens("identifiers = 1234;") == 6
+
+
+def test_select_prioritizes_and_truncates_within_budget():
+    """Specified files come first, then imported modules; the rest are cut or left out."""
+    lines = [f"line number {i} of the file" for i in range(20)]
+    analysis = {
+        "/p/a.py": _result(lines, imports=["core"]),
+        "/p/b.py": _result(lines, imports=["core"]),
+        "/p/core.py": _result(lines),
+        "/p/README.md": _result(lines),
+    }
+    budget = TokenBudget(200, specified_files=["README.md"], directory="/p")
+
+    assert budget.rank(analysis)[:2] == ["/p/README.md", "/p/core.py"]
+    selected = budget.select(analysis)
+
+    assert list(selected) == ["/p/core.py", "/p/README.md"]
+    assert selected["/p/README.md"] is analysis["/p/README.md"]
+    assert 0 < len(selected["/p/core.py"]["lines"]) < len(lines)
+    assert budget.used <= 200
+    assert budget.counts == {"full": 1, "truncated": 1, "omitted": 2}
+
+
+def test_select_keeps_everything_under_a_large_budget():
+    analysis = {"/p/a.py": _result(["x = 1"], imports=["os"])}
+    budget = TokenBudget(10_000)
+
+    assert budget.select(analysis) == analysis
+    assert budget.counts["full"] == 1
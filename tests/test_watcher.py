@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import pytest
+from folderinfo.src.config_handler import ConfigHandler
+from folderinfo.src.file_processor import FileProcessor
+from folderinfo.src.watcher import InotifyWatcher, PollingWatcher, WatchSession
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(TEST_DIR, "sample_data", "config.ini")
+
+
+def _read_output(path):
+    with open(path) as f:
+        return {record["path"]: record for record in map(json.loads, f)}
+
+
+def test_watch_session_updates_only_changed_files(tmp_path):
+    """Edits, additions and deletions are applied to the output without a full re-analysis."""
+    project = tmp_path / "project"
+    (project / "build").mkdir(parents=True)
+    (project / "a.py").write_text("A = 1\n")
+    (project / "b.md").write_text("first\n")
+    output = str(tmp_path / "out.jsonl")
+    processor = FileProcessor(ConfigHandler(CONFIG_PATH))
+    watcher = PollingWatcher(lambda: processor.discover_files(str(project)), 0.01)
+    session = WatchSession(processor, str(project), output, "jsonl", watcher)
+
+    session.analyze_all()
+    assert set(_read_output(output)) == {"/a.py", "/b.md"}
+
+    processor.stats.counters.clear()
+    (project / "b.md").write_text("second version\n")
+    (project / "c.md").write_text("new\n")
+    (project / "a.py").unlink()
+    (project / "build" / "ignored.py").write_text("X = 1\n")
+    assert session.update(watcher.changes(0.01)) == 3
+    assert processor.stats.counters["files"] == 2
+
+    records = _read_output(output)
+    assert set(records) == {"/b.md", "/c.md"}
+    assert records["/b.md"]["lines"] == ["second version"]
+    assert not os.path.exists(output + ".tmp")
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is Linux-only"
+)
+def test_inotify_reports_writes_and_new_directories(tmp_path):
+    (tmp_path / "venv").mkdir()
+    watcher = InotifyWatcher(str(tmp_path), {"venv"})
+    try:
+        (tmp_path / "a.py").write_text("A = 1\n")
+        (tmp_path / "venv" / "skip.py").write_text("B = 1\n")
+        assert watcher.changes(1.0) == {str(tmp_path / "a.py")}
+
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "mod.py").write_text("C = 1\n")
+        changed = set()
+        while str(tmp_path / "pkg" / "mod.py") not in changed:
+            batch = watcher.changes(1.0)
+            assert batch
+            changed |= batch
+    finally:
+        watcher.close()